@@ -0,0 +1,490 @@
+# answer_cache.py - Persistent answer cache for RAG responses
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import CONFIG
+
+logger = logging.getLogger(__name__)
+
+working_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Result classes returned by the classify callback of get_or_compute()
+CACHE_OK = "ok"
+CACHE_NEGATIVE = "negative"
+CACHE_SKIP = "skip"
+
+def normalize_query(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace"""
+    if not text:
+        return ""
+    text = str(text).lower().strip()
+    text = re.sub(r'[।.,!?"\'()\[\]{}:;]+', ' ', text)
+    return ' '.join(text.split())
+
+def make_cache_key(query: str, occupation: str = None, location: str = None,
+                   language: str = "english", mode: str = "answer", catalog: str = "") -> str:
+    """Cache key from normalized query + user context + response language
+
+    `catalog` (the ingested catalog's fingerprint) keeps answers built from a
+    superseded catalog from being served after a re-ingest.
+    """
+    parts = [
+        mode,
+        normalize_query(query),
+        normalize_query(occupation or ""),
+        normalize_query(location or ""),
+        (language or "english").lower(),
+        catalog or ""
+    ]
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
+
+class AnswerCache:
+    """LRU in memory, SQLite on disk, TTL with stale-while-revalidate and negative caching
+
+    Expired rows are deleted from SQLite when the cache opens and then at most
+    every `prune_interval` seconds on writes, so the file stays bounded too.
+    """
+
+    def __init__(self, db_path: str, max_entries: int = 2000, ttl: float = 24 * 3600,
+                 stale_ttl: float = 6 * 3600, negative_ttl: float = 15 * 60, prune_interval: float = 3600):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.negative_ttl = negative_ttl
+        self.prune_interval = prune_interval
+        self._pruned_at = 0.0
+
+        self._memory = OrderedDict()  # key -> (value, created_at, negative)
+        self._lock = threading.RLock()
+        self._refreshing = set()
+
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "stale_hits": 0,
+            "negative_hits": 0,
+            "refreshes": 0,
+            "refresh_errors": 0,
+            "pruned": 0
+        }
+
+        self._conn = None
+        self._initialize_sqlite()
+
+    def _initialize_sqlite(self):
+        """Open (or create) the persistent cache table"""
+        try:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS answer_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                negative INTEGER NOT NULL DEFAULT 0
+            )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_answer_cache_created ON answer_cache (created_at)")
+            self._conn.commit()
+        except Exception as e:
+            logger.warning(f"⚠️ Answer cache persistence disabled: {e}")
+            self._conn = None
+            return
+        self._prune()
+
+    def _prune(self):
+        """Delete rows past their TTL (plus the stale window) from SQLite"""
+        if self._conn is None:
+            return
+        now = time.time()
+        self._pruned_at = now
+        try:
+            deleted = self._conn.execute(
+                "DELETE FROM answer_cache WHERE (negative = 1 AND created_at < ?) OR created_at < ?",
+                (now - self.negative_ttl, now - self.ttl - self.stale_ttl)
+            ).rowcount
+            self._conn.commit()
+        except Exception as e:
+            logger.warning(f"⚠️ Answer cache prune failed: {e}")
+            return
+        if deleted:
+            self.stats["pruned"] += deleted
+            logger.info(f"🧹 Pruned {deleted} expired answer cache rows")
+
+    def _state(self, created_at: float, negative: bool) -> Optional[str]:
+        """'fresh', 'stale' or None (expired) for an entry of the given age"""
+        age = time.time() - created_at
+        if negative:
+            return "fresh" if age < self.negative_ttl else None
+        if age < self.ttl:
+            return "fresh"
+        if age < self.ttl + self.stale_ttl:
+            return "stale"
+        return None
+
+    def _remember(self, key: str, entry: Tuple[Any, float, bool]):
+        """Insert into the in-memory LRU, evicting the oldest entries"""
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _load(self, key: str) -> Optional[Tuple[Any, float, bool]]:
+        """Read an entry from SQLite"""
+        if self._conn is None:
+            return None
+        try:
+            row = self._conn.execute(
+                "SELECT value, created_at, negative FROM answer_cache WHERE key = ?", (key,)
+            ).fetchone()
+        except Exception as e:
+            logger.warning(f"⚠️ Answer cache read failed: {e}")
+            return None
+        if not row:
+            return None
+        return json.loads(row[0]), row[1], bool(row[2])
+
+    def _store(self, key: str, entry: Tuple[Any, float, bool]):
+        """Write an entry to SQLite"""
+        if self._conn is None:
+            return
+        value, created_at, negative = entry
+        try:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO answer_cache (key, value, created_at, negative) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), created_at, int(negative))
+            )
+            self._conn.commit()
+        except Exception as e:
+            logger.warning(f"⚠️ Answer cache write failed: {e}")
+            return
+        if created_at - self._pruned_at >= self.prune_interval:
+            self._prune()
+
+    def get(self, key: str, count: bool = True) -> Tuple[Any, Optional[str]]:
+        """Return (value, state) where state is 'fresh', 'stale' or None on a miss
+
+        count=False only peeks (no stats), for callers that hand the query to get_or_compute() next.
+        """
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                entry = self._load(key)
+                if entry is not None:
+                    self._remember(key, entry)
+            else:
+                self._memory.move_to_end(key)
+
+            if entry is None:
+                return None, None
+
+            value, created_at, negative = entry
+            state = self._state(created_at, negative)
+            if state is None:
+                self._memory.pop(key, None)
+                return None, None
+
+            if negative and count:
+                self.stats["negative_hits"] += 1
+            return value, state
+
+    def _count(self, *names: str):
+        """Bump stats counters (called from request and refresh threads)"""
+        with self._lock:
+            for name in names:
+                self.stats[name] += 1
+
+    def set(self, key: str, value: Any, negative: bool = False):
+        """Store a value (negative=True for 'no scheme found' results)"""
+        entry = (value, time.time(), negative)
+        with self._lock:
+            self._remember(key, entry)
+            self._store(key, entry)
+
+    def _refresh(self, key: str, compute: Callable[[], Any], classify: Callable[[Any], str]):
+        """Recompute a stale entry in the background"""
+        try:
+            value = compute()
+            kind = classify(value)
+            if kind != CACHE_SKIP:
+                self.set(key, value, negative=(kind == CACHE_NEGATIVE))
+            self._count("refreshes")
+        except Exception as e:
+            self._count("refresh_errors")
+            logger.warning(f"⚠️ Background cache refresh failed: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any],
+                       classify: Callable[[Any], str] = lambda value: CACHE_OK,
+                       refresh: Callable[[], Any] = None) -> Any:
+        """Serve from cache; on a stale hit return the old value and refresh in the background
+
+        `refresh` recomputes a stale entry (default: `compute`); pass one that
+        doesn't capture per-request state such as the caller's TurnBudget.
+        """
+        value, state = self.get(key)
+
+        if state == "fresh":
+            self._count("hits")
+            return value
+
+        if state == "stale":
+            self._count("hits", "stale_hits")
+            with self._lock:
+                start_refresh = key not in self._refreshing
+                if start_refresh:
+                    self._refreshing.add(key)
+            if start_refresh:
+                threading.Thread(
+                    target=self._refresh, args=(key, refresh or compute, classify), daemon=True
+                ).start()
+            return value
+
+        self._count("misses")
+        value = compute()
+        kind = classify(value)
+        if kind != CACHE_SKIP:
+            self.set(key, value, negative=(kind == CACHE_NEGATIVE))
+        return value
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters plus current size and hit rate"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["size"] = len(self._memory)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+    def clear(self):
+        """Drop every cached entry"""
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM answer_cache")
+                self._conn.commit()
+
+    def close(self):
+        """Close the SQLite connection"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+class SemanticCache:
+    """Near-duplicate answer cache: nearest previously answered query above a cosine threshold"""
+
+    def __init__(self, embed_fn: Callable[[str], List[float]], threshold: float = 0.9,
+                 max_entries: int = 2000, ttl: float = 24 * 3600):
+        self.embed_fn = embed_fn
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        # scope -> OrderedDict(normalized query -> (unit vector, value, created_at))
+        self._scopes = {}
+        # scope -> (query list, stacked matrix), rebuilt lazily after inserts
+        self._matrices = {}
+        self._size = 0
+        self._lock = threading.RLock()
+
+        self.language_stats = {}
+
+    @staticmethod
+    def make_scope(occupation: str = None, location: str = None,
+                   language: str = "english", mode: str = "answer") -> Tuple[str, ...]:
+        """Only queries with the same user context and language are comparable"""
+        return (mode, normalize_query(occupation or ""), normalize_query(location or ""),
+                (language or "english").lower())
+
+    def embed(self, query: str) -> np.ndarray:
+        """Unit-normalized query embedding"""
+        vector = np.asarray(self.embed_fn(query), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _count(self, language: str, hit: bool):
+        """Per-language hit/miss counters"""
+        stats = self.language_stats.setdefault(language, {"hits": 0, "misses": 0})
+        stats["hits" if hit else "misses"] += 1
+
+    def _matrix(self, scope) -> Tuple[List[str], Optional[np.ndarray]]:
+        """Stacked vectors of one scope (cached until the next insert)"""
+        cached = self._matrices.get(scope)
+        if cached is None:
+            entries = self._scopes.get(scope, {})
+            queries = list(entries.keys())
+            matrix = np.stack([entries[q][0] for q in queries]) if queries else None
+            cached = (queries, matrix)
+            self._matrices[scope] = cached
+        return cached
+
+    def _evict_oldest(self):
+        """Drop the globally oldest entry to stay within max_entries"""
+        oldest_scope, oldest_query, oldest_time = None, None, None
+        for scope, entries in self._scopes.items():
+            if not entries:
+                continue
+            query, (_, _, created_at) = next(iter(entries.items()))
+            if oldest_time is None or created_at < oldest_time:
+                oldest_scope, oldest_query, oldest_time = scope, query, created_at
+        if oldest_scope is not None:
+            del self._scopes[oldest_scope][oldest_query]
+            self._matrices.pop(oldest_scope, None)
+            self._size -= 1
+
+    def lookup(self, query: str, scope: Tuple[str, ...], vector: np.ndarray = None) -> Tuple[Any, float]:
+        """Return (value, similarity) of the nearest cached query, or (None, best similarity)"""
+        language = scope[-1]
+        normalized = normalize_query(query)
+
+        with self._lock:
+            entries = self._scopes.get(scope)
+            if not entries:
+                self._count(language, False)
+                return None, 0.0
+
+            # Exact repeat of a cached wording needs no embedding
+            if normalized in entries:
+                _, value, created_at = entries[normalized]
+                if time.time() - created_at < self.ttl:
+                    self._count(language, True)
+                    return value, 1.0
+
+        if vector is None:
+            vector = self.embed(query)
+
+        with self._lock:
+            queries, matrix = self._matrix(scope)
+            if matrix is None:
+                self._count(language, False)
+                return None, 0.0
+
+            similarities = matrix @ vector
+            best = int(np.argmax(similarities))
+            similarity = float(similarities[best])
+            _, value, created_at = self._scopes[scope][queries[best]]
+
+            if similarity >= self.threshold and time.time() - created_at < self.ttl:
+                self._count(language, True)
+                logger.info(f"🧠 Semantic cache hit ({similarity:.3f}): '{query}' ~ '{queries[best]}'")
+                return value, similarity
+
+            self._count(language, False)
+            return None, similarity
+
+    def add(self, query: str, scope: Tuple[str, ...], value: Any, vector: np.ndarray = None):
+        """Index an answered query"""
+        if vector is None:
+            vector = self.embed(query)
+        normalized = normalize_query(query)
+
+        with self._lock:
+            entries = self._scopes.setdefault(scope, OrderedDict())
+            if normalized in entries:
+                del entries[normalized]
+                self._size -= 1
+            entries[normalized] = (vector, value, time.time())
+            self._size += 1
+            self._matrices.pop(scope, None)
+
+            while self._size > self.max_entries:
+                self._evict_oldest()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Index size plus hit rate per language"""
+        with self._lock:
+            per_language = {}
+            for language, counts in self.language_stats.items():
+                lookups = counts["hits"] + counts["misses"]
+                per_language[language] = dict(counts, hit_rate=counts["hits"] / lookups if lookups else 0.0)
+            return {"size": self._size, "threshold": self.threshold, "languages": per_language}
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one execution; followers get the leader's result"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> {"done": Event, "result": ..., "error": ...}
+        self.stats = {"executions": 0, "coalesced": 0}
+
+    def do(self, key: str, compute: Callable[[], Any]) -> Any:
+        """Run compute() unless an identical call is in flight, in which case wait for it"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = {"done": threading.Event(), "result": None, "error": None}
+                self._calls[key] = call
+                self.stats["executions"] += 1
+            else:
+                self.stats["coalesced"] += 1
+
+        if not leader:
+            call["done"].wait()
+            if call["error"] is not None:
+                raise call["error"]
+            return call["result"]
+
+        try:
+            call["result"] = compute()
+            return call["result"]
+        except Exception as e:
+            call["error"] = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call["done"].set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["in_flight"] = len(self._calls)
+        return stats
+
+_cache = None
+_cache_lock = threading.Lock()
+_semantic_cache = None
+
+def get_answer_cache() -> AnswerCache:
+    """Get the shared answer cache configured from CONFIG"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = AnswerCache(
+                    db_path=os.path.join(working_dir, CONFIG.get("answer_cache_path", "answer_cache.db")),
+                    max_entries=CONFIG.get("answer_cache_max_entries", 2000),
+                    ttl=CONFIG.get("answer_cache_ttl", 24 * 3600),
+                    stale_ttl=CONFIG.get("answer_cache_stale_ttl", 6 * 3600),
+                    negative_ttl=CONFIG.get("answer_cache_negative_ttl", 15 * 60),
+                    prune_interval=CONFIG.get("answer_cache_prune_interval", 3600)
+                )
+    return _cache
+
+def get_semantic_cache(embed_fn: Callable[[str], List[float]]) -> SemanticCache:
+    """Get the shared semantic cache (embed_fn must be the retrieval embedding model)"""
+    global _semantic_cache
+    if _semantic_cache is None:
+        with _cache_lock:
+            if _semantic_cache is None:
+                _semantic_cache = SemanticCache(
+                    embed_fn=embed_fn,
+                    threshold=CONFIG.get("semantic_cache_threshold", 0.9),
+                    max_entries=CONFIG.get("semantic_cache_max_entries", 2000),
+                    ttl=CONFIG.get("answer_cache_ttl", 24 * 3600)
+                )
+    return _semantic_cache
@@ -0,0 +1,145 @@
+# answer_streaming.py - Incremental cleaning of streamed LLM output for voice
+import re
+from typing import Iterable, Iterator, List, Optional
+
+THINK_OPEN = "<think>"
+THINK_CLOSE = "</think>"
+
+# Only whitespace after the mark closes a sentence mid-stream: a token may end in "." inside "Rs 2.5" or
+# "pmkisan.gov.in"; the end of the stream is handled by flush()
+SENTENCE_END = re.compile(r'[.!?।]+(?=\s)')
+FINAL_SENTENCE_END = re.compile(r'[.!?।]+(?=\s|$)')
+
+# Words ending in "." that do not end a sentence ("Rs. 6000", "Dr. Ambedkar")
+ABBREVIATIONS = {"rs", "dr", "mr", "mrs", "ms", "smt", "shri", "sh", "no", "st", "govt", "dept", "approx", "etc", "vs", "e.g", "i.e"}
+
+class ThinkFilter:
+    """Incremental state machine that drops <think>...</think> blocks from a token stream
+
+    Tags may be split across chunks, so a possible partial tag at the end of a
+    chunk is held back until the next chunk decides it.
+    """
+
+    def __init__(self):
+        self.inside = False
+        self._pending = ""
+
+    @staticmethod
+    def _partial_tag_length(text: str, tag: str) -> int:
+        """Length of the longest suffix of text that is a prefix of tag"""
+        lowered = text.lower()
+        for length in range(min(len(tag) - 1, len(text)), 0, -1):
+            if lowered.endswith(tag[:length]):
+                return length
+        return 0
+
+    def feed(self, chunk: str) -> str:
+        """Consume a chunk, return the visible (non-thinking) text it completes"""
+        text = self._pending + (chunk or "")
+        self._pending = ""
+        visible = []
+
+        while text:
+            tag = THINK_CLOSE if self.inside else THINK_OPEN
+            index = text.lower().find(tag)
+            if index >= 0:
+                if not self.inside:
+                    visible.append(text[:index])
+                text = text[index + len(tag):]
+                self.inside = not self.inside
+                continue
+
+            hold = self._partial_tag_length(text, tag)
+            if hold:
+                self._pending = text[-hold:]
+                text = text[:-hold]
+            if not self.inside:
+                visible.append(text)
+            text = ""
+
+        return "".join(visible)
+
+    def flush(self) -> str:
+        """Remaining visible text at end of stream"""
+        pending, self._pending = self._pending, ""
+        return "" if self.inside else pending
+
+class SentenceStreamer:
+    """Accumulates text and emits completed sentences"""
+
+    def __init__(self, min_length: int = 10):
+        self.min_length = min_length
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        """Add text, return any sentences it completed"""
+        self._buffer += text
+        return self._split(SENTENCE_END)
+
+    def _split(self, pattern) -> List[str]:
+        sentences = []
+        while True:
+            match = pattern.search(self._buffer)
+            if not match:
+                break
+            candidate = self._buffer[:match.end()]
+            words = candidate[:match.start()].split()
+            if match.group() == "." and words and words[-1].lower() in ABBREVIATIONS:
+                next_match = pattern.search(self._buffer, match.end())
+                if not next_match:
+                    break
+                candidate = self._buffer[:next_match.end()]
+            # Too short to stand alone (e.g. "Rs." or "1."): keep accumulating
+            if len(candidate.strip()) < self.min_length and self._buffer[match.end():].strip():
+                next_match = pattern.search(self._buffer, match.end())
+                if not next_match:
+                    break
+                candidate = self._buffer[:next_match.end()]
+            self._buffer = self._buffer[len(candidate):]
+            sentences.append(candidate)
+        return sentences
+
+    def flush(self) -> List[str]:
+        """Sentences still buffered at the end of the stream (the last may lack a closing mark)"""
+        sentences = self._split(FINAL_SENTENCE_END)
+        rest, self._buffer = self._buffer, ""
+        return sentences + [rest] if rest.strip() else sentences
+
+def clean_sentence_for_voice(sentence: str) -> str:
+    """Same formatting clean-up as clean_answer_for_voice, applied to one sentence"""
+    sentence = re.sub(r'[<>{}*#`_]', '', sentence)
+    sentence = re.sub(r'\s+', ' ', sentence)
+    return sentence.strip()
+
+def iter_voice_sentences(tokens: Iterable[str], max_sentences: Optional[int] = 3) -> Iterator[str]:
+    """Turn a raw token stream into clean, speakable sentences as soon as each completes
+
+    Stops consuming the stream after max_sentences (None = no limit), so the
+    rest of the generation is never waited for.
+    """
+    think_filter = ThinkFilter()
+    streamer = SentenceStreamer()
+    emitted = 0
+
+    def ready(raw_sentences):
+        for raw in raw_sentences:
+            sentence = clean_sentence_for_voice(raw)
+            if len(sentence) >= 3:
+                yield sentence
+
+    for token in tokens:
+        for sentence in ready(streamer.feed(think_filter.feed(token))):
+            yield sentence
+            emitted += 1
+            if max_sentences and emitted >= max_sentences:
+                return
+
+    for sentence in ready(streamer.feed(think_filter.flush()) + streamer.flush()):
+        yield sentence
+        emitted += 1
+        if max_sentences and emitted >= max_sentences:
+            return
+
+def split_voice_sentences(answer: str) -> List[str]:
+    """Split an already complete answer into sentences (for cached answers)"""
+    return list(iter_voice_sentences([answer or ""], max_sentences=None))
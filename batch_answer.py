@@ -0,0 +1,254 @@
+# batch_answer.py - Answer a file of questions through the RAG pipeline (bulk evaluation / pre-generation)
+import os
+import csv
+import json
+import time
+import logging
+import argparse
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Dict, Iterator, List, Optional
+
+from config import CONFIG
+
+logger = logging.getLogger(__name__)
+
+QUESTION_FIELDS = ("question", "query", "Question", "Query")
+
+def read_questions(path: str) -> Iterator[Dict[str, Any]]:
+    """Questions from a JSONL or CSV file -> {"id", "question", "occupation", "location", "language"}
+
+    JSONL lines may be plain strings or objects; CSV needs a header with a
+    question column. Items without an "id" are numbered by their position.
+    """
+    def item(position, record):
+        if isinstance(record, str):
+            record = {"question": record}
+        question = next((str(record[field]).strip() for field in QUESTION_FIELDS if record.get(field)), "")
+        if not question:
+            return None
+        return {
+            "id": str(record.get("id") or position),
+            "question": question,
+            "occupation": record.get("occupation") or None,
+            "location": record.get("location") or None,
+            "language": record.get("language") or "english"
+        }
+
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.lower().endswith(".csv"):
+            records = enumerate(csv.DictReader(f), 1)
+        else:
+            records = ((position, json.loads(line)) for position, line in enumerate(f, 1) if line.strip())
+        for position, record in records:
+            parsed = item(position, record)
+            if parsed is not None:
+                yield parsed
+
+def answered_ids(output_path: str) -> set:
+    """Ids already written to `output_path` (a line cut off by an interruption is ignored)"""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                done.add(str(json.loads(line)["id"]))
+            except (ValueError, KeyError, TypeError):
+                continue
+    return done
+
+def repair_output(output_path: str):
+    """Cut a line left unfinished by an interruption, so appended records start on a fresh line"""
+    if not os.path.exists(output_path):
+        return
+    with open(output_path, "rb+") as f:
+        size = f.seek(0, os.SEEK_END)
+        if size == 0:
+            return
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            return
+        # Walk back to the last newline (or the start of the file)
+        position = size
+        while position > 0:
+            step = min(65536, position)
+            f.seek(position - step)
+            block = f.read(step)
+            newline = block.rfind(b"\n")
+            if newline != -1:
+                position = position - step + newline + 1
+                break
+            position -= step
+        f.truncate(position)
+        logger.warning(f"⚠️ Dropped a partial last line from {output_path} ({size - position} bytes)")
+
+def _sources(hits) -> List[Dict[str, Any]]:
+    sources = []
+    for doc, score in hits:
+        metadata = doc.metadata or {}
+        sources.append({
+            "scheme_id": metadata.get("scheme_id"),
+            "scheme_name": metadata.get("scheme_name"),
+            "section": metadata.get("section"),
+            "catalog": metadata.get("catalog"),
+            "score": round(float(score), 4)
+        })
+    return sources
+
+def answer_batch(input_path: str, output_path: str, batch_size: int = 32, workers: int = None,
+                 top_k: int = 5, resume: bool = True, warm_cache: bool = True,
+                 model_timeout: float = 300.0) -> Optional[Dict[str, Any]]:
+    """Answer every question in `input_path`, appending one JSON line per answer to `output_path`
+
+    Per batch, all search queries are embedded in one call and retrieved with
+    those vectors; LLM calls run on `workers` threads (and stay capped by
+    CONFIG["llm_max_concurrency"]) while the next batch is retrieved. Every
+    record carries its answer, schemes, source chunks and per-stage timings.
+    With resume, ids already in `output_path` are skipped. With warm_cache,
+    good answers are also written to the answer cache for live traffic.
+    Caches are never read, so every answer is freshly generated.
+    Returns job stats, or None on failure.
+    """
+    import enhanced_rag_database as rag
+
+    workers = workers or CONFIG.get("llm_max_concurrency", 4)
+
+    db = rag.SchemeDatabase(CONFIG["sqlite_db_path"], CONFIG["schemes_csv_path"])
+    if not db.available:
+        print("❌ RAG system not available, cannot answer the batch")
+        return None
+    rag.start_model_warmup()
+    embedding = rag.get_embedding(timeout=model_timeout)
+    if embedding is None or rag.get_llm(timeout=model_timeout) is None:
+        print("❌ Models did not load, cannot answer the batch")
+        return None
+    qa_chain, status = rag.get_retrieval_engine().get_qa_chain()
+    if not qa_chain:
+        print(status)
+        return None
+
+    repair_output(output_path)
+    done = answered_ids(output_path) if resume else set()
+    items = [item for item in read_questions(input_path) if item["id"] not in done]
+    stats = {"total": len(items) + len(done), "skipped": len(done), "answered": 0, "degraded": 0,
+             "failed": 0, "seconds": 0.0, "embed_ms": 0.0, "retrieval_ms": 0.0, "llm_ms": 0.0}
+    print(f"📦 Answering {len(items)} questions ({len(done)} already done, batches of {batch_size}, "
+          f"{workers} LLM workers)")
+
+    def generate(item, question, search_query, hits, timings):
+        start = time.perf_counter()
+        answer = rag.generate_answer(question, hits)
+        timings["llm_ms"] = (time.perf_counter() - start) * 1000
+        schemes = db._schemes_from_hits(hits, answer or "", search_query, top_k)[:top_k]
+        result = {"schemes": schemes, "answer": answer}
+        if answer is None:
+            result = {"schemes": schemes, "answer": db._template_answer(schemes, item["language"]), "degraded": True}
+        elif warm_cache:
+            kind = rag._classify_pipeline_result(result)
+            if kind != rag.CACHE_SKIP:
+                key = db._answer_cache_key(item["question"], item["occupation"], item["location"], item["language"],
+                                           top_k, item["profile"])
+                rag.get_answer_cache().set(key, result, negative=(kind == rag.CACHE_NEGATIVE))
+        timings["total_ms"] = sum(timings.values())
+        return {
+            "id": item["id"],
+            "question": item["question"],
+            "occupation": item["occupation"],
+            "location": item["location"],
+            "language": item["language"],
+            "answer": result["answer"],
+            "degraded": bool(result.get("degraded")),
+            "schemes": [scheme.get("Name") for scheme in schemes],
+            "sources": _sources(hits),
+            "timings": {name: round(ms, 1) for name, ms in timings.items()}
+        }
+
+    start = time.perf_counter()
+    with open(output_path, "a", encoding="utf-8") as out, ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+
+        def write_finished(block: bool):
+            nonlocal pending
+            if not pending:
+                return
+            finished, pending = wait(pending, timeout=None if block else 0, return_when=FIRST_COMPLETED)
+            for future in finished:
+                try:
+                    record = future.result()
+                except Exception as e:
+                    logger.warning(f"⚠️ Batch answer failed: {e}")
+                    stats["failed"] += 1
+                    continue
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                stats["answered"] += 1
+                stats["degraded"] += record["degraded"]
+                for stage in ("embed_ms", "retrieval_ms", "llm_ms"):
+                    stats[stage] += record["timings"].get(stage, 0.0)
+            out.flush()
+
+        for offset in range(0, len(items), batch_size):
+            batch = items[offset:offset + batch_size]
+            for item in batch:
+                # Occupations in the questions file are given, not guessed, so they filter
+                item["profile"] = db._merge_profile({"occupation": item["occupation"]}, item["location"])
+            search_queries = [db._build_search_query(item["question"], item["occupation"], item["location"])
+                              for item in batch]
+
+            embed_start = time.perf_counter()
+            try:
+                vectors = embedding.embed_documents(search_queries)
+            except Exception as e:
+                logger.warning(f"⚠️ Batch embedding failed, embedding per query: {e}")
+                vectors = [None] * len(batch)
+            # One embedding call per batch, so each question is charged its share
+            embed_ms = (time.perf_counter() - embed_start) * 1000 / len(batch)
+
+            # Search stays per question: each has its own profile filter and state catalogs,
+            # and a search over the precomputed vector is cheap next to the embedding call
+            for item, search_query, vector in zip(batch, search_queries, vectors):
+                retrieval_start = time.perf_counter()
+                try:
+                    hits = rag.retrieve_catalogs(search_query, k=top_k, where=rag.build_profile_filter(item["profile"]),
+                                                 catalogs=rag.route_catalogs(item["location"]), embedding=vector)
+                except Exception as e:
+                    logger.warning(f"⚠️ Retrieval failed for '{item['id']}': {e}")
+                    stats["failed"] += 1
+                    continue
+                timings = {"embed_ms": embed_ms, "retrieval_ms": (time.perf_counter() - retrieval_start) * 1000}
+                question = db._build_question(item["question"], item["occupation"], item["location"], item["language"])
+                pending.add(pool.submit(generate, item, question, search_query, hits, timings))
+
+                # Keep retrieval only a little ahead of generation
+                while len(pending) >= workers * 2:
+                    write_finished(block=True)
+            write_finished(block=False)
+
+            processed = min(offset + batch_size, len(items))
+            elapsed = time.perf_counter() - start
+            print(f"⏳ {processed}/{len(items)} questions retrieved, {stats['answered']} answered "
+                  f"({stats['answered'] / elapsed:.1f}/sec)")
+
+        while pending:
+            write_finished(block=True)
+
+    stats["seconds"] = time.perf_counter() - start
+    for stage in ("embed_ms", "retrieval_ms", "llm_ms"):
+        stats[stage] = stats[stage] / stats["answered"] if stats["answered"] else 0.0
+    print(f"✅ Answered {stats['answered']} questions in {stats['seconds']:.1f}s "
+          f"({stats['degraded']} degraded, {stats['failed']} failed); avg embed {stats['embed_ms']:.1f}ms, "
+          f"retrieval {stats['retrieval_ms']:.1f}ms, llm {stats['llm_ms']:.0f}ms")
+    return stats
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Answer a JSONL/CSV file of questions through the RAG pipeline")
+    parser.add_argument("input", help="Questions (.jsonl or .csv; fields: id, question, occupation, location, language)")
+    parser.add_argument("output", help="Answers JSONL (appended; existing ids are skipped)")
+    parser.add_argument("--batch-size", type=int, default=32, help="Questions embedded and retrieved together")
+    parser.add_argument("--workers", type=int, default=None, help="Concurrent LLM calls")
+    parser.add_argument("-k", "--top-k", type=int, default=5, help="Chunks retrieved per question")
+    parser.add_argument("--no-resume", action="store_true", help="Answer ids already in the output again")
+    parser.add_argument("--no-cache", action="store_true", help="Do not write answers to the answer cache")
+    args = parser.parse_args()
+
+    answer_batch(args.input, args.output, batch_size=args.batch_size, workers=args.workers, top_k=args.top_k,
+                 resume=not args.no_resume, warm_cache=not args.no_cache)
@@ -0,0 +1,166 @@
+# benchmark_vector_index.py - Query latency (p50/p99) and RSS of Chroma vs the matrix / IVF vector indexes
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+import numpy as np
+
+SAMPLE_QUERIES = [
+    "schemes for farmers in gujarat",
+    "kisan ke liye yojana",
+    "loan for small business",
+    "scholarship for students",
+    "help for fishermen boat",
+    "women self help group",
+    "pension for old age",
+    "housing scheme for poor families",
+    "borewell subsidy",
+    "महिलाओं के लिए योजना"
+]
+
+def rss_mb() -> float:
+    """Current resident set size in MB (peak RSS where /proc is missing)"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def percentile(values, q) -> float:
+    return float(np.percentile(values, q)) if values else 0.0
+
+def open_index(embedding, backend: str, dtype: str, nlist: int = None, nprobe: int = 8):
+    """Open (building if needed) the matrix or IVF index of the configured vectorstore"""
+    import enhanced_rag_database as rag
+    from vector_index import open_matrix_store
+
+    catalog = rag.manifest_fingerprint(rag.load_ingest_manifest())
+    chroma = lambda: rag.Chroma(persist_directory=rag.VECTORSTORE_PATH, embedding_function=embedding)
+    return open_matrix_store(rag.VECTORSTORE_PATH, embedding, chroma, catalog=catalog, dtype=dtype,
+                             ivf=backend == "ivf", nlist=nlist, nprobe=nprobe)
+
+def query_vectors(embedding, store, queries: int):
+    """Sample queries plus chunk texts, so every backend sees the same realistic mix"""
+    texts = list(SAMPLE_QUERIES)
+    documents = store.get(include=["documents"]).get("documents") or []
+    texts += [doc[:200] for doc in documents[:max(0, queries - len(texts))]]
+    return embedding.embed_documents(texts[:queries])
+
+def run_backend(backend: str, queries: int, k: int, dtype: str, nlist: int = None, nprobe: int = 8) -> dict:
+    """Open one backend in this process and time searches by precomputed query vectors"""
+    import enhanced_rag_database as rag
+
+    embedding = rag.get_embedding(timeout=300)
+    if embedding is None:
+        raise RuntimeError("Embedding model not available")
+
+    if backend != "chroma":
+        # Build outside the measurement so RSS reflects a warm start from the files on disk
+        if open_index(embedding, backend, dtype, nlist, nprobe) is None:
+            raise RuntimeError(f"Could not open the {backend} index")
+
+    rss_before = rss_mb()
+    open_start = time.perf_counter()
+    if backend != "chroma":
+        store = open_index(embedding, backend, dtype, nlist, nprobe)
+    else:
+        store = rag.Chroma(persist_directory=rag.VECTORSTORE_PATH, embedding_function=embedding)
+    open_ms = (time.perf_counter() - open_start) * 1000
+
+    vectors = query_vectors(embedding, store, queries)
+
+    for vector in vectors[:5]:
+        store.similarity_search_by_vector_with_relevance_scores(vector, k=k)
+
+    latencies = []
+    results = []
+    for vector in vectors:
+        start = time.perf_counter()
+        hits = store.similarity_search_by_vector_with_relevance_scores(vector, k=k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append([doc.page_content for doc, _ in hits])
+
+    return {
+        "backend": backend if backend == "chroma" else f"{backend} ({dtype})",
+        "queries": len(latencies),
+        "open_ms": open_ms,
+        "p50_ms": percentile(latencies, 50),
+        "p99_ms": percentile(latencies, 99),
+        "mean_ms": float(np.mean(latencies)) if latencies else 0.0,
+        "rss_mb": rss_mb(),
+        "rss_store_mb": rss_mb() - rss_before,
+        "results": results
+    }
+
+def overlap_at_k(a, b) -> float:
+    """Mean fraction of shared results per query"""
+    shares = [len(set(x) & set(y)) / max(1, len(x)) for x, y in zip(a, b)]
+    return float(np.mean(shares)) if shares else 0.0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark Chroma against the matrix and IVF vector indexes")
+    parser.add_argument("--backend", choices=["chroma", "matrix", "ivf", "all"], default="all")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per backend")
+    parser.add_argument("-k", type=int, default=5, help="Results per query")
+    parser.add_argument("--dtype", choices=["float16", "int8"], default="float16")
+    parser.add_argument("--nlist", type=int, default=None, help="IVF lists (default ~4*sqrt(n))")
+    parser.add_argument("--nprobe", type=int, default=8, help="IVF lists probed per query")
+    parser.add_argument("--recall", action="store_true", help="IVF recall@k vs exact search for a range of nprobe")
+    parser.add_argument("--json", action="store_true", help="Print one JSON result (used for subprocesses)")
+    args = parser.parse_args()
+
+    if args.recall:
+        import enhanced_rag_database as rag
+        from vector_index import recall_report
+
+        embedding = rag.get_embedding(timeout=300)
+        store = open_index(embedding, "ivf", args.dtype, args.nlist, args.nprobe) if embedding else None
+        if store is None:
+            print("❌ Could not open the IVF index")
+            sys.exit(1)
+        print(f"\n📊 IVF recall@{args.k}: {len(store)} chunks, {len(store.lists)} lists, {args.queries} queries")
+        print(f"{'nprobe':>8}{'recall':>10}{'p50 ms':>10}{'p99 ms':>10}{'scanned':>10}")
+        for row in recall_report(store, query_vectors(embedding, store, args.queries), k=args.k):
+            print(f"{row['nprobe']:>8}{row['recall']:>10.3f}{row['p50_ms']:>10.2f}{row['p99_ms']:>10.2f}"
+                  f"{row['scanned_fraction']:>10.1%}")
+        sys.exit(0)
+
+    if args.backend != "all":
+        report = run_backend(args.backend, args.queries, args.k, args.dtype, args.nlist, args.nprobe)
+        if args.json:
+            print("RESULT " + json.dumps(report, ensure_ascii=False))
+        else:
+            print(f"{report['backend']}: p50 {report['p50_ms']:.2f}ms, p99 {report['p99_ms']:.2f}ms, "
+                  f"RSS {report['rss_mb']:.0f} MB")
+        sys.exit(0)
+
+    # One process per backend so RSS numbers do not include the other store
+    reports = []
+    for backend in ("chroma", "matrix", "ivf"):
+        command = [sys.executable, os.path.abspath(__file__), "--backend", backend, "--queries", str(args.queries),
+                   "-k", str(args.k), "--dtype", args.dtype, "--nprobe", str(args.nprobe), "--json"]
+        if args.nlist:
+            command += ["--nlist", str(args.nlist)]
+        output = subprocess.run(command, capture_output=True, text=True).stdout
+        lines = [line for line in output.splitlines() if line.startswith("RESULT ")]
+        if not lines:
+            print(f"❌ {backend} benchmark failed")
+            sys.exit(1)
+        reports.append(json.loads(lines[-1][len("RESULT "):]))
+
+    print(f"\n📊 {args.queries} queries, top-{args.k} (search by vector, embedding excluded)")
+    print(f"{'backend':<18}{'open ms':>10}{'p50 ms':>10}{'p99 ms':>10}{'RSS MB':>10}{'store MB':>10}")
+    for report in reports:
+        print(f"{report['backend']:<18}{report['open_ms']:>10.1f}{report['p50_ms']:>10.2f}{report['p99_ms']:>10.2f}"
+              f"{report['rss_mb']:>10.0f}{report['rss_store_mb']:>10.1f}")
+    print(f"Overlap@{args.k} with exact matrix search: chroma (HNSW) "
+          f"{overlap_at_k(reports[1]['results'], reports[0]['results']):.3f}, "
+          f"ivf (nprobe {args.nprobe}) {overlap_at_k(reports[1]['results'], reports[2]['results']):.3f}")
@@ -1,6 +1,8 @@
 # config.py - Enhanced with Groq API
 CONFIG = {
     "schemes_csv_path": "Government_schemes_final_english.csv",
+    # State catalogs: name -> CSV path, each indexed into its own vectorstore (schemes_csv_path is the central one)
+    "catalogs": {},
     "audio_timeout": 6,
     "confidence_threshold": 0.3,
     "voice_rate": 0.9,
@@ -19,10 +21,71 @@ CONFIG = {
     "groq_temperature": 0.1,
     "rag_chunk_size": 1000,
     "rag_chunk_overlap": 100,
+    # Streaming ingest (ingest_pipeline.py)
+    "ingest_chunk_rows": 2000,
+    "embed_batch_size": 64,
+    "embed_workers": 2,
+    "vectorstore_write_batch": 500,
     "max_schemes_per_response": 3,
+    # Hybrid retrieval (BM25 + vector, reciprocal rank fusion)
+    "hybrid_retrieval": True,
+    "hybrid_rrf_k": 60,
+    "hybrid_fetch_k": 20,
+    "vector_backend": "chroma",
+    "vector_index_dtype": "float16",
+    "ivf_nlist": 0,
+    "ivf_nprobe": 8,
     # Enable RAG
     "use_rag": True,
-    "rag_enabled": True
+    "rag_enabled": True,
+    # Answer cache (in front of answer_schemes_question / search_by_context)
+    "answer_cache_path": "answer_cache.db",
+    "answer_cache_max_entries": 2000,
+    "answer_cache_ttl": 24 * 3600,
+    "answer_cache_stale_ttl": 6 * 3600,
+    "answer_cache_negative_ttl": 15 * 60,
+    "answer_cache_prune_interval": 3600,
+    # Semantic near-duplicate cache (cosine similarity of query embeddings)
+    "semantic_cache_enabled": True,
+    "semantic_cache_threshold": 0.9,
+    "semantic_cache_max_entries": 2000,
+    # Streaming voice answers: speak each sentence as soon as the LLM finishes it
+    "stream_voice_answers": True,
+    "stream_max_sentences": 3,
+    # LLM backend (llm_backends.py): groq / openai (compatible local server) / ollama / fake
+    "llm_backend": "groq",
+    "llm_base_url": "http://localhost:8000/v1",
+    "llm_model": "local-model",
+    "ollama_host": "http://localhost:11434",
+    "llm_timeout": 8.0,
+    "llm_max_retries": 2,
+    "llm_retry_backoff": 0.5,
+    "llm_deadline": 15.0,
+    "llm_breaker_failures": 3,
+    "llm_breaker_reset": 30.0,
+    "llm_max_concurrency": 4,
+    # Generation profiles: "voice" skips the reasoning model and caps output for short spoken answers;
+    # "reasoning" is the original R1 setup (its <think> block is generated, then stripped)
+    "llm_profile": "voice",
+    "llm_profiles": {
+        "voice": {"groq_model": "llama-3.3-70b-versatile", "max_tokens": 200,
+                  "stop": ["\n\nQuestion:", "\n\nContext:", "\n\nInstructions:"]},
+        "reasoning": {"groq_model": "deepseek-r1-distill-llama-70b", "max_tokens": 1024, "stop": []}
+    },
+    # Per-turn latency budget (latency_budget.py): seconds from query to first answer
+    "voice_turn_budget": 8.0,
+    "telegram_turn_budget": 10.0,
+    "stage_estimates": {"stt": 3.0, "retrieval": 0.8, "llm": 3.0, "tts": 1.5},
+    "tts_cache_max_files": 500,
+    # Prompt context (context_builder.py): token budget, chunks per scheme, MMR relevance/diversity trade-off
+    "context_token_budget": 600,
+    "context_max_chunks_per_scheme": 2,
+    "context_mmr_lambda": 0.7,
+    "faq_enabled": True,
+    "faq_db_path": "faq_answers.db",
+    "faq_workers": 4,
+    # Seconds between checks of the ingest manifests for a re-ingest (FAQ store / answer cache keys)
+    "catalog_check_interval": 5.0
 }
 
 PHRASES = {
@@ -0,0 +1,179 @@
+# context_builder.py - Token-budgeted prompt context from retrieved chunks
+import re
+import math
+import logging
+import threading
+from typing import Any, Dict, List, Tuple
+
+from config import CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Question intent -> chunk sections worth sending (section names from SCHEME_SECTIONS, plus "facts")
+INTENT_SECTIONS = {
+    "eligibility": ["eligibility", "facts", "details"],
+    "documents": ["documents"],
+    "application": ["application", "facts"],
+    "benefits": ["benefits", "details"]
+}
+
+INTENT_KEYWORDS = {
+    "eligibility": ["eligible", "eligibility", "who can", "qualify", "criteria", "patrata", "yogya",
+                    "पात्र", "पात्रता", "योग्य", "kaun le sakta"],
+    "documents": ["document", "documents", "papers", "certificate", "kagaz", "kagzat", "dastavez",
+                  "दस्तावेज", "कागज", "प्रमाण पत्र"],
+    "application": ["apply", "application", "how to get", "register", "registration", "aavedan", "avedan",
+                    "kaise milega", "kaise le", "आवेदन", "कैसे"],
+    "benefits": ["benefit", "benefits", "amount", "how much", "kitna", "kitne", "paisa", "labh", "fayda",
+                 "लाभ", "फायदा", "कितना", "राशि"]
+}
+
+# Sent when the intent is unknown
+DEFAULT_SECTIONS = ["details", "benefits", "eligibility", "facts"]
+
+HEADER_PATTERN = re.compile(r'^Scheme Name:[^\n]*\n')
+WORD_PATTERN = re.compile(r"[a-z0-9]+|[\u0900-\u097F]+")
+
+_stats_lock = threading.Lock()
+_stats = {"calls": 0, "tokens_in": 0, "tokens_out": 0, "chunks_in": 0, "chunks_out": 0}
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token, Devanagari ~2)"""
+    if not text:
+        return 0
+    devanagari = len(re.findall(r'[\u0900-\u097F]', text))
+    return math.ceil((len(text) - devanagari) / 4 + devanagari / 2)
+
+def detect_intent(question: str) -> str:
+    """Which part of a scheme the question is about (None if unclear)"""
+    text = (question or "").lower()
+    best, best_hits = None, 0
+    for intent, keywords in INTENT_KEYWORDS.items():
+        hits = sum(1 for keyword in keywords if keyword in text)
+        if hits > best_hits:
+            best, best_hits = intent, hits
+    return best
+
+def _terms(text: str) -> set:
+    return set(WORD_PATTERN.findall(text.lower()))
+
+def _similarity(a: Tuple[Any, set], b: Tuple[Any, set]) -> float:
+    """1.0 for chunks of the same scheme, else word overlap (Jaccard)"""
+    if a[0] is not None and a[0] == b[0]:
+        return 1.0
+    if not a[1] or not b[1]:
+        return 0.0
+    return len(a[1] & b[1]) / len(a[1] | b[1])
+
+def build_context(question: str, hits: List[Tuple[Any, float]], token_budget: int = None,
+                  max_per_scheme: int = None, mmr_lambda: float = None) -> List[Any]:
+    """Pick and trim retrieved chunks to fit a token budget -> documents for the prompt
+
+    - keeps only sections relevant to the question's intent (a scheme with no
+      such section keeps its best chunk)
+    - at most max_per_scheme chunks per scheme, exact duplicates dropped
+    - MMR ordering so different schemes are covered before more of the same one
+    - repeated "Scheme Name:" headers within a scheme are removed
+    """
+    from langchain.schema import Document
+
+    token_budget = token_budget or CONFIG.get("context_token_budget", 600)
+    max_per_scheme = max_per_scheme or CONFIG.get("context_max_chunks_per_scheme", 2)
+    mmr_lambda = CONFIG.get("context_mmr_lambda", 0.7) if mmr_lambda is None else mmr_lambda
+
+    if not hits:
+        return []
+
+    intent = detect_intent(question)
+    wanted = INTENT_SECTIONS.get(intent, DEFAULT_SECTIONS)
+
+    # Relevance from rank: vector and RRF scores are on different scales
+    candidates = []
+    seen_texts = set()
+    for rank, (doc, _) in enumerate(hits):
+        text = doc.page_content or ""
+        if text in seen_texts:
+            continue
+        seen_texts.add(text)
+        metadata = doc.metadata or {}
+        candidates.append({
+            "doc": doc,
+            "scheme": metadata.get("scheme_id", metadata.get("scheme_name")),
+            "section": metadata.get("section"),
+            "relevance": 1.0 - rank / len(hits),
+            "key": (metadata.get("scheme_id", metadata.get("scheme_name")), _terms(text))
+        })
+
+    # Section filter, keeping each scheme's best chunk as a fallback
+    relevant = [c for c in candidates if c["section"] is None or c["section"] in wanted]
+    covered = {c["scheme"] for c in relevant}
+    for candidate in candidates:
+        if candidate["scheme"] not in covered:
+            relevant.append(candidate)
+            covered.add(candidate["scheme"])
+
+    # MMR selection under the per-scheme cap
+    selected = []
+    per_scheme = {}
+    pool = list(relevant)
+    while pool:
+        best, best_score = None, None
+        for candidate in pool:
+            redundancy = max((_similarity(candidate["key"], chosen["key"]) for chosen in selected), default=0.0)
+            score = mmr_lambda * candidate["relevance"] - (1 - mmr_lambda) * redundancy
+            if best_score is None or score > best_score:
+                best, best_score = candidate, score
+        pool.remove(best)
+        if per_scheme.get(best["scheme"], 0) >= max_per_scheme:
+            continue
+        per_scheme[best["scheme"]] = per_scheme.get(best["scheme"], 0) + 1
+        selected.append(best)
+
+    # Fill the budget in MMR order; later chunks of an already included scheme drop the name header
+    chosen = []
+    used = 0
+    included = set()
+    for candidate in selected:
+        text = candidate["doc"].page_content
+        if candidate["scheme"] in included:
+            text = HEADER_PATTERN.sub("", text, count=1)
+        tokens = estimate_tokens(text)
+        if used + tokens > token_budget:
+            room = token_budget - used
+            if room < 40:
+                break
+            # Partial chunk, cut on a word boundary
+            text = text[:room * 4].rsplit(" ", 1)[0] + " ..."
+            tokens = estimate_tokens(text)
+        chosen.append((candidate, text))
+        included.add(candidate["scheme"])
+        used += tokens
+        if used >= token_budget:
+            break
+
+    # Keep each scheme's chunks together so header-less chunks follow their scheme's header
+    group_order = {}
+    for candidate, _ in chosen:
+        group_order.setdefault(candidate["scheme"], len(group_order))
+    chosen.sort(key=lambda item: group_order[item[0]["scheme"]])
+    documents = [Document(page_content=text, metadata=candidate["doc"].metadata) for candidate, text in chosen]
+
+    tokens_in = sum(estimate_tokens(doc.page_content) for doc, _ in hits)
+    with _stats_lock:
+        _stats["calls"] += 1
+        _stats["tokens_in"] += tokens_in
+        _stats["tokens_out"] += used
+        _stats["chunks_in"] += len(hits)
+        _stats["chunks_out"] += len(documents)
+
+    logger.info(f"✂️ Context: {len(documents)}/{len(hits)} chunks, ~{used} tokens "
+                f"(saved ~{tokens_in - used} of {tokens_in}, intent: {intent or 'general'})")
+    return documents
+
+def get_context_stats() -> Dict[str, Any]:
+    """Prompt context tokens before/after building, across all calls"""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["tokens_saved"] = stats["tokens_in"] - stats["tokens_out"]
+    stats["saved_ratio"] = stats["tokens_saved"] / stats["tokens_in"] if stats["tokens_in"] else 0.0
+    return stats
@@ -6,15 +6,24 @@ import pandas as pd
 import sqlite3
 from typing import List, Dict, Any, Optional
 import hashlib
+import threading
+import time
 from datetime import datetime
 
+from config import CONFIG
+from synonym_dict import SYNONYMS, get_occupation_keywords
+from answer_cache import (get_answer_cache, get_semantic_cache, make_cache_key, normalize_query,
+                          SemanticCache, SingleFlight, CACHE_OK, CACHE_NEGATIVE, CACHE_SKIP)
+from answer_streaming import iter_voice_sentences, split_voice_sentences
+from llm_backends import create_llm, backend_configured, LLMUnavailable
+from latency_budget import timed_stage
+from context_builder import build_context, get_context_stats, estimate_tokens
+from faq_precompute import lookup_faq, get_faq_store, cached_catalog
+
 # RAG imports
 try:
     from langchain_chroma import Chroma
-    from langchain_groq import ChatGroq
-    from langchain.chains import RetrievalQA
     from langchain.schema import Document
-    from langchain_text_splitters import RecursiveCharacterTextSplitter
     from langchain_huggingface import HuggingFaceEmbeddings
     from langchain.prompts import PromptTemplate
     import warnings
@@ -28,6 +37,10 @@ logger = logging.getLogger(__name__)
 
 # Global variables
 working_dir = os.path.dirname(os.path.abspath(__file__))
+VECTORSTORE_PATH = os.path.join(working_dir, "schemes_vectorstore")
+# One vectorstore per state catalog, each with its own ingest manifest
+STATE_VECTORSTORES_PATH = os.path.join(working_dir, "state_vectorstores")
+CENTRAL_CATALOG = "central"
 
 # Load config
 try:
@@ -41,118 +54,575 @@ except Exception as e:
 if GROQ_API_KEY:
     os.environ["GROQ_API_KEY"] = GROQ_API_KEY
 
-# Initialize models
-if RAG_AVAILABLE and GROQ_API_KEY:
-    try:
-        embedding = HuggingFaceEmbeddings(
-            model_name="sentence-transformers/all-MiniLM-L6-v2",
-            model_kwargs={'device': 'cpu'}
-        )
+# Model readiness states
+MODEL_COLD = "cold"
+MODEL_WARMING = "warming"
+MODEL_READY = "ready"
+MODEL_FAILED = "failed"
+MODEL_UNAVAILABLE = "unavailable"
 
-        llm = ChatGroq(
-            model="deepseek-r1-distill-llama-70b",
-            temperature=0.1
-        )
-    except Exception as e:
-        print(f"Model initialization error: {e}")
-        embedding = None
-        llm = None
-else:
-    embedding = None
-    llm = None
-
-def process_csv_to_documents(csv_file_path):
-    """Convert CSV to documents"""
-    try:
-        df = pd.read_csv(csv_file_path)
-        print(f"✅ Loaded CSV: {df.shape[0]} rows, {df.shape[1]} columns")
-        
-        documents = []
-        
-        for idx, row in df.iterrows():
-            scheme_text = f"""
-SCHEME INFORMATION:
-Department: {row.get('Department', 'N/A')}
-Scheme Name: {row.get('Name', 'N/A')}
+class ModelHandles:
+    """Embedding model + LLM, built on first use or by a background warm-up instead of at import"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded = threading.Event()
+        self._thread = None
+        self.embedding = None
+        self.llm = None
+        self.state = MODEL_COLD
+        self.error = None
+        self.load_seconds = None
+    
+    @staticmethod
+    def configured() -> bool:
+        """LangChain installed and the selected LLM backend configured (e.g. a Groq key in config.json or the environment)"""
+        return bool(RAG_AVAILABLE and backend_configured(api_key=GROQ_API_KEY))
+    
+    def _load(self):
+        """Construct both models (runs once, on the warm-up thread)"""
+        start = time.perf_counter()
+        try:
+            embedding = HuggingFaceEmbeddings(
+                model_name="sentence-transformers/all-MiniLM-L6-v2",
+                model_kwargs={'device': 'cpu'}
+            )
+            # Loading the weights is lazy inside sentence-transformers; pay it here, not on a user's query
+            embedding.embed_query("warm up")
+            
+            # Backend chosen by CONFIG["llm_backend"], wrapped with timeouts/retries/circuit breaker
+            llm = create_llm()
+            
+            self.embedding = embedding
+            self.llm = llm
+            self.load_seconds = time.perf_counter() - start
+            self.state = MODEL_READY
+            logger.info(f"✅ Models ready in {self.load_seconds:.1f}s")
+        except Exception as e:
+            print(f"Model initialization error: {e}")
+            self.error = str(e)
+            self.state = MODEL_FAILED
+        finally:
+            self._loaded.set()
+    
+    def start_warmup(self) -> str:
+        """Start loading in the background (no-op if already started); returns the current state"""
+        with self._lock:
+            if self.state == MODEL_COLD:
+                if not self.configured():
+                    self.state = MODEL_UNAVAILABLE
+                    self._loaded.set()
+                else:
+                    self.state = MODEL_WARMING
+                    self._thread = threading.Thread(target=self._load, name="model-warmup", daemon=True)
+                    self._thread.start()
+            return self.state
+    
+    def wait(self, timeout: float = None) -> bool:
+        """Block until loading finished (starting it if needed); True if the models are usable"""
+        self.start_warmup()
+        self._loaded.wait(timeout)
+        return self.state == MODEL_READY
+    
+    def is_ready(self) -> bool:
+        return self.state == MODEL_READY
+    
+    def status(self) -> Dict[str, Any]:
+        """Readiness state for health checks"""
+        return {
+            "state": self.state,
+            "load_seconds": self.load_seconds,
+            "error": self.error,
+            "llm": self.llm.get_stats() if self.llm is not None else None
+        }
 
-DETAILS:
-{row.get('Details', 'N/A')}
+_models = ModelHandles()
 
-BENEFITS:
-{row.get('Benefits', 'N/A')}
+def start_model_warmup() -> str:
+    """Kick off background model loading; call once at process start"""
+    return _models.start_warmup()
 
-ELIGIBILITY CRITERIA:
-{row.get('Eligibility', 'N/A')}
+def models_ready() -> bool:
+    """True once the embedding model and LLM are loaded"""
+    return _models.is_ready()
 
-APPLICATION PROCESS:
-{row.get('Application_Process', 'N/A')}
+def get_model_status() -> Dict[str, Any]:
+    """Model readiness: state (cold/warming/ready/failed/unavailable), load time, error"""
+    return _models.status()
 
-REQUIRED DOCUMENTS:
-{row.get('Document_Required', 'N/A')}
+def get_embedding(timeout: float = None):
+    """Embedding model, waiting for warm-up if needed (None if it failed or timed out)"""
+    return _models.embedding if _models.wait(timeout) else None
 
-TARGET DEMOGRAPHICS:
-Gender: {row.get('Gender', 'N/A')}
-Age Range: {row.get('Min Age', 'N/A')} to {row.get('Max Age', 'N/A')} years
-Caste: {row.get('Caste', 'N/A')}
-Minority: {row.get('Minority', 'N/A')}
+def get_llm(timeout: float = None):
+    """LLM client, waiting for warm-up if needed (None if it failed or timed out)"""
+    return _models.llm if _models.wait(timeout) else None
 
-OFFICIAL LINK:
-{row.get('URL', 'N/A')}
-            """
-            
-            doc = Document(
-                page_content=scheme_text.strip(),
-                metadata={
-                    "scheme_id": idx,
-                    "department": str(row.get('Department', '')).lower(),
-                    "scheme_name": str(row.get('Name', '')),
-                    "gender": str(row.get('Gender', '')).lower(),
-                    "caste": str(row.get('Caste', '')).lower(),
-                    "source": "government_schemes_csv"
-                }
-            )
-            documents.append(doc)
-        
-        print(f"✅ Created {len(documents)} scheme documents")
-        return documents
-        
-    except Exception as e:
-        print(f"❌ Error processing CSV: {e}")
+def __getattr__(name):
+    # Old callers read rag.embedding / rag.llm directly; load on first access
+    if name == "embedding":
+        return get_embedding()
+    if name == "llm":
+        return get_llm()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+MANIFEST_FILENAME = "ingest_manifest.json"
+SNAPSHOT_FILENAME = "catalog_snapshot.json"
+
+def file_hash(path):
+    """SHA-256 of a file's bytes"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def scheme_keys(df, seen=None):
+    """Stable scheme ids from Department + Name (row order independent, duplicates numbered)
+    
+    Pass the same `seen` dict across CSV chunks to keep duplicate numbering consistent.
+    """
+    keys = []
+    seen = {} if seen is None else seen
+    for department, name in zip(df.get('Department', pd.Series([''] * len(df))).fillna(''),
+                                df.get('Name', pd.Series([''] * len(df))).fillna('')):
+        base = hashlib.sha1(f"{str(department).strip().lower()}|{str(name).strip().lower()}".encode("utf-8")).hexdigest()[:16]
+        count = seen.get(base, 0)
+        seen[base] = count + 1
+        keys.append(base if count == 0 else f"{base}-{count}")
+    return keys
+
+def read_catalog_csv(csv_path, chunksize=None):
+    """Read a catalog CSV with every field as text ("" when empty)
+    
+    Without inferred dtypes a row's values (and so its content hash) don't
+    depend on the other rows of its chunk: one blank "Min Age" would otherwise
+    turn the chunk's "18" into "18.0" and re-embed all of it.
+    """
+    return pd.read_csv(csv_path, dtype=str, keep_default_na=False, chunksize=chunksize)
+
+def scheme_content_hashes(df):
+    """Hash of every field of each scheme row (columns joined column-wise, not per row)
+    
+    Expects a frame from read_catalog_csv(), so values hash the same in any chunk.
+    """
+    if df.empty:
         return []
+    values = df[sorted(df.columns)].astype(object).where(df[sorted(df.columns)].notna(), "").astype(str)
+    joined = values.iloc[:, 0]
+    for column in values.columns[1:]:
+        joined = joined + "\x1f" + values[column]
+    return [hashlib.sha256(text.encode("utf-8")).hexdigest() for text in joined]
+
+# Chunks are one per scheme section; bump when chunking or chunk metadata changes so stores get rebuilt
+CHUNKER_VERSION = "sections-v3"
+
+SCHEME_SECTIONS = [
+    ("Details", "details", "DETAILS"),
+    ("Benefits", "benefits", "BENEFITS"),
+    ("Eligibility", "eligibility", "ELIGIBILITY CRITERIA"),
+    ("Document_Required", "documents", "REQUIRED DOCUMENTS"),
+    ("Application_Process", "application", "APPLICATION PROCESS")
+]
+
+# Structured columns rendered as text in the "facts" chunk, so BM25 and the LLM context can see them
+SCHEME_FACTS = [
+    ("Department", "Department"),
+    ("Gender", "Gender"),
+    ("Caste", "Caste"),
+    ("Minority", "Minority"),
+    ("State", "State"),
+    ("URL", "Official Link")
+]
 
-def create_vectorstore(documents):
-    """Create vectorstore"""
+EMPTY_FIELD_VALUES = {"", "n/a", "na", "nan", "none", "null", "-", "--"}
+
+def _split_long_section(text, max_chars):
+    """Split an oversized section on sentence boundaries (no overlap)"""
+    import re
+    
+    parts = []
+    current = ""
+    for sentence in re.split(r'(?<=[.।!?])\s+', text):
+        if current and len(current) + len(sentence) + 1 > max_chars:
+            parts.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}".strip()
+    if current:
+        parts.append(current)
+    return parts
+
+def scheme_facts(df):
+    """Per-row "Label: value" lines for the structured eligibility fields (empty fields skipped)"""
+    def cleaned(column):
+        if column not in df.columns:
+            return pd.Series([''] * len(df), index=df.index)
+        values = df[column].fillna('').astype(str).str.strip()
+        return values.where(~values.str.lower().isin(EMPTY_FIELD_VALUES), '')
+    
+    def age(column):
+        if column not in df.columns:
+            return pd.Series([''] * len(df), index=df.index)
+        numbers = pd.to_numeric(df[column], errors='coerce')
+        return numbers.map(lambda value: '' if pd.isna(value) else str(int(value)))
+    
+    facts = pd.Series([''] * len(df), index=df.index)
+    for column, label in SCHEME_FACTS[:3]:
+        values = cleaned(column)
+        facts = facts + (label + ": " + values + "\n").where(values != '', '')
+    
+    min_age, max_age = age('Min Age'), age('Max Age')
+    ages = ("Age Range: " + min_age + " to " + max_age + " years\n").where((min_age != '') & (max_age != ''), '')
+    ages = ages.where((min_age == '') | (max_age != ''), "Age Range: " + min_age + " years and above\n")
+    ages = ages.where((max_age == '') | (min_age != ''), "Age Range: up to " + max_age + " years\n")
+    facts = facts + ages
+    
+    for column, label in SCHEME_FACTS[3:]:
+        values = cleaned(column)
+        facts = facts + (label + ": " + values + "\n").where(values != '', '')
+    return facts.str.rstrip("\n")
+
+def chunk_scheme_sections(df, keys, hashes, max_chars=None):
+    """One chunk per non-empty scheme section, tagged with scheme_id and section
+    
+    The structured fields (department, gender, age range, caste, state, link)
+    go into an extra "facts" chunk, since they are otherwise only metadata.
+    
+    Returns (chunk_ids, texts, metadatas, chunk_counts) with ids "<scheme_id>:<n>".
+    """
+    max_chars = max_chars or CONFIG.get("rag_chunk_size", 1000)
+    base_metadatas = scheme_metadatas(df, keys, hashes)
+    
+    names = df['Name'].fillna('').astype(str) if 'Name' in df.columns else pd.Series([''] * len(df), index=df.index)
+    header = "Scheme Name: " + names.str.strip() + "\n"
+    
+    # (row position, section order) -> section text, built one column at a time
+    pieces = {}
+    for order, (column, section, label) in enumerate(SCHEME_SECTIONS):
+        if column not in df.columns:
+            continue
+        values = df[column].fillna('').astype(str).str.strip()
+        present = ~values.str.lower().isin(EMPTY_FIELD_VALUES)
+        prefixes = header[present] + label + ":\n"
+        for position, prefix, body in zip(present.to_numpy().nonzero()[0], prefixes, values[present]):
+            pieces[(position, order)] = (section, prefix, body)
+    
+    facts = scheme_facts(df)
+    present = facts != ''
+    for position, prefix, body in zip(present.to_numpy().nonzero()[0], header[present] + "ELIGIBILITY FACTS:\n",
+                                      facts[present]):
+        pieces[(position, len(SCHEME_SECTIONS))] = ("facts", prefix, body)
+    
+    chunk_ids, chunk_texts, chunk_metadatas = [], [], []
+    chunk_counts = {sid: 0 for sid in keys}
+    
+    for (position, _), (section, prefix, body) in sorted(pieces.items()):
+        sid = keys[position]
+        # Every part of an oversized section keeps the scheme name + section label
+        parts = [body] if len(prefix) + len(body) <= max_chars else _split_long_section(body, max_chars - len(prefix))
+        for part in parts:
+            chunk_ids.append(f"{sid}:{chunk_counts[sid]}")
+            chunk_texts.append(prefix + part)
+            chunk_metadatas.append(dict(base_metadatas[position], section=section))
+            chunk_counts[sid] += 1
+    
+    return chunk_ids, chunk_texts, chunk_metadatas, chunk_counts
+
+PROFILE_OCCUPATIONS = ["farmer", "fisherman", "business", "student"]
+
+CASTE_PATTERNS = {
+    "sc": r"\bsc\b|scheduled caste",
+    "st": r"\bst\b|scheduled tribe",
+    "obc": r"\bobc\b|backward",
+    "ews": r"\bews\b|economically weaker",
+    "general": r"general"
+}
+
+GENDER_ANY_VALUES = ["", "all", "any", "both", "nan"]
+DEFAULT_MIN_AGE = 0
+DEFAULT_MAX_AGE = 150
+
+def scheme_metadatas(df, keys, hashes):
+    """Chunk metadata for each row, including the eligibility fields used by profile filters"""
+    import re
+    
+    def values(name):
+        if name in df.columns:
+            return df[name].fillna('').astype(str)
+        return pd.Series([''] * len(df), index=df.index)
+    
+    def ages(name, default):
+        if name in df.columns:
+            return pd.to_numeric(df[name], errors='coerce').fillna(default).astype(int).tolist()
+        return [default] * len(df)
+    
+    # Occupation tags from scheme text (Chroma metadata can't hold lists, so one flag per occupation)
+    text = (values('Name') + " " + values('Details') + " " + values('Eligibility') + " " + values('Benefits')).str.lower()
+    occupation_flags = {}
+    for occupation in PROFILE_OCCUPATIONS:
+        pattern = "|".join(re.escape(keyword.lower()) for keyword in get_occupation_keywords(occupation))
+        occupation_flags[occupation] = text.str.contains(pattern, regex=True).tolist()
+    general = [not any(flags) for flags in zip(*occupation_flags.values())]
+    
+    caste = values('Caste').str.lower()
+    caste_flags = {name: caste.str.contains(pattern, regex=True).tolist() for name, pattern in CASTE_PATTERNS.items()}
+    caste_any = (caste.str.strip().isin(["", "nan"]) | caste.str.contains(r"\ball\b|\bany\b", regex=True)).tolist()
+    caste_any = [flag or not any(specific) for flag, specific in zip(caste_any, zip(*caste_flags.values()))]
+    
+    states = values('State').str.strip().str.lower().replace("", "all").tolist()
+    min_ages = ages('Min Age', DEFAULT_MIN_AGE)
+    max_ages = ages('Max Age', DEFAULT_MAX_AGE)
+    
+    metadatas = []
+    for i, (scheme_id, scheme_hash, department, name, gender, caste_text) in enumerate(zip(
+            keys, hashes, values('Department'), values('Name'), values('Gender'), caste)):
+        metadata = {
+            "scheme_id": scheme_id,
+            "scheme_hash": scheme_hash,
+            "department": department.lower(),
+            "scheme_name": name,
+            "gender": gender.strip().lower(),
+            "caste": caste_text,
+            "state": states[i],
+            "min_age": min_ages[i],
+            "max_age": max_ages[i],
+            "source": "government_schemes_csv",
+            "occ_general": general[i]
+        }
+        for occupation, flags in occupation_flags.items():
+            metadata[f"occ_{occupation}"] = flags[i]
+        metadata["caste_any"] = caste_any[i]
+        for caste_name, flags in caste_flags.items():
+            metadata[f"caste_{caste_name}"] = flags[i]
+        metadatas.append(metadata)
+    
+    return metadatas
+
+def build_profile_filter(profile):
+    """Chroma `where` predicate restricting search to chunks the user is eligible for
+    
+    profile keys (all optional): gender, age, caste, state, occupation.
+    Returns None when the profile has nothing to filter on.
+    """
+    if not profile:
+        return None
+    
+    clauses = []
+    
+    gender = (profile.get("gender") or "").strip().lower()
+    if profile.get("occupation") == "women":
+        gender = "female"
+    if gender:
+        clauses.append({"gender": {"$in": [gender] + GENDER_ANY_VALUES}})
+    
+    age = profile.get("age")
+    if age is not None:
+        try:
+            age = int(age)
+            clauses.append({"min_age": {"$lte": age}})
+            clauses.append({"max_age": {"$gte": age}})
+        except (TypeError, ValueError):
+            pass
+    
+    caste = (profile.get("caste") or "").strip().lower()
+    if caste in CASTE_PATTERNS:
+        clauses.append({"$or": [{"caste_any": True}, {f"caste_{caste}": True}]})
+    
+    state = (profile.get("state") or profile.get("location") or "").strip().lower()
+    if state:
+        clauses.append({"state": {"$in": [state, "all"]}})
+    
+    occupation = profile.get("occupation")
+    if occupation in PROFILE_OCCUPATIONS:
+        clauses.append({"$or": [{"occ_general": True}, {f"occ_{occupation}": True}]})
+    
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+def profile_signature(profile):
+    """Stable text form of a profile for cache keys"""
+    if not profile:
+        return ""
+    return ",".join(f"{k}={profile[k]}" for k in sorted(profile) if profile[k] not in (None, ""))
+
+def catalog_hash(schemes, chunker=CHUNKER_VERSION):
+    """Order-independent fingerprint of the indexed chunks: chunker version + every scheme's hash and chunk ids
+    
+    A re-ingest that only changes chunking changes it too, so derived indexes
+    and precomputed answers keyed by it are rebuilt.
+    """
+    entries = sorted(f"{sid}:{e['hash']}:{e.get('chunks', 0)}" for sid, e in schemes.items())
+    return hashlib.sha256("\n".join([chunker] + entries).encode("utf-8")).hexdigest()
+
+def manifest_fingerprint(manifest):
+    """Index fingerprint of an ingest manifest ("" if there is none), derived from its contents
+    
+    Recomputed rather than read from "catalog_hash", so manifests written
+    before the chunker version was part of the hash still invalidate.
+    """
+    if not manifest:
+        return ""
+    return catalog_hash(manifest.get("schemes") or {}, manifest.get("chunker", ""))
+
+def manifest_chunk_ids(scheme_id, entry):
+    """Deterministic chunk ids of a scheme recorded in the ingest manifest"""
+    return [f"{scheme_id}:{i}" for i in range(entry.get("chunks", 0))]
+
+def load_ingest_manifest(vectorstore_path=VECTORSTORE_PATH):
+    """Per-scheme hashes / chunk ids recorded by the last ingest"""
+    path = os.path.join(vectorstore_path, MANIFEST_FILENAME)
     try:
-        if not embedding:
-            return None
-            
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=100
-        )
-        
-        splits = text_splitter.split_documents(documents)
-        print(f"✅ Created {len(splits)} text chunks")
-        
-        vectorstore_path = os.path.join(working_dir, "schemes_vectorstore")
-        
-        vectorstore = Chroma.from_documents(
-            documents=splits,
-            embedding=embedding,
-            persist_directory=vectorstore_path
-        )
-        
-        print(f"✅ Vectorstore created")
-        return vectorstore
-        
-    except Exception as e:
-        print(f"❌ Error creating vectorstore: {e}")
+        with open(path) as f:
+            return json.load(f)
+    except Exception:
         return None
 
-def setup_qa_chain():
-    """Setup QA chain"""
+def save_ingest_manifest(manifest, vectorstore_path=VECTORSTORE_PATH):
+    """Atomically persist the ingest manifest inside the vectorstore directory"""
+    os.makedirs(vectorstore_path, exist_ok=True)
+    path = os.path.join(vectorstore_path, MANIFEST_FILENAME)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+def get_catalogs() -> Dict[str, str]:
+    """Configured catalogs: name -> CSV path (CONFIG["catalogs"] plus the central schemes_csv_path)"""
+    catalogs = {name.lower(): path for name, path in (CONFIG.get("catalogs") or {}).items()}
+    catalogs[CENTRAL_CATALOG] = CONFIG["schemes_csv_path"]
+    return catalogs
+
+def catalog_vectorstore_path(catalog: str = CENTRAL_CATALOG) -> str:
+    """Vectorstore directory of a catalog (the central one keeps schemes_vectorstore)"""
+    if not catalog or catalog == CENTRAL_CATALOG:
+        return VECTORSTORE_PATH
+    return os.path.join(STATE_VECTORSTORES_PATH, "_".join(catalog.lower().split()))
+
+def resolve_state_catalog(location: str) -> Optional[str]:
+    """State catalog for a parsed location ("Gujarat", "गुजरात", "guj"), None if there is none"""
+    if not location:
+        return None
+    text = f" {normalize_query(location)} "
+    for name in get_catalogs():
+        if name == CENTRAL_CATALOG:
+            continue
+        aliases = [name] + SYNONYMS.get(name, [])
+        if any(f" {normalize_query(alias)} " in text for alias in aliases if alias):
+            return name
+    return None
+
+def route_catalogs(location: str = None) -> List[str]:
+    """Catalogs a query searches: always central, plus the user's state if it has a catalog"""
+    state = resolve_state_catalog(location)
+    return [CENTRAL_CATALOG, state] if state else [CENTRAL_CATALOG]
+
+class CatalogSnapshot:
+    """Catalog metadata (row counts by department and state) accumulated frame by frame during ingest"""
+    
+    def __init__(self):
+        self.rows = 0
+        self.departments = {}
+        self.states = {}
+    
+    def add(self, df):
+        """Count one CSV frame"""
+        self.rows += len(df)
+        for column, counts in (("Department", self.departments), ("State", self.states)):
+            if column in df.columns:
+                values = df[column].fillna("").astype(str).str.strip().replace("", "Unknown" if column == "Department" else "all")
+            else:
+                values = pd.Series(["Unknown" if column == "Department" else "all"] * len(df))
+            for value, count in values.value_counts().items():
+                counts[value] = counts.get(value, 0) + int(count)
+    
+    def to_dict(self, csv_path, csv_hash=None, chunks=None):
+        return {
+            "rows": self.rows,
+            "departments": dict(sorted(self.departments.items(), key=lambda item: -item[1])),
+            "states": dict(sorted(self.states.items(), key=lambda item: -item[1])),
+            "csv_path": csv_path,
+            "csv_hash": csv_hash,
+            "csv_mtime": os.path.getmtime(csv_path) if os.path.exists(csv_path) else None,
+            "chunks": chunks,
+            "ingested_at": datetime.now().isoformat()
+        }
+
+# vectorstore path -> (snapshot file mtime, snapshot)
+_snapshots = {}
+# vectorstore path -> snapshot computed for a catalog that is not ingested yet (never written to disk)
+_computed_snapshots = {}
+_snapshots_lock = threading.Lock()
+
+def save_catalog_snapshot(snapshot, vectorstore_path=VECTORSTORE_PATH):
+    """Persist a catalog snapshot next to the ingest manifest (and keep it in memory)"""
+    os.makedirs(vectorstore_path, exist_ok=True)
+    path = os.path.join(vectorstore_path, SNAPSHOT_FILENAME)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(snapshot, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    with _snapshots_lock:
+        _snapshots[vectorstore_path] = (os.path.getmtime(path), snapshot)
+
+def load_catalog_snapshot(vectorstore_path=VECTORSTORE_PATH):
+    """Snapshot written at ingest, served from memory (re-read only when the file changes)"""
+    path = os.path.join(vectorstore_path, SNAPSHOT_FILENAME)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    with _snapshots_lock:
+        cached = _snapshots.get(vectorstore_path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    try:
+        with open(path, encoding='utf-8') as f:
+            snapshot = json.load(f)
+    except Exception:
+        return None
+    with _snapshots_lock:
+        _snapshots[vectorstore_path] = (mtime, snapshot)
+    return snapshot
+
+def get_catalog_snapshot(catalog=CENTRAL_CATALOG, csv_path=None):
+    """Catalog metadata: rows, per-department / per-state counts, CSV hash, ingest time, chunk count
     
-    prompt_template = """
+    Stores ingested before snapshots existed, or whose CSV changed without a
+    re-ingest, get one computed from the CSV once and persisted. Catalogs not
+    ingested yet only keep it in memory, so no store directory is created.
+    """
+    vectorstore_path = catalog_vectorstore_path(catalog)
+    csv_path = csv_path or get_catalogs().get(catalog)
+    snapshot = load_catalog_snapshot(vectorstore_path)
+    try:
+        csv_mtime = os.path.getmtime(csv_path)
+    except (OSError, TypeError):
+        return snapshot
+    if snapshot is not None and snapshot.get("csv_mtime") == csv_mtime:
+        return snapshot
+    with _snapshots_lock:
+        computed = _computed_snapshots.get(vectorstore_path)
+    if computed is not None and computed.get("csv_mtime") == csv_mtime:
+        return computed
+    
+    counter = CatalogSnapshot()
+    for frame in read_catalog_csv(csv_path, chunksize=CONFIG.get("ingest_chunk_rows", 2000)):
+        counter.add(frame)
+    manifest = load_ingest_manifest(vectorstore_path)
+    chunks = sum(entry.get("chunks", 0) for entry in manifest.get("schemes", {}).values()) if manifest else None
+    snapshot = counter.to_dict(csv_path, csv_hash=file_hash(csv_path), chunks=chunks)
+    snapshot["ingested_at"] = manifest.get("updated_at") if manifest else None
+    if manifest:
+        save_catalog_snapshot(snapshot, vectorstore_path)
+    else:
+        with _snapshots_lock:
+            _computed_snapshots[vectorstore_path] = snapshot
+    logger.info(f"📊 Catalog snapshot ({catalog}): {snapshot['rows']} schemes")
+    return snapshot
+
+PROMPT_TEMPLATE = """
 You are a helpful assistant for Indian Government Schemes. Answer questions clearly and concisely in 2-3 sentences maximum. Do not use any special formatting, thinking tags, or markdown.
 
 Context: {context}
@@ -169,121 +639,488 @@ Instructions:
 Answer:
 """
 
-    PROMPT = PromptTemplate(
-        template=prompt_template,
-        input_variables=["context", "question"]
-    )
+class RetrievalEngine:
+    """Process-wide retrieval engine - opens the vectorstore once and keeps it warm
     
-    vectorstore_path = os.path.join(working_dir, "schemes_vectorstore")
+    The engine is also the QA chain: invoke({"query": ...}) retrieves and
+    generates like the RetrievalQA chain it replaced.
+    """
     
-    if not os.path.exists(vectorstore_path) or not embedding:
-        return None, "❌ Vectorstore or embedding not found"
+    # Seconds between on-disk change checks, so hot paths don't stat the store every call
+    CHECK_INTERVAL = 2.0
     
-    try:
-        vectorstore = Chroma(
-            persist_directory=vectorstore_path,
-            embedding_function=embedding
-        )
+    def __init__(self, vectorstore_path: str = VECTORSTORE_PATH):
+        self.vectorstore_path = vectorstore_path
+        self._lock = threading.RLock()
+        self._prompt = None
+        self._vectorstore = None
+        self._retriever = None
+        self._ready = False
+        self._hybrid = None
+        self._fingerprint = None
+        self._last_check = 0.0
+        self.build_count = 0
+    
+    def _store_fingerprint(self):
+        """Cheap signature of the persist directory (paths, sizes, mtimes)"""
+        entries = []
+        for root, _, files in os.walk(self.vectorstore_path):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((os.path.relpath(path, self.vectorstore_path), stat.st_size, stat.st_mtime_ns))
+        return tuple(sorted(entries))
+    
+    def _is_stale(self) -> bool:
+        """Check (rate-limited) whether the vectorstore changed on disk since the last build"""
+        now = time.monotonic()
+        if self._ready and now - self._last_check < self.CHECK_INTERVAL:
+            return False
+        self._last_check = now
+        return self._store_fingerprint() != self._fingerprint
+    
+    def _build(self):
+        """Open the vectorstore and build the retrievers"""
+        if self._prompt is None:
+            self._prompt = PromptTemplate(
+                template=PROMPT_TEMPLATE,
+                input_variables=["context", "question"]
+            )
         
-        # Fixed retriever
-        retriever = vectorstore.as_retriever(
-            search_type="similarity",
-            search_kwargs={"k": 5}
-        )
+        vectorstore = self._open_vectorstore()
         
-        qa_chain = RetrievalQA.from_chain_type(
-            llm=llm,
-            chain_type="stuff",
-            retriever=retriever,
-            chain_type_kwargs={"prompt": PROMPT},
-            return_source_documents=True
-        )
+        retriever = None
+        if isinstance(vectorstore, Chroma):
+            retriever = vectorstore.as_retriever(
+                search_type="similarity",
+                search_kwargs={"k": 5}
+            )
         
-        return qa_chain, "✅ QA Chain ready"
+        hybrid = None
+        if CONFIG.get("hybrid_retrieval", True):
+            from hybrid_retriever import HybridRetriever
+            hybrid = HybridRetriever(
+                vectorstore,
+                rrf_k=CONFIG.get("hybrid_rrf_k", 60),
+                fetch_k=CONFIG.get("hybrid_fetch_k", 20)
+            )
         
-    except Exception as e:
-        return None, f"❌ Error: {e}"
+        self._vectorstore = vectorstore
+        self._retriever = retriever
+        self._hybrid = hybrid
+        self._ready = True
+        self._fingerprint = self._store_fingerprint()
+        self.build_count += 1
+        logger.info(f"✅ Retrieval engine ready (build #{self.build_count})")
+    
+    def _open_vectorstore(self):
+        """Chroma, or the memory-mapped matrix index when CONFIG["vector_backend"] is
+        "matrix" (exact search) or "ivf" (approximate, for very large catalogs)
+        
+        The matrix index is exported from Chroma and rebuilt whenever the ingest
+        catalog changes; if that fails, Chroma is used.
+        """
+        def open_chroma():
+            return Chroma(
+                persist_directory=self.vectorstore_path,
+                embedding_function=get_embedding()
+            )
+        
+        backend = CONFIG.get("vector_backend", "chroma")
+        if backend in ("matrix", "ivf"):
+            from vector_index import open_matrix_store
+            store = open_matrix_store(
+                self.vectorstore_path,
+                get_embedding(),
+                open_chroma,
+                catalog=manifest_fingerprint(load_ingest_manifest(self.vectorstore_path)),
+                dtype=CONFIG.get("vector_index_dtype", "float16"),
+                ivf=backend == "ivf",
+                nlist=CONFIG.get("ivf_nlist") or None,
+                nprobe=CONFIG.get("ivf_nprobe", 8)
+            )
+            if store is not None:
+                logger.info(f"📐 Using {backend} vector index ({len(store)} chunks, {store.meta['dtype']})")
+                return store
+            logger.warning("⚠️ Matrix vector index unavailable, falling back to Chroma")
+        return open_chroma()
+    
+    def invalidate(self):
+        """Drop the warm chain so the next call reopens the vectorstore"""
+        with self._lock:
+            self._vectorstore = None
+            self._retriever = None
+            self._hybrid = None
+            self._ready = False
+            self._fingerprint = None
+            self._last_check = 0.0
+    
+    def get_qa_chain(self):
+        """Return (qa_chain, status), rebuilding only when the store changed on disk"""
+        qa_chain, status, _ = self._acquire()
+        return qa_chain, status
+    
+    def _acquire(self):
+        """(qa_chain, status, (vectorstore, hybrid)) with the handles read under the lock
+        
+        Searches go through this snapshot, so a concurrent invalidate() or
+        rebuild can't swap the handles out from under a running query.
+        """
+        if not os.path.exists(self.vectorstore_path) or not get_embedding():
+            return None, "❌ Vectorstore or embedding not found", None
+        
+        with self._lock:
+            try:
+                if not self._ready or self._is_stale():
+                    if self._ready:
+                        logger.info("🔄 Vectorstore changed on disk, rebuilding retrieval engine")
+                    self._build()
+                return self, "✅ QA Chain ready", (self._vectorstore, self._hybrid)
+            except Exception as e:
+                self.invalidate()
+                return None, f"❌ Error: {e}", None
+    
+    @staticmethod
+    def _search(handles, query: str, k: int, where: Dict = None, embedding=None):
+        """One search through the hybrid retriever (or plain vector search if disabled)"""
+        from hybrid_retriever import vector_search
+        vectorstore, hybrid = handles
+        if hybrid is not None:
+            return hybrid.retrieve(query, k=k, where=where, embedding=embedding)
+        return vector_search(vectorstore, query, k, where=where, embedding=embedding)
+    
+    def retrieve(self, query: str, k: int = 5, where: Dict = None, embedding=None):
+        """Search the warm store -> [(document, score), ...]
+        
+        `where` is a metadata predicate applied inside the query; if it
+        leaves nothing, the search is retried unfiltered. `embedding` is the
+        query's vector when it was already computed (batch mode).
+        """
+        qa_chain, status, handles = self._acquire()
+        if not qa_chain:
+            return []
+        if where:
+            hits = self._search(handles, query, k, where, embedding)
+            if hits:
+                return hits
+            logger.info("🔎 Profile filter matched no chunks, retrying unfiltered")
+        return self._search(handles, query, k, embedding=embedding)
+    
+    def get_timing_stats(self) -> Dict[str, float]:
+        """Per-source retrieval timings (hybrid mode only)"""
+        hybrid = self._hybrid
+        return hybrid.get_timing_stats() if hybrid is not None else {}
+    
+    def generate(self, question: str, documents, deadline: float = None) -> str:
+        """Stuff already-retrieved documents into the prompt and run one LLM call (within `deadline` seconds)"""
+        context = "\n\n".join(doc.page_content for doc in documents)
+        prompt = self._prompt.format(context=context, question=question)
+        llm = get_llm()
+        if llm is None:
+            raise LLMUnavailable("LLM not loaded")
+        result = llm.invoke(prompt, deadline=deadline)
+        return getattr(result, "content", str(result))
+    
+    def stream_generate(self, question: str, documents, deadline: float = None):
+        """Same prompt as generate(), but yields the LLM output chunk by chunk"""
+        context = "\n\n".join(doc.page_content for doc in documents)
+        prompt = self._prompt.format(context=context, question=question)
+        llm = get_llm()
+        if llm is None:
+            raise LLMUnavailable("LLM not loaded")
+        for chunk in llm.stream(prompt, deadline=deadline):
+            text = getattr(chunk, "content", chunk)
+            if text:
+                yield text
+    
+    def invoke(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """RetrievalQA-compatible call: {"query": q} -> {"result": answer, "source_documents": [...]}"""
+        query = inputs["query"] if isinstance(inputs, dict) else inputs
+        hits = self.retrieve(query)
+        answer = self.generate(query, build_context(query, hits))
+        return {"query": query, "result": answer, "source_documents": [doc for doc, _ in hits]}
+    
+    @property
+    def vectorstore(self):
+        """Warm vectorstore handle (None if unavailable)"""
+        qa_chain, _, handles = self._acquire()
+        return handles[0] if qa_chain else None
+
+_engines = {}
+_engine_lock = threading.Lock()
+
+def get_retrieval_engine(vectorstore_path: str = VECTORSTORE_PATH) -> RetrievalEngine:
+    """Get the shared retrieval engine of a vectorstore (the central catalog by default)"""
+    engine = _engines.get(vectorstore_path)
+    if engine is None:
+        with _engine_lock:
+            engine = _engines.get(vectorstore_path)
+            if engine is None:
+                engine = _engines[vectorstore_path] = RetrievalEngine(vectorstore_path)
+    return engine
+
+def get_catalog_engine(catalog: str = CENTRAL_CATALOG) -> RetrievalEngine:
+    """Retrieval engine of one catalog"""
+    return get_retrieval_engine(catalog_vectorstore_path(catalog))
+
+def retrieve_catalogs(query: str, k: int = 5, where: Dict = None, catalogs: List[str] = None, embedding=None):
+    """Search only the given catalogs and merge their hits by score -> [(document, score), ...]
+    
+    Each catalog is its own store and index, so the cost depends on the
+    catalogs searched, not on how many exist. Catalogs not ingested yet are skipped.
+    """
+    catalogs = catalogs or [CENTRAL_CATALOG]
+    if len(catalogs) == 1:
+        return get_catalog_engine(catalogs[0]).retrieve(query, k=k, where=where, embedding=embedding)
+    
+    hits = []
+    for catalog in catalogs:
+        engine = get_catalog_engine(catalog)
+        if not os.path.exists(engine.vectorstore_path):
+            logger.info(f"📂 Catalog '{catalog}' not ingested yet, skipping")
+            continue
+        hits.extend(engine.retrieve(query, k=k, where=where, embedding=embedding))
+    # Same scoring scale in every store (RRF or relevance), so hits merge directly
+    hits.sort(key=lambda hit: -hit[1])
+    return hits[:k]
+
+def setup_qa_chain():
+    """Setup QA chain (served from the shared retrieval engine)"""
+    return get_retrieval_engine().get_qa_chain()
 
-def process_government_schemes_csv(csv_file_path):
-    """Main function to process CSV"""
-    print("🚀 Processing Government Schemes CSV...")
+def process_government_schemes_csv(csv_file_path, catalog=CENTRAL_CATALOG):
+    """Main function to process CSV (into the vectorstore of `catalog`)"""
+    print(f"🚀 Processing Government Schemes CSV ({catalog} catalog)...")
     
-    documents = process_csv_to_documents(csv_file_path)
-    if not documents:
-        return False, "Failed to process CSV"
+    vectorstore_path = catalog_vectorstore_path(catalog)
+    csv_hash = file_hash(csv_file_path)
+    manifest = load_ingest_manifest(vectorstore_path)
+    if manifest and manifest.get("csv_hash") == csv_hash and manifest.get("chunker") == CHUNKER_VERSION:
+        print("✅ Catalog unchanged since last ingest, nothing to do")
+        return True, "Up to date"
     
-    vectorstore = create_vectorstore(documents)
-    if not vectorstore:
+    from ingest_pipeline import ingest_csv_streaming
+    
+    stats = ingest_csv_streaming(csv_file_path, csv_hash=csv_hash, vectorstore_path=vectorstore_path,
+                                 catalog=None if catalog == CENTRAL_CATALOG else catalog)
+    if not stats:
         return False, "Failed to create vectorstore"
     
     print("✅ Ready for questions!")
     return True, "Success"
 
+def process_all_catalogs():
+    """Ingest every configured catalog; each one is skipped when its own CSV hash is unchanged"""
+    results = {}
+    for catalog, csv_path in get_catalogs().items():
+        if not os.path.exists(csv_path):
+            print(f"⚠️ CSV of catalog '{catalog}' not found: {csv_path}")
+            results[catalog] = (False, "CSV not found")
+            continue
+        results[catalog] = process_government_schemes_csv(csv_path, catalog)
+    return results
+
+NO_ANSWER_MESSAGE = "Unable to find specific scheme information. Please try a different query."
+
+def clean_answer_for_voice(answer):
+    """AGGRESSIVE cleaning of a raw LLM answer for voice output"""
+    import re
+    
+    # Remove <think> tags and ALL their content (most important fix)
+    answer = re.sub(r'<think>.*?</think>', '', answer, flags=re.DOTALL | re.IGNORECASE)
+    
+    # Remove any remaining thinking patterns
+    answer = re.sub(r'think.*?(?=\n\n|\.|$)', '', answer, flags=re.DOTALL | re.IGNORECASE)
+    
+    # Remove special formatting
+    answer = re.sub(r'[<>{}*#`_]', '', answer)
+    answer = re.sub(r'\*+', '', answer)
+    answer = re.sub(r'#+', '', answer)
+    
+    # Clean up multiple whitespace and newlines
+    answer = re.sub(r'\s+', ' ', answer)
+    answer = answer.strip()
+    
+    # If answer is still empty or too short, return error
+    if not answer or len(answer) < 10:
+        return NO_ANSWER_MESSAGE
+    
+    # Limit length for voice output
+    if len(answer) > 250:
+        sentences = answer.split('.')
+        # Take first 2-3 meaningful sentences
+        good_sentences = []
+        for sentence in sentences:
+            clean_sentence = sentence.strip()
+            if clean_sentence and len(clean_sentence) > 10:
+                good_sentences.append(clean_sentence)
+            if len(good_sentences) >= 2:
+                break
+        
+        if good_sentences:
+            answer = '. '.join(good_sentences) + '.'
+        else:
+            answer = sentences[0] + '.' if sentences else answer
+    
+    return answer.strip()
+
+_generation_lock = threading.Lock()
+_generation_stats = {"answers": 0, "generated_tokens": 0, "kept_tokens": 0}
+
+def record_generation(generated_text, kept_text):
+    """Count tokens the LLM produced vs tokens that survived cleaning/truncation"""
+    generated = estimate_tokens(generated_text)
+    kept = estimate_tokens(kept_text)
+    with _generation_lock:
+        _generation_stats["answers"] += 1
+        _generation_stats["generated_tokens"] += generated
+        _generation_stats["kept_tokens"] += kept
+    logger.info(f"🧮 Generated ~{generated} tokens, kept ~{kept}")
+
+def get_generation_stats():
+    """Generated vs kept answer tokens (the difference was paid for and thrown away)"""
+    with _generation_lock:
+        stats = dict(_generation_stats)
+    stats["wasted_tokens"] = stats["generated_tokens"] - stats["kept_tokens"]
+    stats["kept_ratio"] = stats["kept_tokens"] / stats["generated_tokens"] if stats["generated_tokens"] else 0.0
+    stats["profile"] = CONFIG.get("llm_profile", "voice")
+    return stats
+
+def answer_with_sources(question, search_query=None, k=5, where=None, budget=None, catalogs=None):
+    """Single retrieval + single LLM call; returns (answer, [(document, score), ...])
+    
+    answer is None when the LLM is unavailable (breaker open, timeouts), so
+    callers can fall back to a template answer built from the hits. With a
+    TurnBudget, the LLM only gets the time left after reserving TTS.
+    `catalogs` (see route_catalogs()) defaults to the central catalog.
+    """
+    engine = get_retrieval_engine()
+    qa_chain, status = engine.get_qa_chain()
+    
+    if not qa_chain:
+        return status, []
+    
+    with timed_stage(budget, "retrieval"):
+        hits = retrieve_catalogs(search_query or question, k=k, where=where, catalogs=catalogs)
+    return generate_answer(question, hits, budget=budget), hits
+
+def generate_answer(question, hits, budget=None):
+    """Build the prompt context from retrieved hits and run one LLM call -> cleaned answer
+    
+    None when the LLM is unavailable. The retrieval engine must be ready (get_qa_chain()).
+    """
+    documents = build_context(question, hits)
+    deadline = budget.time_for("llm", reserve=("tts",)) if budget is not None else None
+    try:
+        with timed_stage(budget, "llm"):
+            answer = get_retrieval_engine().generate(question, documents, deadline=deadline)
+    except LLMUnavailable as e:
+        logger.warning(f"⚠️ LLM unavailable, falling back to template answer: {e}")
+        return None
+    cleaned = clean_answer_for_voice(answer)
+    record_generation(answer, "" if cleaned == NO_ANSWER_MESSAGE else cleaned)
+    return cleaned
+
+def stream_answer_with_sources(question, search_query=None, k=5, where=None, max_sentences=None, budget=None,
+                               catalogs=None):
+    """Retrieve now, generate lazily -> (iterator of speakable sentences, hits)
+    
+    Sentences are yielded as soon as the LLM completes them, so the first one
+    can be spoken while the rest is still being generated.
+    """
+    engine = get_retrieval_engine()
+    qa_chain, status = engine.get_qa_chain()
+    
+    if not qa_chain:
+        return iter([status]), []
+    
+    max_sentences = max_sentences or CONFIG.get("stream_max_sentences", 3)
+    with timed_stage(budget, "retrieval"):
+        hits = retrieve_catalogs(search_query or question, k=k, where=where, catalogs=catalogs)
+    documents = build_context(question, hits)
+    deadline = budget.time_for("llm", reserve=("tts",)) if budget is not None else None
+    tokens = engine.stream_generate(question, documents, deadline=deadline)
+    
+    def counted_tokens(raw):
+        for token in tokens:
+            raw.append(token)
+            yield token
+    
+    def counted_sentences():
+        raw, kept = [], []
+        try:
+            for sentence in iter_voice_sentences(counted_tokens(raw), max_sentences=max_sentences):
+                kept.append(sentence)
+                yield sentence
+        finally:
+            if raw:
+                record_generation("".join(raw), " ".join(kept))
+    
+    return counted_sentences(), hits
+
+def _classify_answer(answer):
+    """Cache class for a cleaned answer: errors are never cached, 'not found' is cached negatively"""
+    if not answer or answer.startswith("❌"):
+        return CACHE_SKIP
+    if answer == NO_ANSWER_MESSAGE:
+        return CACHE_NEGATIVE
+    return CACHE_OK
+
+def _classify_pipeline_result(result):
+    """Cache class for an answer_query()/search_by_context() result"""
+    if isinstance(result, list):
+        return CACHE_OK if result else CACHE_NEGATIVE
+    if result.get("degraded"):
+        # Template fallback: let the next request try the LLM again
+        return CACHE_SKIP
+    kind = _classify_answer(result.get("answer", ""))
+    if kind == CACHE_OK and not result.get("schemes"):
+        return CACHE_NEGATIVE
+    return kind
+
 def answer_schemes_question(question):
     """Answer questions about government schemes"""
     try:
-        qa_chain, status = setup_qa_chain()
-        
-        if not qa_chain:
-            return status
+        def compute():
+            answer, _ = answer_with_sources(question)
+            # No LLM answer: return nothing (not cached) so callers use their own fallback
+            return answer or ""
         
-        result = qa_chain.invoke({"query": question})
-        answer = result["result"]
-        
-        # AGGRESSIVE cleaning for voice output
-        import re
-        
-        # Remove <think> tags and ALL their content (most important fix)
-        answer = re.sub(r'<think>.*?</think>', '', answer, flags=re.DOTALL | re.IGNORECASE)
-        
-        # Remove any remaining thinking patterns
-        answer = re.sub(r'think.*?(?=\n\n|\.|$)', '', answer, flags=re.DOTALL | re.IGNORECASE)
-        
-        # Remove special formatting
-        answer = re.sub(r'[<>{}*#`_]', '', answer)
-        answer = re.sub(r'\*+', '', answer)
-        answer = re.sub(r'#+', '', answer)
-        
-        # Clean up multiple whitespace and newlines
-        answer = re.sub(r'\s+', ' ', answer)
-        answer = answer.strip()
-        
-        # If answer is still empty or too short, return error
-        if not answer or len(answer) < 10:
-            return "Unable to find specific scheme information. Please try a different query."
-        
-        # Limit length for voice output
-        if len(answer) > 250:
-            sentences = answer.split('.')
-            # Take first 2-3 meaningful sentences
-            good_sentences = []
-            for sentence in sentences:
-                clean_sentence = sentence.strip()
-                if clean_sentence and len(clean_sentence) > 10:
-                    good_sentences.append(clean_sentence)
-                if len(good_sentences) >= 2:
-                    break
-            
-            if good_sentences:
-                answer = '. '.join(good_sentences) + '.'
-            else:
-                answer = sentences[0] + '.' if sentences else answer
-        
-        return answer.strip()
+        key = make_cache_key(question, mode="question", catalog=cached_catalog())
+        return get_answer_cache().get_or_compute(key, compute, _classify_answer)
         
     except Exception as e:
         return f"❌ Error: {str(e)}"
 
+LANGUAGE_INSTRUCTIONS = {
+    "hindi": " answer in Hindi हिंदी में जवाब दें",
+    "hinglish": " answer in Hinglish हिंग्लिश में जवाब दें"
+}
+
 class EnhancedRAGDatabase:
     """Wrapper class for voice assistant compatibility"""
     
     def __init__(self, csv_path: str, groq_api_key: str):
         self.csv_path = csv_path
         self.groq_api_key = groq_api_key
-        self.available = RAG_AVAILABLE and groq_api_key and embedding and llm
+        # Models load in the background; `available` only says they can be loaded (the Groq key is only
+        # required when Groq is the configured backend)
+        self.available = (bool(RAG_AVAILABLE and backend_configured(api_key=groq_api_key))
+                          and get_model_status()["state"] != MODEL_FAILED)
+        
+        # CSV rows keyed by scheme_id per catalog CSV, loaded lazily for hydrating search hits
+        self._scheme_rows = {}
+        self._keyword_index = None
+        self._rows_lock = threading.Lock()
+        
+        # Identical concurrent requests (same cache key) share one retrieval + LLM call
+        self._inflight = SingleFlight()
         
         # Setup environment
-        if self.available:
+        if self.available and groq_api_key:
             os.environ["GROQ_API_KEY"] = groq_api_key
             
             # Create config.json if not exists
@@ -295,49 +1132,429 @@ class EnhancedRAGDatabase:
                     
             logger.info("✅ Enhanced RAG Database initialized")
     
-    def search_by_context(self, query: str, occupation: str = None, 
-                         location: str = None, top_k: int = 5) -> List[Dict]:
-        """Search using enhanced approach"""
+    def _build_search_query(self, query: str, occupation: str = None, location: str = None) -> str:
+        """Build enhanced retrieval query from user context"""
+        enhanced_query_parts = [query]
+        
+        if occupation:
+            occupation_keywords = {
+                'farmer': 'agriculture farming kisan crop cultivation seeds fertilizers',
+                'fisherman': 'fishing marine boat matsya',
+                'women': 'women female mahila woman',
+                'business': 'business entrepreneur loan mudra',
+                'student': 'education scholarship student vidyarthi'
+            }
+            if occupation in occupation_keywords:
+                enhanced_query_parts.append(occupation_keywords[occupation])
+        
+        if location:
+            enhanced_query_parts.append(location)
+        
+        return ' '.join(enhanced_query_parts)
+    
+    def _build_question(self, query: str, occupation: str = None, location: str = None,
+                        language: str = "english") -> str:
+        """Build the question sent to the LLM (user context + language preference)"""
+        question = query
+        if occupation:
+            question += f" for {occupation}"
+        if location:
+            question += f" in {location}"
+        return question + LANGUAGE_INSTRUCTIONS.get(language, "")
+    
+    def _merge_profile(self, profile: Dict = None, location: str = None) -> Dict:
+        """User profile for metadata filtering, filled in from the location
+        
+        The `occupation` argument of the pipelines is not merged: it may be a
+        default guess, so it only steers the query text. An occupation the user
+        actually stated goes into `profile` and becomes a filter.
+        """
+        merged = {k: v for k, v in (profile or {}).items() if v not in (None, "")}
+        if location and "state" not in merged:
+            merged["state"] = location
+        return merged
+    
+    def answer_query(self, query: str, occupation: str = None, location: str = None,
+                     language: str = "english", top_k: int = 5, profile: Dict = None,
+                     budget=None) -> Dict[str, Any]:
+        """Single-pass pipeline: one retrieval + one LLM call -> {"schemes": [...], "answer": str}
+        
+        Served from the precomputed FAQ table or the answer cache when possible; a hit skips retrieval and the LLM.
+        `occupation` only boosts the search text; `profile` (gender, age, caste, state and a stated
+        occupation) restricts retrieval to eligible schemes.
+        `budget` (latency_budget.TurnBudget) switches to cheaper answers when time is short.
+        """
         
         if not self.available:
             logger.warning("⚠️ RAG system not available")
-            return []
+            return {"schemes": [], "answer": ""}
+        
+        profile = self._merge_profile(profile, location)
+        faq = self._faq_answer(query, occupation, location, language, top_k, profile)
+        if faq is not None:
+            return faq
+        key = self._answer_cache_key(query, occupation, location, language, top_k, profile)
+        if not models_ready():
+            return self._answer_while_warming(key, query, occupation, location, language, top_k)
+        def compute(turn_budget):
+            return self._inflight.do(
+                key,
+                lambda: self._answer_query_uncached(query, occupation, location, language, top_k, profile,
+                                                    turn_budget)
+            )
+        
+        # On a miss, concurrent identical queries wait for one computation (the leader's budget applies);
+        # a stale entry is refreshed in the background without this turn's budget
+        return get_answer_cache().get_or_compute(
+            key,
+            lambda: compute(budget),
+            _classify_pipeline_result,
+            refresh=lambda: compute(None)
+        )
+    
+    def _faq_answer(self, query: str, occupation: str = None, location: str = None,
+                    language: str = "english", top_k: int = 5, profile: Dict = None) -> Optional[Dict[str, Any]]:
+        """Precomputed answer for a plain occupation/state/intent question
+        
+        FAQ answers are built with the occupation as a filter, so they only serve
+        a stated occupation (or none); profiles with more fields never match.
+        """
+        if profile != self._merge_profile({"occupation": occupation}, location):
+            return None
+        result = lookup_faq(query, occupation, location, language, top_k)
+        if result is not None:
+            logger.info(f"📚 Served precomputed FAQ answer for '{query}'")
+        return result
+    
+    def _answer_cache_key(self, query: str, occupation: str = None, location: str = None,
+                          language: str = "english", top_k: int = 5, profile: Dict = None) -> str:
+        """Exact-cache key shared by answer_query() and stream_answer_query() (scoped to the ingested catalog)"""
+        mode = f"answer:{top_k}:{profile_signature(profile)}"
+        return make_cache_key(query, occupation, location, language, mode=mode, catalog=cached_catalog())
+    
+    def stream_answer_query(self, query: str, occupation: str = None, location: str = None,
+                            language: str = "english", top_k: int = 5, profile: Dict = None, budget=None):
+        """Streaming variant of answer_query() -> (schemes, iterator of spoken sentences)
+        
+        Retrieval happens before returning; the answer is generated while the
+        caller consumes the iterator. Cached answers are replayed sentence by
+        sentence, and a fully streamed answer is written back to the caches.
+        """
+        if not self.available:
+            logger.warning("⚠️ RAG system not available")
+            return [], iter([])
+        
+        profile = self._merge_profile(profile, location)
+        faq = self._faq_answer(query, occupation, location, language, top_k, profile)
+        if faq is not None:
+            return faq["schemes"], iter(split_voice_sentences(faq["answer"]))
+        key = self._answer_cache_key(query, occupation, location, language, top_k, profile)
+        
+        _, state = get_answer_cache().get(key, count=False)
+        no_time_for_llm = budget is not None and not budget.allows("retrieval", "llm")
+        if state is not None or not models_ready() or no_time_for_llm:
+            # Let answer_query() do the hit accounting, stale refresh, warm-up and budget fallbacks
+            result = self.answer_query(query, occupation, location, language, top_k, profile, budget)
+            return result["schemes"], iter(split_voice_sentences(result["answer"]))
         
         try:
-            # Build enhanced query
-            enhanced_query_parts = [query]
+            semantic_cache = None
+            mode = f"answer:{top_k}:{profile_signature(profile)}"
+            scope = SemanticCache.make_scope(occupation, location, language, mode=mode)
+            query_vector = None
+            if CONFIG.get("semantic_cache_enabled", True):
+                semantic_cache = get_semantic_cache(get_embedding().embed_query)
+                query_vector = semantic_cache.embed(query)
+                cached, _ = semantic_cache.lookup(query, scope, vector=query_vector)
+                if cached is not None:
+                    return cached["schemes"], iter(split_voice_sentences(cached["answer"]))
             
-            if occupation:
-                occupation_keywords = {
-                    'farmer': 'agriculture farming kisan crop cultivation seeds fertilizers',
-                    'fisherman': 'fishing marine boat matsya',
-                    'women': 'women female mahila woman',
-                    'business': 'business entrepreneur loan mudra',
-                    'student': 'education scholarship student vidyarthi'
-                }
-                if occupation in occupation_keywords:
-                    enhanced_query_parts.append(occupation_keywords[occupation])
+            search_query = self._build_search_query(query, occupation, location)
+            question = self._build_question(query, occupation, location, language)
+            
+            logger.info(f"🔍 Enhanced query (streaming): '{search_query}'")
+            
+            sentences, hits = stream_answer_with_sources(question, search_query=search_query, k=top_k,
+                                                         where=build_profile_filter(profile), budget=budget,
+                                                         catalogs=route_catalogs(location))
+            schemes = self._schemes_from_hits(hits, "", search_query, top_k)[:top_k]
+            
+        except Exception as e:
+            logger.error(f"❌ RAG pipeline failed: {e}")
+            return [], iter([])
+        
+        def speak_and_remember():
+            spoken = []
+            try:
+                for sentence in sentences:
+                    spoken.append(sentence)
+                    yield sentence
+            except LLMUnavailable as e:
+                logger.warning(f"⚠️ LLM unavailable, falling back to template answer: {e}")
+                if not spoken:
+                    yield from split_voice_sentences(self._template_answer(schemes, language))
+                return
+            except Exception as e:
+                logger.error(f"❌ Streaming generation failed: {e}")
+                return
+            
+            answer = " ".join(spoken)
+            if len(answer) < 10:
+                answer = NO_ANSWER_MESSAGE
+                if not spoken:
+                    yield answer
+            
+            result = {"schemes": schemes, "answer": answer}
+            kind = _classify_pipeline_result(result)
+            if kind != CACHE_SKIP:
+                get_answer_cache().set(key, result, negative=(kind == CACHE_NEGATIVE))
+            if semantic_cache is not None and kind == CACHE_OK:
+                semantic_cache.add(query, scope, result, vector=query_vector)
+        
+        return schemes, speak_and_remember()
+    
+    def _answer_query_uncached(self, query: str, occupation: str = None, location: str = None,
+                               language: str = "english", top_k: int = 5,
+                               profile: Dict = None, budget=None) -> Dict[str, Any]:
+        """Run retrieval + generation without consulting the exact-key cache"""
+        try:
+            # Near-duplicate wording of an already answered query?
+            semantic_cache = None
+            mode = f"answer:{top_k}:{profile_signature(profile)}"
+            scope = SemanticCache.make_scope(occupation, location, language, mode=mode)
+            query_vector = None
+            if CONFIG.get("semantic_cache_enabled", True):
+                semantic_cache = get_semantic_cache(get_embedding().embed_query)
+                query_vector = semantic_cache.embed(query)
+                cached, _ = semantic_cache.lookup(query, scope, vector=query_vector)
+                if cached is not None:
+                    return cached
             
-            if location:
-                enhanced_query_parts.append(location)
+            if budget is not None and not budget.allows("retrieval", "llm"):
+                return self._answer_within_budget(query, occupation, location, language, top_k, profile, budget)
             
-            enhanced_query = ' '.join(enhanced_query_parts)
+            search_query = self._build_search_query(query, occupation, location)
+            question = self._build_question(query, occupation, location, language)
             
-            logger.info(f"🔍 Enhanced query: '{enhanced_query}'")
+            logger.info(f"🔍 Enhanced query: '{search_query}'")
             
-            # Use the answer function
-            answer = answer_schemes_question(enhanced_query)
+            answer, hits = answer_with_sources(question, search_query=search_query, k=top_k,
+                                               where=build_profile_filter(profile), budget=budget,
+                                               catalogs=route_catalogs(location))
             
-            logger.info(f"✅ RAG found answer")
+            logger.info(f"✅ RAG found answer from {len(hits)} chunks")
             
-            # Parse answer into scheme format for voice assistant
-            schemes = self._parse_answer_to_schemes(answer, enhanced_query, top_k)
+            if answer is None:
+                schemes = self._schemes_from_hits(hits, "", search_query, top_k)[:top_k]
+                return {"schemes": schemes, "answer": self._template_answer(schemes, language), "degraded": True}
             
-            return schemes[:top_k]
+            schemes = self._schemes_from_hits(hits, answer, search_query, top_k)
+            result = {"schemes": schemes[:top_k], "answer": answer}
+            
+            if semantic_cache is not None and _classify_pipeline_result(result) == CACHE_OK:
+                semantic_cache.add(query, scope, result, vector=query_vector)
+            
+            return result
+            
+        except Exception as e:
+            logger.error(f"❌ RAG pipeline failed: {e}")
+            return {"schemes": [], "answer": ""}
+    
+    def search_by_context(self, query: str, occupation: str = None, 
+                         location: str = None, top_k: int = 5,
+                         retrieval_only: bool = False, profile: Dict = None) -> List[Dict]:
+        """Search using enhanced approach
+        
+        retrieval_only=True skips the LLM entirely and returns real CSV scheme
+        rows ranked by vector similarity.
+        """
+        if not retrieval_only:
+            return self.answer_query(query, occupation, location, top_k=top_k, profile=profile)["schemes"]
+        
+        if not self.available:
+            logger.warning("⚠️ RAG system not available")
+            return []
+        
+        profile = self._merge_profile(profile, location)
+        
+        if not models_ready():
+            start_model_warmup()
+            return self._keyword_schemes(query, occupation, location, top_k)
+        
+        def compute():
+            search_query = self._build_search_query(query, occupation, location)
+            
+            # Over-fetch chunks since several can belong to the same scheme
+            hits = retrieve_catalogs(search_query, k=top_k * 3, where=build_profile_filter(profile),
+                                     catalogs=route_catalogs(location))
+            schemes = self._schemes_from_hits(hits, "", search_query, top_k)
+            
+            logger.info(f"⚡ Retrieval-only search returned {len(schemes)} schemes")
+            return schemes
+        
+        try:
+            key = make_cache_key(query, occupation, location, mode=f"retrieval:{top_k}:{profile_signature(profile)}",
+                                 catalog=cached_catalog())
+            return get_answer_cache().get_or_compute(key, lambda: self._inflight.do(key, compute),
+                                                     _classify_pipeline_result)
             
         except Exception as e:
-            logger.error(f"❌ RAG search failed: {e}")
+            logger.error(f"❌ RAG retrieval failed: {e}")
+            return []
+    
+    def _answer_while_warming(self, key: str, query: str, occupation: str = None, location: str = None,
+                              language: str = "english", top_k: int = 5) -> Dict[str, Any]:
+        """Degraded fast path while models load: cached answer if any, else keyword match + template answer"""
+        state = start_model_warmup()
+        
+        cached, cache_state = get_answer_cache().get(key)
+        if cache_state is not None:
+            logger.info(f"⚡ Models {state}, served cached answer")
+            return cached
+        
+        schemes = self._keyword_schemes(query, occupation, location, top_k)
+        logger.info(f"⚡ Models {state}, template answer from {len(schemes)} keyword matches")
+        # Not cached: the full pipeline should answer this query once models are ready
+        return {"schemes": schemes, "answer": self._template_answer(schemes, language), "degraded": True}
+    
+    def _answer_within_budget(self, query: str, occupation: str = None, location: str = None,
+                              language: str = "english", top_k: int = 5, profile: Dict = None,
+                              budget=None) -> Dict[str, Any]:
+        """No time for the LLM: answer from structured scheme fields (retrieval if it still fits, else keywords)"""
+        if budget.allows("retrieval"):
+            budget.degrade("skip_llm")
+            search_query = self._build_search_query(query, occupation, location)
+            with budget.stage("retrieval"):
+                hits = retrieve_catalogs(search_query, k=top_k * 3, where=build_profile_filter(profile),
+                                         catalogs=route_catalogs(location))
+            schemes = self._schemes_from_hits(hits, "", search_query, top_k)
+        else:
+            budget.degrade("keyword_only")
+            schemes = self._keyword_schemes(query, occupation, location, top_k)
+        return {"schemes": schemes, "answer": self._structured_answer(schemes, language), "degraded": True}
+    
+    def _structured_answer(self, schemes: List[Dict], language: str = "english") -> str:
+        """Answer built from the top scheme's Name and Benefits fields (no LLM)"""
+        import re
+        
+        if not schemes:
+            return NO_ANSWER_MESSAGE
+        
+        benefits = str(schemes[0].get('Benefits', '') or '').strip()
+        if benefits.lower() in EMPTY_FIELD_VALUES:
+            return self._template_answer(schemes, language)
+        
+        # First sentence of the benefits, short enough for voice
+        benefits = re.split(r'(?<=[.।])\s', benefits)[0][:200]
+        return f"{self._template_answer(schemes, language)} {benefits}"
+    
+    def _keyword_schemes(self, query: str, occupation: str = None, location: str = None,
+                         top_k: int = 5) -> List[Dict]:
+        """Rank CSV rows by keyword overlap with the query (no models needed)"""
+        from hybrid_retriever import tokenize
+        from synonym_dict import expand_query
+        
+        rows = self._load_scheme_rows()
+        with self._rows_lock:
+            if self._keyword_index is None or self._keyword_index[0] is not rows:
+                index = []
+                for scheme_id, row in rows.items():
+                    name_terms = set(tokenize(row.get("Name", "")))
+                    text = " ".join(str(row.get(field, "")) for field in ("Details", "Benefits", "Eligibility"))
+                    index.append((scheme_id, name_terms, name_terms | set(tokenize(text))))
+                self._keyword_index = (rows, index)
+            index = self._keyword_index[1]
+        
+        terms = set(tokenize(expand_query(self._build_search_query(query, occupation, location))))
+        if not terms:
             return []
+        
+        scored = []
+        for scheme_id, name_terms, all_terms in index:
+            # Name matches count double
+            score = len(terms & all_terms) + len(terms & name_terms)
+            if score:
+                scored.append((score, scheme_id))
+        scored.sort(key=lambda item: -item[0])
+        
+        schemes = []
+        for score, scheme_id in scored[:top_k]:
+            scheme = dict(rows[scheme_id])
+            scheme['scheme_id'] = scheme_id
+            scheme['Score'] = score / (2 * len(terms))
+            schemes.append(scheme)
+        return schemes
+    
+    def _template_answer(self, schemes: List[Dict], language: str = "english") -> str:
+        """Template-based response used when the LLM is not available"""
+        if not schemes:
+            return NO_ANSWER_MESSAGE
+        
+        name = str(schemes[0].get('Name', 'Government Scheme'))
+        if len(name) > 60:
+            name = " ".join(name.split()[:8])
+        
+        if language == "hindi":
+            return f"{name}। यह योजना आपके लिए उपयुक्त है।"
+        elif language == "hinglish":
+            return f"{name}। Yeh scheme aapke liye suitable hai।"
+        else:
+            return f"{name}. This scheme is suitable for you."
+    
+    def _load_scheme_rows(self, catalog: str = CENTRAL_CATALOG) -> Dict[Any, Dict]:
+        """CSV rows of a catalog keyed by scheme_id (reloaded only when its CSV changes)"""
+        csv_path = self.csv_path if catalog == CENTRAL_CATALOG else get_catalogs().get(catalog)
+        if not csv_path:
+            return {}
+        with self._rows_lock:
+            mtime, rows = self._scheme_rows.get(csv_path, (None, {}))
+            try:
+                current_mtime = os.path.getmtime(csv_path)
+            except OSError:
+                return rows
+            
+            if current_mtime != mtime:
+                df = read_catalog_csv(csv_path)
+                rows = {sid: row.to_dict() for sid, (_, row) in zip(scheme_keys(df), df.iterrows())}
+                self._scheme_rows[csv_path] = (current_mtime, rows)
+                logger.info(f"📄 Loaded {len(rows)} scheme rows of the {catalog} catalog for hydration")
+            
+            return rows
+    
+    def _schemes_from_hits(self, hits, answer: str, query: str, top_k: int = 5) -> List[Dict]:
+        """Turn retrieved chunks into de-duplicated, scored CSV scheme rows (one per scheme_id)"""
+        if not hits:
+            return self._parse_answer_to_schemes(answer, query, top_k) if answer else []
+        
+        # Best score per scheme, keeping first-seen order for ties
+        best = {}
+        for doc, score in hits:
+            metadata = doc.metadata or {}
+            # Chunks of state catalogs carry their catalog name; central chunks have none
+            key = (metadata.get("catalog", CENTRAL_CATALOG), metadata.get("scheme_id", metadata.get("scheme_name")))
+            if key not in best or score > best[key][1]:
+                best[key] = (doc, float(score))
+        
+        schemes = []
+        
+        for (catalog, scheme_id), (doc, score) in sorted(best.items(), key=lambda item: -item[1][1])[:top_k]:
+            row = self._load_scheme_rows(catalog).get(scheme_id)
+            if row is not None:
+                scheme = dict(row)
+            else:
+                metadata = doc.metadata or {}
+                scheme = {
+                    'Name': metadata.get("scheme_name") or 'Government Scheme Information',
+                    'Details': doc.page_content[:200],
+                    'Department': metadata.get("department", ""),
+                    'Gender': metadata.get("gender", "") or 'All'
+                }
+            scheme['scheme_id'] = scheme_id
+            scheme['Score'] = score
+            schemes.append(scheme)
+        
+        logger.info(f"📋 Mapped {len(schemes)} schemes from retrieved chunks")
+        return schemes
     
     def _parse_answer_to_schemes(self, answer: str, query: str, top_k: int = 5) -> List[Dict]:
         """Parse answer into scheme format for voice assistant - FIXED"""
@@ -394,14 +1611,36 @@ class EnhancedRAGDatabase:
         return self.search_by_context(query, top_k=limit)
     
     def get_scheme_count(self) -> int:
-        """Get total number of schemes"""
-        try:
-            if os.path.exists(self.csv_path):
-                df = pd.read_csv(self.csv_path)
-                return len(df)
-            return 0
-        except:
-            return 0
+        """Get total number of schemes (all catalogs, from the in-memory catalog snapshots)"""
+        return sum(snapshot.get("rows", 0) for snapshot in self.get_catalog_stats().values())
+    
+    def get_catalog_stats(self) -> Dict[str, Dict]:
+        """Catalog snapshot per catalog (catalogs without a CSV are left out)"""
+        stats = {}
+        for catalog, csv_path in get_catalogs().items():
+            try:
+                snapshot = get_catalog_snapshot(catalog, self.csv_path if catalog == CENTRAL_CATALOG else csv_path)
+            except Exception as e:
+                logger.warning(f"⚠️ Catalog snapshot failed ({catalog}): {e}")
+                snapshot = None
+            if snapshot is not None:
+                stats[catalog] = snapshot
+        return stats
+    
+    def get_model_status(self) -> Dict[str, Any]:
+        """Model readiness (cold / warming / ready / failed / unavailable)"""
+        return get_model_status()
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Answer cache hit/miss counters (plus semantic cache hit rates per language and prompt token savings)"""
+        stats = get_answer_cache().get_stats()
+        stats["context"] = get_context_stats()
+        stats["generation"] = get_generation_stats()
+        stats["single_flight"] = self._inflight.get_stats()
+        stats["faq"] = get_faq_store().get_stats()
+        if CONFIG.get("semantic_cache_enabled", True) and models_ready():
+            stats["semantic"] = get_semantic_cache(get_embedding().embed_query).get_stats()
+        return stats
     
     def close(self):
         """Close connections"""
@@ -413,7 +1652,7 @@ def SchemeDatabase(db_path, csv_path):
     from config import CONFIG
     groq_api_key = CONFIG.get("GROQ_API_KEY", "")
     
-    if not groq_api_key:
+    if not groq_api_key and CONFIG.get("llm_backend", "groq") == "groq":
         logger.warning("⚠️ No Groq API key found in config")
         try:
             config_path = os.path.join(os.path.dirname(__file__), "config.json")
@@ -0,0 +1,313 @@
+# entity_extractor.py - Gazetteer-based extraction of occupation, state, district, age, gender and caste
+import re
+import logging
+import threading
+from typing import Any, Dict, List
+
+from synonym_dict import SYNONYMS, PhraseAutomaton
+
+logger = logging.getLogger(__name__)
+
+# Occupation -> words users say about themselves (checked in this order on ties; a word listed under
+# several occupations counts for each, so "college student" is a student and "school teacher" a teacher)
+OCCUPATION_GAZETTEER = {
+    "farmer": [
+        "farmer", "kisan", "किसान", "किशन", "kheti", "खेती", "agriculture", "कृषि",
+        "crop", "field", "khet", "खेत", "गांव", "gaon", "farming", "कृषक", "krishak",
+        "खेतिहर", "khetihar", "cultivation", "उत्पादन", "seeds", "fertilizer", "krushi"
+    ],
+    "fisherman": [
+        "fisherman", "fishermen", "machhuara", "मछुआरा", "fishing", "boat", "marine", "मछली",
+        "machli", "नाव", "nav", "समुद्री", "samudr", "मत्स्य", "matsya"
+    ],
+    "women": [
+        "women", "mahila", "महिला", "female", "woman", "lady", "औरत", "aurat",
+        "girl", "लड़की", "ladki", "बेटी", "beti", "womens"
+    ],
+    "teacher": [
+        "teacher", "shikshak", "शिक्षक", "school", "college", "पढ़ाना", "padhana",
+        "अध्यापक", "adhyapak", "guru", "गुरु"
+    ],
+    "doctor": [
+        "doctor", "daktar", "डॉक्टर", "medical", "hospital", "चिकित्सक", "chikitsak",
+        "वैद्य", "vaidya"
+    ],
+    "business": [
+        "business", "vyavasaya", "व्यवसाय", "shop", "dukan", "दुकान", "udyog", "उद्योग",
+        "व्यापार", "vyapar", "entrepreneur", "उद्यमी", "udyami"
+    ],
+    "student": [
+        "student", "vidyarthi", "विद्यार्थी", "college", "school", "पढ़ाई", "padhai",
+        "छात्र", "chhatr", "छात्रा", "chhatra"
+    ]
+}
+
+# State -> names and abbreviations (SYNONYMS aliases are added when the extractor is built)
+STATE_GAZETTEER = {
+    "gujarat": ["गुजरात", "gujarat", "guj"],
+    "andhra pradesh": ["आंध्र प्रदेश", "andhra pradesh", "andhra", "ap"],
+    "goa": ["गोवा", "goa"],
+    "karnataka": ["कर्नाटक", "karnataka"],
+    "kerala": ["केरल", "kerala"],
+    "tamil nadu": ["तमिल नाडु", "tamil nadu", "tamilnadu", "tn"],
+    "maharashtra": ["महाराष्ट्र", "maharashtra", "mh"],
+    "uttar pradesh": ["उत्तर प्रदेश", "uttar pradesh", "up"],
+    "rajasthan": ["राजस्थान", "rajasthan"],
+    "punjab": ["पंजाब", "punjab"],
+    "haryana": ["हरियाणा", "haryana"],
+    "north eastern": ["north eastern", "northeast", "north east", "उत्तर पूर्वी", "ne"]
+}
+
+# District / city -> state
+DISTRICT_GAZETTEER = {
+    "ahmedabad": "gujarat", "अहमदाबाद": "gujarat", "gandhinagar": "gujarat", "गांधीनगर": "gujarat",
+    "surat": "gujarat", "सूरत": "gujarat", "vadodara": "gujarat", "baroda": "gujarat", "वडोदरा": "gujarat",
+    "rajkot": "gujarat", "राजकोट": "gujarat", "bhavnagar": "gujarat", "junagadh": "gujarat",
+    "jamnagar": "gujarat", "kutch": "gujarat", "kachchh": "gujarat", "कच्छ": "gujarat", "anand": "gujarat",
+    "mehsana": "gujarat", "amreli": "gujarat", "banaskantha": "gujarat", "valsad": "gujarat",
+    "visakhapatnam": "andhra pradesh", "vijayawada": "andhra pradesh", "guntur": "andhra pradesh",
+    "tirupati": "andhra pradesh", "panaji": "goa", "पणजी": "goa", "margao": "goa",
+    "bangalore": "karnataka", "bengaluru": "karnataka", "बंगलोर": "karnataka", "mysore": "karnataka",
+    "mysuru": "karnataka", "मैसूर": "karnataka", "mangalore": "karnataka", "hubli": "karnataka",
+    "kochi": "kerala", "कोच्चि": "kerala", "thiruvananthapuram": "kerala", "kozhikode": "kerala",
+    "thrissur": "kerala", "chennai": "tamil nadu", "चेन्नई": "tamil nadu", "madurai": "tamil nadu",
+    "coimbatore": "tamil nadu", "mumbai": "maharashtra", "मुंबई": "maharashtra", "pune": "maharashtra",
+    "पुणे": "maharashtra", "nagpur": "maharashtra", "nashik": "maharashtra", "lucknow": "uttar pradesh",
+    "लखनौ": "uttar pradesh", "लखनऊ": "uttar pradesh", "kanpur": "uttar pradesh", "varanasi": "uttar pradesh",
+    "agra": "uttar pradesh", "jaipur": "rajasthan", "जयपुर": "rajasthan", "jodhpur": "rajasthan",
+    "udaipur": "rajasthan", "ludhiana": "punjab", "amritsar": "punjab", "gurgaon": "haryana",
+    "gurugram": "haryana", "faridabad": "haryana", "guwahati": "north eastern", "shillong": "north eastern"
+}
+
+GENDER_GAZETTEER = {
+    "female": ["female", "woman", "women", "lady", "mahila", "महिला", "aurat", "औरत", "girl", "ladki",
+               "लड़की", "beti", "बेटी", "widow", "vidhwa", "विधवा", "mother", "maa", "माँ"],
+    "male": ["male", "man", "men", "purush", "पुरुष", "aadmi", "आदमी", "boy", "ladka", "लड़का"]
+}
+
+# Keys match enhanced_rag_database.CASTE_PATTERNS
+CASTE_GAZETTEER = {
+    "sc": ["sc", "scheduled caste", "dalit", "अनुसूचित जाति"],
+    "st": ["st", "scheduled tribe", "tribal", "adivasi", "आदिवासी", "अनुसूचित जनजाति"],
+    "obc": ["obc", "backward class", "other backward class", "पिछड़ा वर्ग"],
+    "ews": ["ews", "economically weaker section"],
+    "general": ["general category", "general caste", "सामान्य वर्ग"]
+}
+
+# Confidence of a gazetteer hit before context is considered
+GAZETTEER_CONFIDENCE = 0.9
+SYNONYM_CONFIDENCE = 0.7
+# Short aliases that are also ordinary words ("up", "ne", "st." for street) or easily misheard
+AMBIGUOUS_ALIASES = {"ap", "up", "tn", "mh", "ne", "sc", "st"}
+AMBIGUOUS_CONFIDENCE = 0.4
+# Location cue right before ("from Gujarat") or after ("Gujarat se") a place name
+LOCATION_CUES_BEFORE = {"from", "in", "at", "of", "state"}
+LOCATION_CUES_AFTER = {"se", "से", "mein", "me", "में", "ka", "ki", "ke", "का", "की", "के", "state", "district",
+                       "zila", "जिला", "प्रदेश"}
+# Caste cue next to a caste word ("SC category", "jati ST")
+CASTE_CUES = {"caste", "category", "class", "jati", "जाति", "varg", "वर्ग"}
+CUE_BOOST = 0.3
+# Parsed values below this confidence are not used
+MIN_CONFIDENCE = 0.5
+
+AGE_UNITS = {"year", "years", "yr", "yrs", "saal", "sal", "साल", "वर्ष", "varsh", "baras", "बरस"}
+AGE_CUES = {"age", "umar", "umr", "उम्र", "aayu", "आयु"}
+AGE_FILLERS = {"is", "hai", "है", "meri", "मेरी", "my", "of"}
+MIN_AGE, MAX_AGE = 1, 120
+
+ENTITY_TYPES = ("occupation", "state", "district", "age", "gender", "caste")
+
+# Latin words and whole Devanagari runs (matras included), with character offsets kept
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+|[\u0900-\u097F]+")
+
+def tokenize_with_offsets(text: str):
+    """[(token, start, end), ...] of the lowercased text"""
+    return [(m.group(), m.start(), m.end()) for m in TOKEN_PATTERN.finditer(text.lower())]
+
+def _age_cued(words: List[str], i: int) -> bool:
+    """Is the number at words[i] preceded by an age cue ("age 45", "meri umar 30 hai")?"""
+    for j in range(i - 1, max(-1, i - 4), -1):
+        if words[j] in AGE_CUES:
+            return True
+        if words[j] not in AGE_FILLERS:
+            return False
+    return False
+
+class EntityExtractor:
+    """Typed entity spans from one automaton pass over an utterance
+
+    Gazetteer phrases (occupations, states, districts, gender and caste words,
+    plus SYNONYMS aliases) are compiled once into a word-level Aho-Corasick
+    automaton; ages are read from numbers next to an age unit or cue.
+    """
+
+    def __init__(self):
+        phrases = {}
+
+        def add(phrase, entity_type, value, confidence):
+            words = tuple(token for token, _, _ in tokenize_with_offsets(phrase))
+            if not words:
+                return
+            if len(words) == 1 and words[0] in AMBIGUOUS_ALIASES:
+                confidence = AMBIGUOUS_CONFIDENCE
+            entries = phrases.setdefault(words, [])
+            # First (most specific) source wins per type; a word shared by occupations names each of them
+            if not any(entry[0] == entity_type and (entity_type != "occupation" or entry[1] == value)
+                       for entry in entries):
+                entries.append((entity_type, value, confidence))
+
+        for occupation, words in OCCUPATION_GAZETTEER.items():
+            for word in [occupation] + words:
+                add(word, "occupation", occupation, GAZETTEER_CONFIDENCE)
+                if word.isascii() and not word.endswith("s"):
+                    add(word + "s", "occupation", occupation, GAZETTEER_CONFIDENCE)
+        for occupation in OCCUPATION_GAZETTEER:
+            for word in SYNONYMS.get(occupation, []):
+                add(word, "occupation", occupation, SYNONYM_CONFIDENCE)
+
+        for state, names in STATE_GAZETTEER.items():
+            for name in [state] + names:
+                add(name, "state", state, GAZETTEER_CONFIDENCE)
+        for district, state in DISTRICT_GAZETTEER.items():
+            add(district, "district", district, GAZETTEER_CONFIDENCE)
+        for state in STATE_GAZETTEER:
+            for alias in SYNONYMS.get(state, []):
+                if alias.lower() not in DISTRICT_GAZETTEER:
+                    add(alias, "state", state, SYNONYM_CONFIDENCE)
+
+        for gender, words in GENDER_GAZETTEER.items():
+            for word in words:
+                add(word, "gender", gender, GAZETTEER_CONFIDENCE)
+        for caste, words in CASTE_GAZETTEER.items():
+            for word in words:
+                add(word, "caste", caste, GAZETTEER_CONFIDENCE)
+
+        self.automaton = PhraseAutomaton(phrases)
+        self.phrase_count = len(phrases)
+
+    def extract(self, text: str) -> List[Dict[str, Any]]:
+        """All entity spans -> [{"type", "value", "text", "start", "end", "confidence"}, ...] in text order"""
+        if not text:
+            return []
+        tokens = tokenize_with_offsets(text)
+        words = [token for token, _, _ in tokens]
+        spans = []
+
+        def span(entity_type, value, first, last, confidence):
+            start, end = tokens[first][1], tokens[last][2]
+            spans.append({
+                "type": entity_type,
+                "value": value,
+                "text": text[start:end],
+                "start": start,
+                "end": end,
+                "confidence": round(min(1.0, confidence), 2)
+            })
+
+        for first, (end, entries) in sorted(self.automaton.find_longest(words).items()):
+            before = words[first - 1] if first > 0 else None
+            after = words[end] if end < len(words) else None
+            cued = before in LOCATION_CUES_BEFORE or after in LOCATION_CUES_AFTER
+            caste_cued = before in CASTE_CUES or after in CASTE_CUES
+            for entity_type, value, confidence in entries:
+                if entity_type in ("state", "district") and cued:
+                    confidence += CUE_BOOST
+                elif entity_type == "caste" and caste_cued:
+                    confidence += CUE_BOOST
+                span(entity_type, value, first, end - 1, confidence)
+                if entity_type == "district":
+                    # The district implies its state, a little less surely
+                    span("state", DISTRICT_GAZETTEER[value], first, end - 1, confidence - 0.2)
+
+        for i, word in enumerate(words):
+            if not word.isdigit():
+                continue
+            age = int(word)
+            if not MIN_AGE <= age <= MAX_AGE:
+                continue
+            if i + 1 < len(words) and words[i + 1] in AGE_UNITS:
+                span("age", age, i, i + 1, 0.9)
+            elif _age_cued(words, i):
+                span("age", age, i, i, 0.8)
+
+        spans.sort(key=lambda s: (s["start"], ENTITY_TYPES.index(s["type"])))
+        return spans
+
+    def extract_batch(self, texts: List[str]) -> List[List[Dict[str, Any]]]:
+        """extract() for many utterances (repeated utterances are extracted once)"""
+        unique = {}
+        for text in texts:
+            if text not in unique:
+                unique[text] = self.extract(text)
+        return [[dict(s) for s in unique[text]] for text in texts]
+
+    @staticmethod
+    def best(spans: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Most likely span per entity type
+
+        Every word matched for a value adds up, so "kisan ... kheti" beats a
+        single "school" and "college student" is a student (both words count
+        for student, only "college" for teacher); ties go to the first mention.
+        """
+        totals = {}
+        for s in spans:
+            key = (s["type"], s["value"])
+            if key in totals:
+                total = totals[key]
+                total["confidence"] = round(min(1.0, max(total["confidence"], s["confidence"]) + 0.05), 2)
+            else:
+                totals[key] = dict(s)
+        chosen = {}
+        for s in totals.values():
+            current = chosen.get(s["type"])
+            if current is None or s["confidence"] > current["confidence"]:
+                chosen[s["type"]] = s
+        return chosen
+
+    def _parsed(self, spans: List[Dict[str, Any]], min_confidence: float) -> Dict[str, Any]:
+        parsed = {entity_type: None for entity_type in ENTITY_TYPES}
+        for entity_type, s in self.best(spans).items():
+            if s["confidence"] >= min_confidence:
+                parsed[entity_type] = s["value"]
+        parsed["spans"] = spans
+        return parsed
+
+    def parse(self, text: str, min_confidence: float = MIN_CONFIDENCE) -> Dict[str, Any]:
+        """{"occupation", "state", "district", "age", "gender", "caste"} (None when not found) + "spans\""""
+        return self._parsed(self.extract(text), min_confidence)
+
+    def parse_batch(self, texts: List[str], min_confidence: float = MIN_CONFIDENCE) -> List[Dict[str, Any]]:
+        """parse() for many utterances in one call"""
+        return [self._parsed(spans, min_confidence) for spans in self.extract_batch(texts)]
+
+def entities_to_profile(parsed: Dict[str, Any]) -> Dict[str, Any]:
+    """Profile for enhanced_rag_database.build_profile_filter() from a parse() result"""
+    profile = {
+        "occupation": parsed.get("occupation"),
+        "state": parsed.get("state"),
+        "gender": parsed.get("gender"),
+        "age": parsed.get("age"),
+        "caste": parsed.get("caste")
+    }
+    return {key: value for key, value in profile.items() if value is not None}
+
+_extractor = None
+_extractor_lock = threading.Lock()
+
+def get_entity_extractor() -> EntityExtractor:
+    """Get the shared extractor (the automaton is compiled on first use)"""
+    global _extractor
+    if _extractor is None:
+        with _extractor_lock:
+            if _extractor is None:
+                _extractor = EntityExtractor()
+                logger.info(f"🏷️ Entity extractor ready ({_extractor.phrase_count} gazetteer phrases)")
+    return _extractor
+
+def extract_entities(text: str) -> Dict[str, Any]:
+    """Parsed entities of one utterance (see EntityExtractor.parse)"""
+    return get_entity_extractor().parse(text)
+
+def extract_entities_batch(texts: List[str]) -> List[Dict[str, Any]]:
+    """Parsed entities of many utterances"""
+    return get_entity_extractor().parse_batch(texts)
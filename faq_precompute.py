@@ -0,0 +1,377 @@
+# faq_precompute.py - Offline answers for occupation x state x intent x language combinations
+import os
+import json
+import time
+import sqlite3
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import CONFIG
+from synonym_dict import SYNONYMS, get_occupation_keywords
+from answer_cache import normalize_query
+from context_builder import INTENT_KEYWORDS, detect_intent
+
+logger = logging.getLogger(__name__)
+
+working_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Occupations parse_user_occupation() can return
+FAQ_OCCUPATIONS = ["farmer", "fisherman", "women", "teacher", "doctor", "business", "student"]
+
+# States parse_user_occupation() recognises (all of them are SYNONYMS keys)
+FAQ_STATES = ["gujarat", "andhra pradesh", "goa", "karnataka", "kerala", "tamil nadu", "maharashtra",
+              "uttar pradesh", "rajasthan", "punjab", "haryana", "north eastern"]
+
+FAQ_LANGUAGES = ["english", "hindi", "hinglish"]
+
+# Canonical question per intent (context_builder intent names); occupation, state and
+# language are added by EnhancedRAGDatabase._build_question()
+FAQ_QUESTIONS = {
+    "benefits": "What are the benefits of government schemes",
+    "eligibility": "Who is eligible for government schemes",
+    "documents": "Which documents are needed for government schemes",
+    "application": "How to apply for government schemes"
+}
+
+# Filler words that do not change which FAQ answer fits
+FILLER_WORDS = {
+    "i", "am", "me", "my", "we", "our", "a", "an", "the", "of", "for", "to", "in", "from", "and", "or",
+    "is", "are", "do", "does", "can", "will", "which", "there", "any", "all", "about", "please", "tell",
+    "know", "give", "available", "schemes", "yojana", "yojanas", "sarkari",
+    "hai", "hain", "ka", "ki", "ke", "ko", "se", "mein", "main", "mujhe", "hum", "hamein", "liye",
+    "kya", "koi", "batao", "bataiye", "sakta", "sakti", "kaun", "kaunsi", "kon", "kitna",
+    "मैं", "मुझे", "मेरे", "हम", "के", "का", "की", "को", "से", "में", "है", "हैं", "क्या", "लिए",
+    "कोई", "बताओ", "बताइए", "योजना", "योजनाएं", "सरकारी"
+}
+
+# SYNONYMS entries that only rephrase the question itself
+GENERIC_SYNONYM_KEYS = ["scheme", "government", "how", "what", "who", "get", "need", "help", "benefit",
+                        "apply", "application", "documents", "eligibility", "eligible", "criteria", "amount"]
+
+def _words(phrases) -> set:
+    return {word for phrase in phrases for word in normalize_query(phrase).split()}
+
+_vocabulary = None
+_vocabulary_lock = threading.Lock()
+
+def _faq_vocabulary() -> Dict[str, Any]:
+    """Word sets: generic question words plus the words of each occupation and state"""
+    global _vocabulary
+    with _vocabulary_lock:
+        if _vocabulary is None:
+            generic = set(FILLER_WORDS)
+            generic |= _words(word for keywords in INTENT_KEYWORDS.values() for word in keywords)
+            for key in GENERIC_SYNONYM_KEYS:
+                generic |= _words([key] + SYNONYMS.get(key, []))
+            occupations = {
+                occupation: _words([occupation] + SYNONYMS.get(occupation, []) + get_occupation_keywords(occupation))
+                for occupation in FAQ_OCCUPATIONS
+            }
+            states = {state: _words([state] + SYNONYMS.get(state, [])) for state in FAQ_STATES}
+            _vocabulary = {"generic": generic, "occupations": occupations, "states": states}
+        return _vocabulary
+
+def normalize_state(location: str) -> Optional[str]:
+    """Canonical FAQ state for a parsed location ("" for none, None if not a known state)"""
+    if not location:
+        return ""
+    text = normalize_query(location)
+    for state in FAQ_STATES:
+        if text == state or text in (normalize_query(v) for v in SYNONYMS.get(state, [])):
+            return state
+    return None
+
+def faq_key(query: str, occupation: str = None, location: str = None,
+            language: str = "english") -> Optional[Tuple[str, str, str, str]]:
+    """(occupation, location, intent, language) if the query is a plain FAQ for this user, else None
+
+    A query qualifies only when every word in it is filler, intent wording or
+    a name of the user's own occupation/state; anything more specific
+    ("pm kisan", "borewell") needs the real pipeline.
+    """
+    intent = detect_intent(query)
+    if intent not in FAQ_QUESTIONS or language not in FAQ_LANGUAGES:
+        return None
+    occupation = (occupation or "").lower()
+    if occupation and occupation not in FAQ_OCCUPATIONS:
+        return None
+    state = normalize_state(location)
+    if state is None:
+        return None
+
+    vocabulary = _faq_vocabulary()
+    allowed = vocabulary["generic"] | vocabulary["occupations"].get(occupation, set()) | vocabulary["states"].get(state, set())
+    if not set(normalize_query(query).split()) <= allowed:
+        return None
+    return occupation, state, intent, language
+
+def faq_combinations(occupations: List[str] = None, states: List[str] = None, intents: List[str] = None,
+                     languages: List[str] = None) -> List[Tuple[str, str, str, str]]:
+    """Every (occupation, location, intent, language) key; "" stands for no occupation / no state"""
+    occupations = [""] + FAQ_OCCUPATIONS if occupations is None else occupations
+    states = [""] + FAQ_STATES if states is None else states
+    intents = list(FAQ_QUESTIONS) if intents is None else intents
+    languages = FAQ_LANGUAGES if languages is None else languages
+    return [(o, s, i, l) for o in occupations for s in states for i in intents for l in languages]
+
+def _catalog_names() -> List[str]:
+    import enhanced_rag_database as rag
+    return [rag.CENTRAL_CATALOG] + sorted(name for name in rag.get_catalogs() if name != rag.CENTRAL_CATALOG)
+
+def catalog_signature() -> Tuple:
+    """Cheap change marker of the ingest manifests (names + mtimes), so the catalog hash is only recomputed after an ingest"""
+    import enhanced_rag_database as rag
+    signature = []
+    for name in _catalog_names():
+        try:
+            mtime = os.path.getmtime(os.path.join(rag.catalog_vectorstore_path(name), rag.MANIFEST_FILENAME))
+        except OSError:
+            mtime = None
+        signature.append((name, mtime))
+    return tuple(signature)
+
+def current_catalog() -> str:
+    """Index fingerprint of the last ingest ("" if there is no manifest), combined over all catalogs"""
+    import hashlib
+    import enhanced_rag_database as rag
+    names = _catalog_names()
+    hashes = [rag.manifest_fingerprint(rag.load_ingest_manifest(rag.catalog_vectorstore_path(name)))
+              for name in names]
+    if len(hashes) == 1:
+        return hashes[0]
+    return hashlib.sha256("|".join(hashes).encode("utf-8")).hexdigest()
+
+# Last catalog_signature() and its current_catalog(), shared by the FAQ store and the answer cache keys
+_catalog_state = {"checked_at": None, "signature": None, "catalog": ""}
+_catalog_lock = threading.Lock()
+
+def cached_catalog() -> str:
+    """current_catalog(), recomputed only after an ingest manifest changed
+
+    Manifest mtimes are checked at most every CONFIG["catalog_check_interval"]
+    seconds, so lookups don't stat every catalog's manifest each time.
+    """
+    now = time.monotonic()
+    interval = CONFIG.get("catalog_check_interval", 5.0)
+    with _catalog_lock:
+        checked_at = _catalog_state["checked_at"]
+        if checked_at is not None and now - checked_at < interval:
+            return _catalog_state["catalog"]
+        signature = catalog_signature()
+        if signature != _catalog_state["signature"]:
+            _catalog_state["catalog"] = current_catalog()
+            _catalog_state["signature"] = signature
+        _catalog_state["checked_at"] = now
+        return _catalog_state["catalog"]
+
+class FAQStore:
+    """Precomputed answers: indexed SQLite table on disk, dict in memory for O(1) lookups
+
+    Rows are stamped with the catalog hash they were generated from; rows of an
+    older catalog are ignored until the job is re-run. The catalog is rechecked
+    on lookups (see cached_catalog), so a re-ingest takes effect in running
+    processes too.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._answers = {}
+        # (db file mtime, catalog hash) the in-memory table was loaded for
+        self._loaded_key = None
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "stored": 0}
+        self._conn = None
+        self._initialize_sqlite()
+
+    def _initialize_sqlite(self):
+        """Open (or create) the FAQ table"""
+        try:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS faq_answers (
+                occupation TEXT NOT NULL,
+                location TEXT NOT NULL,
+                intent TEXT NOT NULL,
+                language TEXT NOT NULL,
+                question TEXT NOT NULL,
+                result TEXT NOT NULL,
+                catalog_hash TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (occupation, location, intent, language)
+            )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_faq_catalog ON faq_answers (catalog_hash)")
+            self._conn.commit()
+        except Exception as e:
+            logger.warning(f"⚠️ FAQ store disabled: {e}")
+            self._conn = None
+
+    def _refresh(self):
+        """Reload the in-memory table when the database file (e.g. the job ran in another
+        process) or the catalog (a re-ingest) changed"""
+        try:
+            mtime = os.path.getmtime(self.db_path)
+        except OSError:
+            return
+        if self._conn is None:
+            return
+        catalog = cached_catalog()
+        if (mtime, catalog) == self._loaded_key:
+            return
+        try:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT occupation, location, intent, language, result FROM faq_answers WHERE catalog_hash = ?",
+                    (catalog,)
+                ).fetchall()
+        except Exception as e:
+            logger.warning(f"⚠️ FAQ store read failed: {e}")
+            return
+        self._answers = {tuple(row[:4]): json.loads(row[4]) for row in rows}
+        self._loaded_key = (mtime, catalog)
+        logger.info(f"📚 Loaded {len(self._answers)} precomputed FAQ answers")
+
+    def get(self, key: Tuple[str, str, str, str]) -> Optional[Dict[str, Any]]:
+        """Stored answer for a faq_key(), or None"""
+        self._refresh()
+        result = self._answers.get(key)
+        with self._lock:
+            self.stats["hits" if result is not None else "misses"] += 1
+        return result
+
+    def put(self, key: Tuple[str, str, str, str], question: str, result: Dict[str, Any], catalog: str):
+        """Insert or replace one precomputed answer"""
+        if self._conn is None:
+            return
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO faq_answers "
+                    "(occupation, location, intent, language, question, result, catalog_hash, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (*key, question, json.dumps(result, ensure_ascii=False), catalog, time.time())
+                )
+                self._conn.commit()
+                self.stats["stored"] += 1
+        except Exception as e:
+            logger.warning(f"⚠️ FAQ store write failed: {e}")
+
+    def stored_keys(self, catalog: str) -> set:
+        """Keys already answered for this catalog (to resume an interrupted job)"""
+        if self._conn is None:
+            return set()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT occupation, location, intent, language FROM faq_answers WHERE catalog_hash = ?", (catalog,)
+            ).fetchall()
+        return {tuple(row) for row in rows}
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+        stats["entries"] = len(self._answers)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_faq_store() -> FAQStore:
+    """Get the shared FAQ store configured from CONFIG"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = FAQStore(os.path.join(working_dir, CONFIG.get("faq_db_path", "faq_answers.db")))
+    return _store
+
+def lookup_faq(query: str, occupation: str = None, location: str = None,
+               language: str = "english", top_k: int = 5) -> Optional[Dict[str, Any]]:
+    """Precomputed {"schemes", "answer"} for a plain FAQ, or None (no retrieval, no LLM)"""
+    if not CONFIG.get("faq_enabled", True):
+        return None
+    key = faq_key(query, occupation, location, language)
+    if key is None:
+        return None
+    result = get_faq_store().get(key)
+    if result is None:
+        return None
+    return {"schemes": result["schemes"][:top_k], "answer": result["answer"]}
+
+def precompute_faq(combinations: List[Tuple[str, str, str, str]] = None, workers: int = None,
+                   top_k: int = 5, resume: bool = True, model_timeout: float = 300.0) -> Optional[Dict[str, Any]]:
+    """Answer every combination through the full RAG pipeline and store the good answers
+
+    Runs `workers` pipelines at once (LLM calls are still capped by
+    CONFIG["llm_max_concurrency"]). With resume, combinations already stored
+    for the current catalog are skipped. Returns job stats, or None on failure.
+    """
+    import enhanced_rag_database as rag
+
+    workers = workers or CONFIG.get("faq_workers", 4)
+    combinations = faq_combinations() if combinations is None else combinations
+
+    db = rag.SchemeDatabase(CONFIG["sqlite_db_path"], CONFIG["schemes_csv_path"])
+    if not db.available:
+        print("❌ RAG system not available, cannot precompute FAQ answers")
+        return None
+    rag.start_model_warmup()
+    if rag.get_llm(timeout=model_timeout) is None:
+        print("❌ Models did not load, cannot precompute FAQ answers")
+        return None
+
+    store = get_faq_store()
+    catalog = current_catalog()
+    done = store.stored_keys(catalog) if resume else set()
+    pending = [key for key in combinations if key not in done]
+    stats = {"total": len(combinations), "skipped": len(combinations) - len(pending),
+             "stored": 0, "failed": 0, "seconds": 0.0}
+    print(f"📚 Precomputing {len(pending)} FAQ answers ({stats['skipped']} already done, {workers} workers)")
+
+    def answer(key):
+        occupation, location, intent, language = key
+        question = FAQ_QUESTIONS[intent]
+        result = db._answer_query_uncached(question, occupation or None, location or None, language, top_k,
+                                           db._merge_profile({"occupation": occupation or None}, location or None))
+        return question, result
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(answer, key): key for key in pending}
+        for count, future in enumerate(as_completed(futures), 1):
+            key = futures[future]
+            try:
+                question, result = future.result()
+            except Exception as e:
+                logger.warning(f"⚠️ FAQ answer failed for {key}: {e}")
+                result = None
+            # Degraded or empty answers are left for the online pipeline
+            if result is not None and rag._classify_pipeline_result(result) == rag.CACHE_OK:
+                store.put(key, question, result, catalog)
+                stats["stored"] += 1
+            else:
+                stats["failed"] += 1
+            if count % 50 == 0:
+                print(f"⏳ {count}/{len(pending)} FAQ answers ({count / (time.perf_counter() - start):.1f}/sec)")
+
+    stats["seconds"] = time.perf_counter() - start
+    print(f"✅ Stored {stats['stored']} FAQ answers in {stats['seconds']:.1f}s ({stats['failed']} failed)")
+    return stats
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute answers for occupation x state x intent x language")
+    parser.add_argument("--workers", type=int, default=None, help="Concurrent pipelines")
+    parser.add_argument("--languages", nargs="+", default=None, choices=FAQ_LANGUAGES)
+    parser.add_argument("--intents", nargs="+", default=None, choices=list(FAQ_QUESTIONS))
+    parser.add_argument("--no-resume", action="store_true", help="Regenerate combinations already stored")
+    args = parser.parse_args()
+
+    precompute_faq(
+        faq_combinations(intents=args.intents, languages=args.languages),
+        workers=args.workers,
+        resume=not args.no_resume
+    )
@@ -0,0 +1,231 @@
+# hybrid_retriever.py - BM25 + vector retrieval fused with reciprocal rank fusion
+import re
+import json
+import math
+import time
+import logging
+import threading
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from synonym_dict import expand_query
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+|[\u0900-\u097F]+")
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens; Devanagari runs are kept whole (matras included)"""
+    if not text:
+        return []
+    return TOKEN_PATTERN.findall(str(text).lower())
+
+def metadata_matches(metadata: Dict[str, Any], where: Optional[Dict]) -> bool:
+    """Evaluate a Chroma-style `where` predicate against one metadata dict"""
+    if not where:
+        return True
+    for field, condition in where.items():
+        if field == "$and":
+            if not all(metadata_matches(metadata, clause) for clause in condition):
+                return False
+        elif field == "$or":
+            if not any(metadata_matches(metadata, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = metadata.get(field)
+            for operator, operand in condition.items():
+                if operator == "$in" and value not in operand:
+                    return False
+                if operator == "$nin" and value in operand:
+                    return False
+                if operator == "$eq" and value != operand:
+                    return False
+                if operator == "$ne" and value == operand:
+                    return False
+                if operator in ("$lt", "$lte", "$gt", "$gte"):
+                    if value is None:
+                        return False
+                    if operator == "$lt" and not value < operand:
+                        return False
+                    if operator == "$lte" and not value <= operand:
+                        return False
+                    if operator == "$gt" and not value > operand:
+                        return False
+                    if operator == "$gte" and not value >= operand:
+                        return False
+        elif metadata.get(field) != condition:
+            return False
+    return True
+
+def vector_search(vectorstore, query: str, k: int, where: Optional[Dict] = None, embedding=None):
+    """Relevance-scored vector search by query text, or by an already computed query embedding"""
+    if embedding is None:
+        if where:
+            return vectorstore.similarity_search_with_relevance_scores(query, k=k, filter=where)
+        return vectorstore.similarity_search_with_relevance_scores(query, k=k)
+    hits = vectorstore.similarity_search_by_vector_with_relevance_scores(embedding, k=k, filter=where)
+    if hasattr(vectorstore, "search_rows"):
+        # Matrix / IVF index: scores are relevances already
+        return hits
+    # Chroma returns distances here; map them like its text search does
+    relevance = vectorstore._select_relevance_score_fn()
+    return [(doc, relevance(distance)) for doc, distance in hits]
+
+class BM25Index:
+    """In-memory BM25 inverted index"""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings = defaultdict(list)  # term -> [(doc index, term frequency)]
+        self.doc_lengths = []
+        self.idf = {}
+        self.avg_length = 0.0
+
+    def build(self, texts: List[str]):
+        """Index a list of texts (document index = list position)"""
+        self.postings = defaultdict(list)
+        self.doc_lengths = []
+        for doc_index, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            self.doc_lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                self.postings[term].append((doc_index, tf))
+
+        total = len(self.doc_lengths)
+        self.avg_length = sum(self.doc_lengths) / total if total else 0.0
+        self.idf = {
+            term: math.log(1 + (total - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in self.postings.items()
+        }
+
+    def search(self, query_terms: List[str], k: int = 10, allowed=None) -> List[Tuple[int, float]]:
+        """Top-k (doc index, score); `allowed` optionally restricts candidate doc indexes"""
+        scores = defaultdict(float)
+        for term in set(query_terms):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for doc_index, tf in self.postings[term]:
+                if allowed is not None and doc_index not in allowed:
+                    continue
+                length_norm = 1 - self.b + self.b * self.doc_lengths[doc_index] / (self.avg_length or 1.0)
+                scores[doc_index] += idf * tf * (self.k1 + 1) / (tf + self.k1 * length_norm)
+        return sorted(scores.items(), key=lambda item: -item[1])[:k]
+
+class HybridRetriever:
+    """Vector similarity + BM25 keyword search over the same chunks, fused with RRF"""
+
+    def __init__(self, vectorstore, rrf_k: int = 60, fetch_k: int = 20):
+        self.vectorstore = vectorstore
+        self.rrf_k = rrf_k
+        self.fetch_k = fetch_k
+
+        self.documents = []
+        self.bm25 = BM25Index()
+        # Canonical `where` -> allowed doc indexes (cleared when the corpus is rebuilt)
+        self._allowed = {}
+        self._allowed_lock = threading.Lock()
+        self._local = threading.local()
+        self._totals_lock = threading.Lock()
+        self.timing_totals = {"vector_ms": 0.0, "bm25_ms": 0.0, "fusion_ms": 0.0, "calls": 0}
+
+        self._build()
+
+    def _build(self):
+        """Load every chunk from the vectorstore and index it for BM25"""
+        start = time.perf_counter()
+        data = self.vectorstore.get(include=["documents", "metadatas"])
+        texts = data.get("documents") or []
+        metadatas = data.get("metadatas") or [{}] * len(texts)
+        self.documents = list(zip(texts, metadatas))
+        self.bm25.build(texts)
+        with self._allowed_lock:
+            self._allowed = {}
+        logger.info(f"📚 BM25 index: {len(texts)} chunks, {len(self.bm25.postings)} terms "
+                    f"in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+    def _allowed_indexes(self, where: Dict) -> frozenset:
+        """Doc indexes matching a `where` predicate (cached per predicate, like MatrixVectorStore._mask)"""
+        key = json.dumps(where, sort_keys=True, default=str)
+        with self._allowed_lock:
+            allowed = self._allowed.get(key)
+        if allowed is None:
+            allowed = frozenset(i for i, (_, metadata) in enumerate(self.documents)
+                                if metadata_matches(metadata or {}, where))
+            with self._allowed_lock:
+                if len(self._allowed) >= 256:
+                    self._allowed.clear()
+                self._allowed[key] = allowed
+        return allowed
+
+    @staticmethod
+    def _doc_key(text: str, metadata: Dict) -> Tuple[Any, str]:
+        """Identity of a chunk shared by both result lists"""
+        return (metadata or {}).get("scheme_id"), text
+
+    @property
+    def last_timings(self) -> Dict[str, float]:
+        """Per-source timings of this thread's most recent retrieve()"""
+        return getattr(self._local, "timings", {})
+
+    def get_timing_stats(self) -> Dict[str, float]:
+        """Average per-source timings across all calls"""
+        with self._totals_lock:
+            calls = self.timing_totals["calls"]
+            return {
+                "calls": calls,
+                "avg_vector_ms": self.timing_totals["vector_ms"] / calls if calls else 0.0,
+                "avg_bm25_ms": self.timing_totals["bm25_ms"] / calls if calls else 0.0,
+                "avg_fusion_ms": self.timing_totals["fusion_ms"] / calls if calls else 0.0
+            }
+
+    def retrieve(self, query: str, k: int = 5, where: Dict = None, embedding=None):
+        """Fused top-k -> [(document, rrf score), ...]
+
+        `embedding` (the query's vector, e.g. from one batched embedding call)
+        skips embedding the query again.
+        """
+        from langchain.schema import Document
+
+        fetch_k = max(self.fetch_k, k)
+
+        start = time.perf_counter()
+        vector_hits = vector_search(self.vectorstore, query, fetch_k, where=where, embedding=embedding)
+        vector_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        allowed = None
+        if where:
+            allowed = self._allowed_indexes(where)
+        # Synonym expansion lets Hinglish/Hindi words hit English scheme text
+        bm25_hits = self.bm25.search(tokenize(expand_query(query)), k=fetch_k, allowed=allowed)
+        bm25_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        fused = defaultdict(float)
+        documents = {}
+        for rank, (doc, _) in enumerate(vector_hits):
+            key = self._doc_key(doc.page_content, doc.metadata)
+            fused[key] += 1.0 / (self.rrf_k + rank + 1)
+            documents[key] = doc
+        for rank, (doc_index, _) in enumerate(bm25_hits):
+            text, metadata = self.documents[doc_index]
+            key = self._doc_key(text, metadata)
+            fused[key] += 1.0 / (self.rrf_k + rank + 1)
+            if key not in documents:
+                documents[key] = Document(page_content=text, metadata=metadata or {})
+        ranked = sorted(fused.items(), key=lambda item: -item[1])[:k]
+        fusion_ms = (time.perf_counter() - start) * 1000
+
+        self._local.timings = {"vector_ms": vector_ms, "bm25_ms": bm25_ms, "fusion_ms": fusion_ms}
+        with self._totals_lock:
+            self.timing_totals["vector_ms"] += vector_ms
+            self.timing_totals["bm25_ms"] += bm25_ms
+            self.timing_totals["fusion_ms"] += fusion_ms
+            self.timing_totals["calls"] += 1
+
+        logger.info(f"🔀 Hybrid retrieval: vector {vector_ms:.0f}ms ({len(vector_hits)}), "
+                    f"bm25 {bm25_ms:.1f}ms ({len(bm25_hits)}), fusion {fusion_ms:.1f}ms")
+
+        return [(documents[key], score) for key, score in ranked]
@@ -0,0 +1,188 @@
+# ingest_pipeline.py - Streaming, batched CSV -> embeddings -> vectorstore ingest
+import os
+import time
+import logging
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+import enhanced_rag_database as rag
+from config import CONFIG
+
+logger = logging.getLogger(__name__)
+
+def _batches(items, size):
+    """Split a list into consecutive batches"""
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+def ingest_csv_streaming(csv_file_path: str, csv_hash: str = None, chunk_rows: int = None,
+                         batch_size: int = None, workers: int = None, write_batch: int = None,
+                         vectorstore_path: str = rag.VECTORSTORE_PATH, catalog: str = None) -> Optional[Dict[str, Any]]:
+    """Staged ingest with bounded memory
+
+    chunked CSV read -> column-wise section chunking -> batched embedding
+    (worker pool) -> batched vectorstore upserts. Unchanged schemes (by content
+    hash) are skipped and removed schemes are deleted.
+    `catalog` tags the chunks of a state catalog so hits hydrate from its CSV.
+    Returns ingest stats, or None on failure.
+    """
+    chunk_rows = chunk_rows or CONFIG.get("ingest_chunk_rows", 2000)
+    batch_size = batch_size or CONFIG.get("embed_batch_size", 64)
+    workers = workers or CONFIG.get("embed_workers", 2)
+    write_batch = write_batch or CONFIG.get("vectorstore_write_batch", 500)
+
+    embedding = rag.get_embedding()
+    if not embedding:
+        print("❌ Embedding model not available")
+        return None
+
+    stats = {
+        "rows": 0,
+        "changed_schemes": 0,
+        "removed_schemes": 0,
+        "chunks_embedded": 0,
+        "embed_seconds": 0.0,
+        "write_seconds": 0.0
+    }
+    start = time.perf_counter()
+
+    try:
+        vectorstore = rag.Chroma(
+            persist_directory=vectorstore_path,
+            embedding_function=embedding
+        )
+        collection = vectorstore._collection
+
+        manifest = rag.load_ingest_manifest(vectorstore_path)
+        if manifest is None or manifest.get("chunker") != rag.CHUNKER_VERSION:
+            # Untracked store or different chunking: start clean instead of mixing chunks
+            existing_ids = collection.get(include=[])["ids"]
+            if existing_ids:
+                print(f"🧹 Store not built by the current chunker, clearing {len(existing_ids)} chunks")
+                for ids in _batches(existing_ids, write_batch):
+                    collection.delete(ids=ids)
+            manifest = {"schemes": {}}
+
+        previous = manifest.get("schemes", {})
+        schemes = {}
+        seen_keys = {}
+        snapshot = rag.CatalogSnapshot()
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for frame in rag.read_catalog_csv(csv_file_path, chunksize=chunk_rows):
+                keys = rag.scheme_keys(frame, seen_keys)
+                hashes = rag.scheme_content_hashes(frame)
+                stats["rows"] += len(frame)
+                snapshot.add(frame)
+
+                changed_mask = []
+                for sid, scheme_hash in zip(keys, hashes):
+                    entry = previous.get(sid)
+                    unchanged = entry is not None and entry.get("hash") == scheme_hash
+                    if unchanged:
+                        schemes[sid] = entry
+                    changed_mask.append(not unchanged)
+
+                if not any(changed_mask):
+                    continue
+
+                changed = frame[changed_mask]
+                changed_keys = [sid for sid, flag in zip(keys, changed_mask) if flag]
+                changed_hashes = [h for h, flag in zip(hashes, changed_mask) if flag]
+                stats["changed_schemes"] += len(changed_keys)
+
+                stale_ids = [cid for sid in changed_keys for cid in rag.manifest_chunk_ids(sid, previous.get(sid, {}))]
+                for ids in _batches(stale_ids, write_batch):
+                    collection.delete(ids=ids)
+
+                # One chunk per non-empty section
+                chunk_ids, chunk_texts, chunk_metadatas, chunk_counts = rag.chunk_scheme_sections(
+                    changed, changed_keys, changed_hashes
+                )
+                if catalog:
+                    for metadata in chunk_metadatas:
+                        metadata["catalog"] = catalog
+                for sid, scheme_hash in zip(changed_keys, changed_hashes):
+                    schemes[sid] = {"hash": scheme_hash, "chunks": chunk_counts[sid]}
+
+                # Embed in batches across the worker pool
+                embed_start = time.perf_counter()
+                vectors = []
+                for batch_vectors in pool.map(embedding.embed_documents, _batches(chunk_texts, batch_size)):
+                    vectors.extend(batch_vectors)
+                stats["embed_seconds"] += time.perf_counter() - embed_start
+
+                # Batched writes
+                write_start = time.perf_counter()
+                for i in range(0, len(chunk_ids), write_batch):
+                    collection.upsert(
+                        ids=chunk_ids[i:i + write_batch],
+                        embeddings=vectors[i:i + write_batch],
+                        metadatas=chunk_metadatas[i:i + write_batch],
+                        documents=chunk_texts[i:i + write_batch]
+                    )
+                stats["write_seconds"] += time.perf_counter() - write_start
+                stats["chunks_embedded"] += len(chunk_ids)
+
+                elapsed = time.perf_counter() - start
+                print(f"⏳ {stats['rows']} rows ({stats['rows'] / elapsed:.0f} rows/sec), "
+                      f"{stats['chunks_embedded']} chunks embedded")
+
+        seen_ids = set(schemes)
+        removed = [sid for sid in previous if sid not in seen_ids]
+        removed_ids = [cid for sid in removed for cid in rag.manifest_chunk_ids(sid, previous[sid])]
+        for ids in _batches(removed_ids, write_batch):
+            collection.delete(ids=ids)
+        stats["removed_schemes"] = len(removed)
+
+        rag.save_ingest_manifest({
+            "catalog_hash": rag.catalog_hash(schemes),
+            "chunker": rag.CHUNKER_VERSION,
+            "csv_hash": csv_hash,
+            "updated_at": rag.datetime.now().isoformat(),
+            "schemes": schemes
+        }, vectorstore_path)
+        rag.save_catalog_snapshot(
+            snapshot.to_dict(csv_file_path, csv_hash=csv_hash, chunks=sum(e.get("chunks", 0) for e in schemes.values())),
+            vectorstore_path
+        )
+
+        rag.get_retrieval_engine(vectorstore_path).invalidate()
+
+        elapsed = time.perf_counter() - start
+        stats["seconds"] = elapsed
+        stats["rows_per_sec"] = stats["rows"] / elapsed if elapsed else 0.0
+
+        print(f"✅ Ingested {stats['rows']} rows in {elapsed:.1f}s ({stats['rows_per_sec']:.0f} rows/sec): "
+              f"{stats['changed_schemes']} new/changed, {stats['removed_schemes']} removed, "
+              f"{stats['chunks_embedded']} chunks embedded")
+        return stats
+
+    except Exception as e:
+        print(f"❌ Streaming ingest failed: {e}")
+        return None
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream a schemes CSV into the vectorstore")
+    parser.add_argument("csv_path", nargs="?", default=None, help="Defaults to the catalog's configured CSV")
+    parser.add_argument("--catalog", default=rag.CENTRAL_CATALOG, help="Catalog to (re)index, e.g. a state name")
+    parser.add_argument("--chunk-rows", type=int, default=None, help="CSV rows per pipeline chunk")
+    parser.add_argument("--batch-size", type=int, default=None, help="Texts per embedding call")
+    parser.add_argument("--workers", type=int, default=None, help="Concurrent embedding workers")
+    args = parser.parse_args()
+
+    catalog = args.catalog.lower()
+    csv_path = args.csv_path or rag.get_catalogs().get(catalog)
+    if not csv_path or not os.path.exists(csv_path):
+        print(f"❌ CSV file not found for catalog '{catalog}': {csv_path}")
+    else:
+        # Only this catalog's vectorstore and manifest are touched
+        ingest_csv_streaming(
+            csv_path,
+            csv_hash=rag.file_hash(csv_path),
+            chunk_rows=args.chunk_rows,
+            batch_size=args.batch_size,
+            workers=args.workers,
+            vectorstore_path=rag.catalog_vectorstore_path(catalog),
+            catalog=None if catalog == rag.CENTRAL_CATALOG else catalog
+        )
@@ -0,0 +1,110 @@
+# latency_budget.py - Per-turn latency budget shared by every stage of a turn
+import time
+import logging
+import threading
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict
+
+from config import CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Typical seconds per stage, used to decide whether a stage still fits in the budget
+DEFAULT_STAGE_ESTIMATES = {
+    "stt": 3.0,
+    "retrieval": 0.8,
+    "llm": 3.0,
+    "tts": 1.5
+}
+
+_stats_lock = threading.Lock()
+_stage_stats = {}
+_turn_stats = {"turns": 0, "over_budget": 0, "degradations": {}}
+
+def stage_estimate(stage: str) -> float:
+    """Expected duration of a stage (CONFIG["stage_estimates"] overrides the defaults)"""
+    return CONFIG.get("stage_estimates", {}).get(stage, DEFAULT_STAGE_ESTIMATES.get(stage, 1.0))
+
+class TurnBudget:
+    """Wall-clock budget for one user turn; each stage asks what is left before choosing a strategy"""
+
+    def __init__(self, total_seconds: float = None, channel: str = "voice"):
+        self.channel = channel
+        self.total = total_seconds or CONFIG.get(f"{channel}_turn_budget", 8.0)
+        self.start = time.monotonic()
+        self.timings = {}
+        self.degradations = []
+        self.finished = False
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.start
+
+    def remaining(self) -> float:
+        return max(0.0, self.total - self.elapsed())
+
+    def allows(self, *stages: str) -> bool:
+        """True if the remaining time covers the estimates of all given stages"""
+        return self.remaining() >= sum(stage_estimate(stage) for stage in stages)
+
+    def time_for(self, stage: str, reserve=()) -> float:
+        """Seconds a stage may use, keeping the estimates of later stages in reserve"""
+        available = self.remaining() - sum(stage_estimate(later) for later in reserve)
+        return max(available, min(stage_estimate(stage), self.remaining()))
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a stage; it overruns when it takes longer than its estimate or than what was left"""
+        allotted = min(stage_estimate(name), self.remaining())
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            duration = time.monotonic() - start
+            self.timings[name] = self.timings.get(name, 0.0) + duration
+            overrun = duration > allotted
+            with _stats_lock:
+                stats = _stage_stats.setdefault(name, {"count": 0, "overruns": 0, "total_ms": 0.0, "max_ms": 0.0})
+                stats["count"] += 1
+                stats["total_ms"] += duration * 1000
+                stats["max_ms"] = max(stats["max_ms"], duration * 1000)
+                if overrun:
+                    stats["overruns"] += 1
+            if overrun:
+                logger.info(f"⏱️ Stage '{name}' overran: {duration:.2f}s (allotted {allotted:.2f}s)")
+
+    def degrade(self, decision: str):
+        """Record a cheaper strategy chosen because the budget was tight"""
+        self.degradations.append(decision)
+        logger.info(f"⏱️ Budget tight ({self.remaining():.1f}s left): {decision}")
+        with _stats_lock:
+            counts = _turn_stats["degradations"]
+            counts[decision] = counts.get(decision, 0) + 1
+
+    def finish(self) -> Dict[str, Any]:
+        """Close the turn and return its timings"""
+        if not self.finished:
+            self.finished = True
+            elapsed = self.elapsed()
+            with _stats_lock:
+                _turn_stats["turns"] += 1
+                if elapsed > self.total:
+                    _turn_stats["over_budget"] += 1
+            logger.info(f"⏱️ Turn ({self.channel}) took {elapsed:.2f}s of {self.total:.1f}s: "
+                        + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in self.timings.items()))
+        return {"elapsed": self.elapsed(), "timings": dict(self.timings), "degradations": list(self.degradations)}
+
+def timed_stage(budget: TurnBudget, name: str):
+    """budget.stage(name), or a no-op when the caller has no budget"""
+    return budget.stage(name) if budget is not None else nullcontext()
+
+def get_budget_stats() -> Dict[str, Any]:
+    """Per-stage counts, overruns and average latency, plus turn-level degradations"""
+    with _stats_lock:
+        stages = {}
+        for name, stats in _stage_stats.items():
+            stages[name] = dict(stats)
+            stages[name]["avg_ms"] = stats["total_ms"] / stats["count"] if stats["count"] else 0.0
+        turns = dict(_turn_stats)
+        turns["degradations"] = dict(_turn_stats["degradations"])
+    turns["stages"] = stages
+    return turns
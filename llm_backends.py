@@ -0,0 +1,431 @@
+# llm_backends.py - One LLM interface (Groq, OpenAI-compatible, Ollama, fake) with timeouts, retries and a circuit breaker
+import os
+import re
+import json
+import time
+import random
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List
+
+import requests
+
+from config import CONFIG
+
+logger = logging.getLogger(__name__)
+
+class LLMUnavailable(Exception):
+    """The LLM could not answer (breaker open, retries exhausted or deadline passed)"""
+
+class LLMBackend:
+    """Base backend: complete() returns the whole answer, stream() yields text chunks"""
+
+    name = "base"
+
+    def complete(self, prompt: str, timeout: float) -> str:
+        raise NotImplementedError
+
+    def stream(self, prompt: str, timeout: float) -> Iterator[str]:
+        """Default: no native streaming, yield the whole answer at once"""
+        yield self.complete(prompt, timeout)
+
+class OpenAICompatibleBackend(LLMBackend):
+    """Any /v1/chat/completions server (vLLM, llama.cpp server, LM Studio, ...)"""
+
+    name = "openai"
+
+    def __init__(self, base_url: str, model: str, api_key: str = None,
+                 temperature: float = 0.1, max_tokens: int = None, stop: List[str] = None):
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.api_key = api_key
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.stop = stop
+        self.session = requests.Session()
+
+    def _headers(self) -> Dict[str, str]:
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        return headers
+
+    def _payload(self, prompt: str, stream: bool) -> Dict[str, Any]:
+        payload = {
+            "messages": [{"role": "user", "content": prompt}],
+            "model": self.model,
+            "temperature": self.temperature,
+            "stream": stream
+        }
+        if self.max_tokens:
+            payload["max_tokens"] = self.max_tokens
+        if self.stop:
+            payload["stop"] = self.stop[:4]  # OpenAI-style APIs accept at most 4
+        return payload
+
+    def complete(self, prompt: str, timeout: float) -> str:
+        response = self.session.post(
+            f"{self.base_url}/chat/completions",
+            headers=self._headers(),
+            json=self._payload(prompt, stream=False),
+            timeout=timeout
+        )
+        if response.status_code != 200:
+            raise Exception(f"{self.name} API error: {response.status_code}")
+        result = response.json()
+        return result['choices'][0]['message']['content'].strip()
+
+    def stream(self, prompt: str, timeout: float) -> Iterator[str]:
+        """Server-sent events: one `data: {json}` line per delta"""
+        with self.session.post(
+            f"{self.base_url}/chat/completions",
+            headers=self._headers(),
+            json=self._payload(prompt, stream=True),
+            timeout=timeout,
+            stream=True
+        ) as response:
+            if response.status_code != 200:
+                raise Exception(f"{self.name} API error: {response.status_code}")
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                delta = json.loads(data)['choices'][0].get('delta', {})
+                if delta.get('content'):
+                    yield delta['content']
+
+class GroqBackend(OpenAICompatibleBackend):
+    """Groq cloud (OpenAI-compatible API)"""
+
+    name = "groq"
+
+    def __init__(self, model: str, api_key: str, temperature: float = 0.1, max_tokens: int = None,
+                 stop: List[str] = None):
+        super().__init__("https://api.groq.com/openai/v1", model, api_key=api_key,
+                         temperature=temperature, max_tokens=max_tokens, stop=stop)
+
+class OllamaBackend(LLMBackend):
+    """Local Ollama server (/api/generate)"""
+
+    name = "ollama"
+
+    def __init__(self, model: str, host: str = "http://localhost:11434", temperature: float = 0.1,
+                 max_tokens: int = None, stop: List[str] = None):
+        self.model = model
+        self.host = host.rstrip("/")
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.stop = stop
+        self.session = requests.Session()
+
+    def _payload(self, prompt: str, stream: bool) -> Dict[str, Any]:
+        options = {"temperature": self.temperature}
+        if self.max_tokens:
+            options["num_predict"] = self.max_tokens
+        if self.stop:
+            options["stop"] = self.stop
+        return {"model": self.model, "prompt": prompt, "stream": stream, "options": options}
+
+    def complete(self, prompt: str, timeout: float) -> str:
+        response = self.session.post(f"{self.host}/api/generate", json=self._payload(prompt, stream=False),
+                                     timeout=timeout)
+        if response.status_code != 200:
+            raise Exception(f"Ollama error: {response.status_code}")
+        return response.json().get("response", "").strip()
+
+    def stream(self, prompt: str, timeout: float) -> Iterator[str]:
+        """One JSON object per line, `response` holds the next chunk"""
+        with self.session.post(f"{self.host}/api/generate", json=self._payload(prompt, stream=True),
+                               timeout=timeout, stream=True) as response:
+            if response.status_code != 200:
+                raise Exception(f"Ollama error: {response.status_code}")
+            for line in response.iter_lines(decode_unicode=True):
+                if not line:
+                    continue
+                data = json.loads(line)
+                if data.get("response"):
+                    yield data["response"]
+                if data.get("done"):
+                    break
+
+class FakeBackend(LLMBackend):
+    """Deterministic offline backend for tests and demos: names the first scheme in the context"""
+
+    name = "fake"
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    def complete(self, prompt: str, timeout: float) -> str:
+        if self.latency:
+            time.sleep(self.latency)
+        match = re.search(r'Scheme Name:\s*(.+)', prompt)
+        if match:
+            return f"{match.group(1).strip()} is available for you. Please check the eligibility and apply."
+        return "No matching scheme was found in the provided context."
+
+    def stream(self, prompt: str, timeout: float) -> Iterator[str]:
+        for word in self.complete(prompt, timeout).split(" "):
+            yield word + " "
+
+class CircuitBreaker:
+    """closed -> open after N consecutive failures -> half-open after reset_timeout -> closed on success"""
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        # When the current half-open probe was let through (None: no probe in flight)
+        self.probe_started = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self.opened_at is None:
+                return "closed"
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                return "half-open"
+            return "open"
+
+    def allow(self) -> bool:
+        """False while open; half-open lets a single call through to probe the backend
+
+        A probe that never reports back (e.g. it gave up waiting for an LLM slot)
+        stops blocking others after another reset_timeout.
+        """
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            now = time.monotonic()
+            if now - self.opened_at < self.reset_timeout:
+                return False
+            if self.probe_started is not None and now - self.probe_started < self.reset_timeout:
+                return False
+            self.probe_started = now
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probe_started = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.probe_started = None
+            if self.failures >= self.failure_threshold or self.opened_at is not None:
+                # A failed half-open probe re-opens for another full reset_timeout
+                if self.opened_at is None:
+                    logger.warning(f"⚠️ LLM circuit breaker opened after {self.failures} failures")
+                self.opened_at = time.monotonic()
+
+# One pool of LLM slots shared by every ResilientLLM, so bursts queue instead of flooding the provider
+_slots_lock = threading.Lock()
+_slots = None
+_slot_stats = {"acquired": 0, "waited": 0, "rejected": 0, "total_wait_ms": 0.0, "max_wait_ms": 0.0}
+
+def _llm_slots() -> threading.BoundedSemaphore:
+    global _slots
+    with _slots_lock:
+        if _slots is None:
+            _slots = threading.BoundedSemaphore(max(1, int(CONFIG.get("llm_max_concurrency", 4))))
+        return _slots
+
+@contextmanager
+def llm_slot(timeout: float, name: str = "llm"):
+    """Hold one of CONFIG["llm_max_concurrency"] LLM slots; LLMUnavailable if none frees up in time
+
+    Yields the seconds spent waiting, so callers can take them off their own timeout.
+    """
+    slots = _llm_slots()
+    start = time.monotonic()
+    acquired = slots.acquire(timeout=max(0.0, timeout))
+    wait_ms = (time.monotonic() - start) * 1000
+    with _slots_lock:
+        if acquired:
+            _slot_stats["acquired"] += 1
+            if wait_ms >= 1.0:
+                _slot_stats["waited"] += 1
+            _slot_stats["total_wait_ms"] += wait_ms
+            _slot_stats["max_wait_ms"] = max(_slot_stats["max_wait_ms"], wait_ms)
+        else:
+            _slot_stats["rejected"] += 1
+    if not acquired:
+        raise LLMUnavailable(f"{name} busy: no free LLM slot within {timeout:.1f}s")
+    try:
+        yield wait_ms / 1000
+    finally:
+        slots.release()
+
+def get_concurrency_stats() -> Dict[str, Any]:
+    """Slot acquisitions, how many had to wait and for how long"""
+    with _slots_lock:
+        stats = dict(_slot_stats)
+    stats["limit"] = max(1, int(CONFIG.get("llm_max_concurrency", 4)))
+    stats["avg_wait_ms"] = stats["total_wait_ms"] / stats["acquired"] if stats["acquired"] else 0.0
+    return stats
+
+class ResilientLLM:
+    """Wraps a backend with per-call timeouts, bounded jittered retries, a deadline and a circuit breaker
+
+    invoke()/stream() raise LLMUnavailable instead of hanging; callers fall back to template answers.
+    """
+
+    def __init__(self, backend: LLMBackend, timeout: float = 8.0, max_retries: int = 2,
+                 backoff: float = 0.5, deadline: float = 15.0, breaker: CircuitBreaker = None):
+        self.backend = backend
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.deadline = deadline
+        self.breaker = breaker or CircuitBreaker()
+        self._stats_lock = threading.Lock()
+        self.stats = {"calls": 0, "failures": 0, "retries": 0, "short_circuits": 0}
+
+    def _count(self, name: str):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def _attempts(self, deadline: float = None):
+        """Yield (attempt, per-call timeout) while retries, deadline and breaker allow"""
+        start = time.monotonic()
+        deadline = min(self.deadline, deadline) if deadline else self.deadline
+        for attempt in range(self.max_retries + 1):
+            remaining = deadline - (time.monotonic() - start)
+            if remaining <= 0:
+                raise LLMUnavailable(f"{self.backend.name} deadline of {deadline:.1f}s passed")
+            if not self.breaker.allow():
+                self._count("short_circuits")
+                raise LLMUnavailable(f"{self.backend.name} circuit breaker open")
+            if attempt:
+                self._count("retries")
+            yield attempt, min(self.timeout, remaining)
+            # Full jitter: sleep uniformly in [0, backoff * 2^attempt], capped by the deadline
+            delay = random.uniform(0, self.backoff * (2 ** attempt))
+            if attempt < self.max_retries:
+                time.sleep(min(delay, max(0.0, deadline - (time.monotonic() - start))))
+
+    def _after_wait(self, timeout: float, waited: float) -> float:
+        """Per-call timeout left after waiting `waited` seconds for a slot"""
+        remaining = timeout - waited
+        if remaining <= 0:
+            raise LLMUnavailable(f"{self.backend.name} timed out waiting for an LLM slot")
+        return remaining
+
+    def invoke(self, prompt: str, deadline: float = None) -> str:
+        """Complete a prompt (same call shape as LangChain chat models, returns a str)
+
+        `deadline` (seconds) tightens the configured deadline for this call only.
+        """
+        self._count("calls")
+        last_error = None
+        for attempt, timeout in self._attempts(deadline):
+            # Waiting for a slot is not a backend failure, so it stays outside the breaker accounting
+            with llm_slot(timeout, self.backend.name) as waited:
+                timeout = self._after_wait(timeout, waited)
+                try:
+                    result = self.backend.complete(prompt, timeout)
+                    self.breaker.record_success()
+                    return result
+                except Exception as e:
+                    last_error = e
+                    self._count("failures")
+                    self.breaker.record_failure()
+                    logger.warning(f"⚠️ LLM call failed ({self.backend.name}, attempt {attempt + 1}): {e}")
+        raise LLMUnavailable(f"{self.backend.name} failed after {self.max_retries + 1} attempts: {last_error}")
+
+    def stream(self, prompt: str, deadline: float = None) -> Iterator[str]:
+        """Stream a completion; retried only if it fails before the first chunk"""
+        self._count("calls")
+        last_error = None
+        for attempt, timeout in self._attempts(deadline):
+            started = False
+            # The slot is held for the whole stream, released when the consumer stops early too
+            with llm_slot(timeout, self.backend.name) as waited:
+                timeout = self._after_wait(timeout, waited)
+                try:
+                    for chunk in self.backend.stream(prompt, timeout):
+                        started = True
+                        yield chunk
+                    self.breaker.record_success()
+                    return
+                except Exception as e:
+                    last_error = e
+                    self._count("failures")
+                    self.breaker.record_failure()
+                    logger.warning(f"⚠️ LLM stream failed ({self.backend.name}, attempt {attempt + 1}): {e}")
+            if started:
+                break
+        raise LLMUnavailable(f"{self.backend.name} stream failed: {last_error}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        stats["backend"] = self.backend.name
+        stats["breaker"] = self.breaker.state
+        stats["concurrency"] = get_concurrency_stats()
+        return stats
+
+def get_llm_profile(profile: str = None) -> Dict[str, Any]:
+    """Generation settings (max_tokens, stop, model) of CONFIG["llm_profile"] or the named profile"""
+    profile = profile or CONFIG.get("llm_profile", "voice")
+    return dict(CONFIG.get("llm_profiles", {}).get(profile, {}), name=profile)
+
+def backend_configured(name: str = None, api_key: str = None) -> bool:
+    """Does the backend named by CONFIG["llm_backend"] have what it needs to be built?
+
+    Groq needs an API key (`api_key`, the environment or CONFIG); the
+    self-hosted backends need their server and model; fake needs nothing.
+    """
+    name = (name or CONFIG.get("llm_backend", "groq")).lower()
+    if name == "groq":
+        return bool(api_key or os.environ.get("GROQ_API_KEY") or CONFIG.get("GROQ_API_KEY"))
+    if name == "openai":
+        return bool(CONFIG.get("llm_base_url", "http://localhost:8000/v1") and CONFIG.get("llm_model", "local-model"))
+    if name == "ollama":
+        return bool(CONFIG.get("ollama_host", "http://localhost:11434") and CONFIG.get("ollama_model", "phi3:mini"))
+    return name == "fake"
+
+def create_backend(name: str = None, profile: str = None) -> LLMBackend:
+    """Build the backend named by CONFIG["llm_backend"] (groq / openai / ollama / fake)"""
+    name = (name or CONFIG.get("llm_backend", "groq")).lower()
+    settings = get_llm_profile(profile)
+    temperature = settings.get("temperature", CONFIG.get("groq_temperature", 0.1))
+    limits = {"max_tokens": settings.get("max_tokens"), "stop": settings.get("stop") or None}
+
+    if name == "groq":
+        api_key = os.environ.get("GROQ_API_KEY") or CONFIG.get("GROQ_API_KEY", "")
+        model = settings.get("groq_model") or CONFIG.get("groq_model", "deepseek-r1-distill-llama-70b")
+        return GroqBackend(model, api_key, temperature=temperature, **limits)
+    if name == "openai":
+        return OpenAICompatibleBackend(CONFIG.get("llm_base_url", "http://localhost:8000/v1"),
+                                       CONFIG.get("llm_model", "local-model"),
+                                       api_key=os.environ.get("LLM_API_KEY"),
+                                       temperature=temperature, **limits)
+    if name == "ollama":
+        return OllamaBackend(CONFIG.get("ollama_model", "phi3:mini"),
+                             host=CONFIG.get("ollama_host", "http://localhost:11434"),
+                             temperature=temperature, **limits)
+    if name == "fake":
+        return FakeBackend()
+    raise ValueError(f"Unknown LLM backend: {name}")
+
+def create_llm(name: str = None, profile: str = None) -> ResilientLLM:
+    """Configured backend wrapped with timeouts, retries and the circuit breaker"""
+    return ResilientLLM(
+        create_backend(name, profile),
+        timeout=CONFIG.get("llm_timeout", 8.0),
+        max_retries=CONFIG.get("llm_max_retries", 2),
+        backoff=CONFIG.get("llm_retry_backoff", 0.5),
+        deadline=CONFIG.get("llm_deadline", 15.0),
+        breaker=CircuitBreaker(
+            failure_threshold=CONFIG.get("llm_breaker_failures", 3),
+            reset_timeout=CONFIG.get("llm_breaker_reset", 30.0)
+        )
+    )
@@ -1,6 +1,7 @@
 import os
 import sys
 import subprocess
+from config import CONFIG
 from voice_assistant import EnhancedVoiceAssistant
 
 def check_dependencies():
@@ -70,7 +71,6 @@ def check_ollama():
 
 def setup_database():
     from database_backup import SchemeDatabase
-    from config import CONFIG
     
     csv_path = CONFIG["schemes_csv_path"]
     db_path = CONFIG["sqlite_db_path"]
@@ -115,6 +115,10 @@ def main():
         print("\nExiting due to missing dependencies...")
         return
     
+    # Start loading the RAG models while the rest of the setup runs
+    from enhanced_rag_database import start_model_warmup
+    print(f"🔥 Model warm-up: {start_model_warmup()}")
+    
     ollama_available = check_ollama()
     if not ollama_available:
         print("⚠️ Continuing without Ollama (reduced functionality)")
@@ -136,5 +140,30 @@ def main():
         import traceback
         traceback.print_exc()
 
+def run_batch(input_path, output_path, workers=None):
+    """Answer a file of questions without audio (see batch_answer.py for all options)"""
+    from batch_answer import answer_batch
+    
+    print("📦 Batch question answering")
+    print("=" * 60)
+    
+    if not os.path.exists(input_path):
+        print(f"❌ Questions file not found: {input_path}")
+        return
+    if not os.path.exists(CONFIG["schemes_csv_path"]):
+        print(f"❌ CSV file not found: {CONFIG['schemes_csv_path']}")
+        return
+    answer_batch(input_path, output_path, workers=workers)
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description="Enhanced Government Schemes Voice Assistant")
+    parser.add_argument("--batch", nargs=2, metavar=("QUESTIONS", "ANSWERS"),
+                        help="Answer a JSONL/CSV file of questions into a JSONL file instead of starting a conversation")
+    parser.add_argument("--workers", type=int, default=None, help="Concurrent LLM calls in batch mode")
+    args = parser.parse_args()
+    
+    if args.batch:
+        run_batch(*args.batch, workers=args.workers)
+    else:
+        main()
\ No newline at end of file
@@ -1,4 +1,7 @@
 # Enhanced Synonym Dictionary for Government Schemes Search
+import threading
+from collections import deque
+from functools import lru_cache
 
 SYNONYMS = {
     # Farmer/Agriculture related
@@ -135,47 +138,170 @@ SYNONYMS = {
     "compensation": ["मुआवजा", "muaavja", "भरपाई", "bharpaai"]
 }
 
-def get_synonyms(word):
-    """Get all synonyms for a given word"""
-    word_lower = word.lower().strip()
-    
-    # Direct lookup
-    for key, values in SYNONYMS.items():
-        if word_lower == key or word_lower in [v.lower() for v in values]:
-            return [key] + values
-    
-    # Partial matching for compound words
+# Characters stripped from each query word before lookup
+STRIP_CHARS = '।.,!?"()[]{}'
+
+# Location keywords are only returned for these state entries
+LOCATION_STATES = ['gujarat', 'andhra', 'goa', 'karnataka', 'kerala']
+
+class PhraseAutomaton:
+    """Aho-Corasick automaton over word sequences: finds every known phrase in one pass"""
+    
+    def __init__(self, phrases):
+        # phrases: {(word, word, ...): value}
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        for words, value in phrases.items():
+            state = 0
+            for word in words:
+                next_state = self.goto[state].get(word)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                    self.goto[state][word] = next_state
+                state = next_state
+            self.output[state].append((len(words), value))
+        
+        # Breadth-first failure links; outputs of the failure state are inherited
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for word, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and word not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(word, 0)
+                self.fail[next_state] = target if target != next_state else 0
+                self.output[next_state] = self.output[next_state] + self.output[self.fail[next_state]]
+    
+    def find(self, words):
+        """Every phrase occurrence -> [(start, end, value), ...] (end exclusive)"""
+        state = 0
+        matches = []
+        for i, word in enumerate(words):
+            while state and word not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(word, 0)
+            for length, value in self.output[state]:
+                matches.append((i + 1 - length, i + 1, value))
+        return matches
+    
+    def find_longest(self, words):
+        """Leftmost-longest, non-overlapping occurrences -> {start: (end, value)}"""
+        spans = {}
+        covered = 0
+        for start, end, value in sorted(self.find(words), key=lambda match: (match[0], -match[1])):
+            if start >= covered:
+                spans[start] = (end, value)
+                covered = end
+        return spans
+
+class SynonymIndex:
+    """SYNONYMS compiled once: surface form -> canonical key, plus a phrase automaton
+    
+    A form listed under several keys belongs to the first one, which is what
+    the old linear scan returned.
+    """
+    
+    def __init__(self, synonyms):
+        self.synonyms = synonyms
+        self.forms = {}
+        self.location_forms = {}
+        for key, values in synonyms.items():
+            is_state = any(state in key for state in LOCATION_STATES)
+            for form in [key] + values:
+                form = form.lower().strip()
+                self.forms.setdefault(form, key)
+                if is_state:
+                    self.location_forms.setdefault(form, key)
+        
+        phrases = {}
+        for form, key in self.forms.items():
+            words = tuple(word.strip(STRIP_CHARS) for word in form.split())
+            if len(words) > 1:
+                phrases.setdefault(words, key)
+        self.phrases = PhraseAutomaton(phrases)
+    
+    def lookup(self, word):
+        """Canonical key of a word or phrase (None if unknown)"""
+        word = word.lower().strip()
+        key = self.forms.get(word)
+        if key is None:
+            key = _partial_match(word)
+        return key
+    
+    def entry(self, key):
+        return [key] + self.synonyms[key]
+    
+    def expand(self, words):
+        """Original words plus up to 3 synonyms per known word or phrase, in one pass"""
+        lowered = [word.lower() for word in words]
+        phrases = self.phrases.find_longest(lowered)
+        
+        expanded = []
+        i = 0
+        while i < len(words):
+            if i in phrases:
+                end, key = phrases[i]
+                expanded.extend(words[i:end])
+                i = end
+            else:
+                expanded.append(words[i])
+                key = self.lookup(lowered[i]) if lowered[i] else None
+                i += 1
+            if key is not None:
+                expanded.extend(self.synonyms[key][:3])
+        return expanded
+
+@lru_cache(maxsize=4096)
+def _partial_match(word):
+    """Key of the first entry whose key or a synonym contains / is contained in `word` (compound words)"""
     for key, values in SYNONYMS.items():
-        if word_lower in key or key in word_lower:
-            return [key] + values
+        if word in key or key in word:
+            return key
         for value in values:
-            if word_lower in value.lower() or value.lower() in word_lower:
-                return [key] + values
-    
-    return [word]
+            if word in value.lower() or value.lower() in word:
+                return key
+    return None
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_synonym_index():
+    """Get the compiled synonym index (built on first use)"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = SynonymIndex(SYNONYMS)
+    return _index
+
+def rebuild_synonym_index():
+    """Recompile after SYNONYMS was changed at runtime"""
+    global _index
+    with _index_lock:
+        _index = SynonymIndex(SYNONYMS)
+    _partial_match.cache_clear()
+    return _index
+
+def get_synonyms(word):
+    """Get all synonyms for a given word"""
+    index = get_synonym_index()
+    key = index.lookup(word)
+    return index.entry(key) if key is not None else [word]
 
 def expand_query(query):
     """Expand query with synonyms and related terms"""
     if not query:
         return ""
     
-    words = query.split()
-    expanded_words = []
-    
-    for word in words:
-        # Clean word
-        clean_word = word.strip('।.,!?"""''()[]{}')
-        
-        # Get synonyms
-        synonyms = get_synonyms(clean_word)
-        
-        # Add original word and key synonyms (limit to avoid too long queries)
-        expanded_words.append(clean_word)
-        if len(synonyms) > 1:
-            # Add up to 3 most relevant synonyms
-            expanded_words.extend(synonyms[1:4])
-    
-    return " ".join(expanded_words)
+    # Clean words; multi-word phrases ("water pump") expand as one term
+    words = [word.strip(STRIP_CHARS) for word in query.split()]
+    return " ".join(get_synonym_index().expand(words))
 
 def get_occupation_keywords(occupation):
     """Get specific keywords for occupation-based search"""
@@ -194,15 +320,9 @@ def get_location_keywords(location):
     if not location:
         return []
     
-    location_lower = location.lower()
-    
-    # Find matching location and return its keywords
-    for key, values in SYNONYMS.items():
-        if location_lower == key or location_lower in [v.lower() for v in values]:
-            if any(state in key for state in ['gujarat', 'andhra', 'goa', 'karnataka', 'kerala']):
-                return [key] + values
-    
-    return [location]
+    index = get_synonym_index()
+    key = index.location_forms.get(location.lower().strip())
+    return index.entry(key) if key is not None else [location]
 
 def enhance_search_query(query, occupation=None, location=None):
     """Enhanced query building with context"""
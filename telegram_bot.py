@@ -3,11 +3,11 @@ import asyncio
 import tempfile
 from telegram import Update
 from telegram.ext import Application, CommandHandler, MessageHandler, filters, ContextTypes
-from gtts import gTTS
 import subprocess
 
 from voice_assistant import EnhancedVoiceAssistant
 from config import CONFIG
+from latency_budget import TurnBudget, timed_stage
 
 class TelegramSchemeBot:
     def __init__(self, token):
@@ -57,6 +57,7 @@ Type /help for more info!
         """Handle text messages"""
         user_text = update.message.text
         user_name = update.effective_user.first_name
+        budget = TurnBudget(channel="telegram")
         
         print(f"📝 Text from {user_name}: {user_text}")
         
@@ -64,7 +65,7 @@ Type /help for more info!
         processing_msg = await update.message.reply_text("🔍 खोज रहे हैं...")
         
         # Process with your existing system
-        response = await self.process_query(user_text, user_name)
+        response = await self.process_query(user_text, user_name, budget)
         
         # Delete processing message
         await processing_msg.delete()
@@ -73,11 +74,13 @@ Type /help for more info!
         await update.message.reply_text(response)
         
         # Send voice response
-        await self.send_voice_response(update, response)
+        await self.send_voice_response(update, response, budget)
+        budget.finish()
     
     async def handle_voice(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle voice messages - WORKING VERSION"""
         user_name = update.effective_user.first_name
+        budget = TurnBudget(channel="telegram")
         
         try:
             print(f"🎤 Voice message received from {user_name}")
@@ -95,7 +98,8 @@ Type /help for more info!
             print(f"📁 Voice file downloaded: {temp_voice.name}")
             
             # Convert voice to text
-            text = await self.voice_to_text_fixed(temp_voice.name)
+            with budget.stage("stt"):
+                text = await self.voice_to_text_fixed(temp_voice.name)
             
             # Delete processing message
             await processing_msg.delete()
@@ -107,11 +111,11 @@ Type /help for more info!
                 await update.message.reply_text(f"🎤 **आपने कहा:** '{text}'\n\n🔍 खोज रहे हैं...")
                 
                 # Process the recognized text
-                response = await self.process_query(text, user_name)
+                response = await self.process_query(text, user_name, budget)
                 
                 # Send response
                 await update.message.reply_text(response)
-                await self.send_voice_response(update, response)
+                await self.send_voice_response(update, response, budget)
                 
             else:
                 await update.message.reply_text(
@@ -128,6 +132,8 @@ Type /help for more info!
                 os.unlink(temp_voice.name)
             except:
                 pass
+            
+            budget.finish()
                 
         except Exception as e:
             print(f"❌ Voice processing error: {e}")
@@ -187,26 +193,23 @@ Type /help for more info!
             print(f"❌ Voice to text error: {e}")
             return None
     
-    async def process_query(self, query, user_name):
-        """Process query using your existing system"""
+    async def process_query(self, query, user_name, budget=None):
+        """Process query using your existing system (cheaper answers when the turn budget is tight)"""
         try:
-            # Set user context
-            self.assistant.user_name = user_name
-            self.assistant.user_context["name"] = user_name
-            
-            # Parse occupation/location (simplified)
-            occupation, location = self.assistant.parse_user_occupation(query)
-            if occupation:
-                self.assistant.user_context["occupation"] = occupation
-            if location:
-                self.assistant.user_context["location"] = location
+            # Parse occupation/location (simplified); the whole user context (name included) is kept per
+            # message and never written to the shared assistant, since users are served concurrently
+            entities = self.assistant.parse_user_context(query)
+            occupation, location = self.assistant._occupation_and_location(entities)
+            user_context = {"name": user_name, "occupation": occupation, "location": location,
+                            "occupation_stated": entities.get("occupation") is not None}
             
-            # Find schemes using your RAG system
-            schemes = self.assistant.find_relevant_schemes(query, top_n=3)
+            # Find schemes and answer in one RAG pass, off the event loop so other users aren't blocked
+            schemes, response = await asyncio.to_thread(
+                self.assistant.answer_query, query, "hinglish", top_n=3, budget=budget, user_context=user_context
+            )
             
             # Format response - CLEAN WITHOUT PREFIX
             if schemes:
-                response = self.assistant.format_scheme_response(schemes, query, "hinglish")
                 return response  # Clean response without extra text
             else:
                 return "❌ कोई संबंधित योजना नहीं मिली। कृपया अधिक विवरण दें।\n\n💡 **Try करें:**\n• किसान योजना\n• महिला योजना\n• farmer scheme"
@@ -215,8 +218,12 @@ Type /help for more info!
             print(f"Processing error: {e}")
             return "❌ कुछ technical problem है। फिर से try करें।"
     
-    async def send_voice_response(self, update, text):
-        """Send voice response using gTTS - FIXED VERSION"""
+    async def send_voice_response(self, update, text, budget=None):
+        """Send voice response using gTTS - FIXED VERSION
+        
+        Cached audio is reused; if nothing is cached and the turn budget has no
+        room for synthesis, the text reply already sent is all the user gets.
+        """
         try:
             # Clean text for TTS (remove markdown and special chars)
             clean_text = text.replace("**", "").replace("*", "").replace("#", "")
@@ -241,18 +248,21 @@ Type /help for more info!
             if voice_text and not voice_text.endswith('.'):
                 voice_text += "."
             
-            print(f"🔊 Generating voice for: '{voice_text[:50]}...'")
-            
-            # Create voice response with better settings
-            tts = gTTS(text=voice_text, lang='hi', slow=False, lang_check=False)
-            
-            # Save to temp file with unique name
-            import time
-            temp_filename = f"voice_{int(time.time() * 1000)}.mp3"
-            temp_path = os.path.join(tempfile.gettempdir(), temp_filename)
-            
-            tts.save(temp_path)
-            print(f"🎵 Voice saved to: {temp_path}")
+            tts = self.assistant.tts
+            temp_path = tts.cached_audio(voice_text, 'hi')
+            if temp_path:
+                print(f"🎵 Using cached voice: {temp_path}")
+            elif budget is not None and not budget.allows("tts"):
+                budget.degrade("text_only")
+                return
+            else:
+                print(f"🔊 Generating voice for: '{voice_text[:50]}...'")
+                
+                # Create voice response with better settings (saved in the shared audio cache);
+                # gTTS is a blocking network call, so it runs off the event loop like the RAG turn
+                with timed_stage(budget, "tts"):
+                    temp_path = await asyncio.to_thread(tts.synthesize, voice_text, 'hi', lang_check=False)
+                print(f"🎵 Voice saved to: {temp_path}")
             
             # Verify file exists and has content
             if os.path.exists(temp_path) and os.path.getsize(temp_path) > 1000:
@@ -266,12 +276,6 @@ Type /help for more info!
             else:
                 print("❌ Voice file too small or missing")
                 await update.message.reply_text("🔊 Audio response ready!")
-            
-            # Cleanup
-            try:
-                os.unlink(temp_path)
-            except:
-                pass
                 
         except Exception as e:
             print(f"❌ Voice response error: {e}")
@@ -283,7 +287,8 @@ Type /help for more info!
     
     def run(self):
         """Run the bot"""
-        app = Application.builder().token(self.token).build()
+        # Handle users concurrently; RAG calls run in threads (coalesced and capped by llm_max_concurrency)
+        app = Application.builder().token(self.token).concurrent_updates(True).build()
         
         # Add handlers
         app.add_handler(CommandHandler("start", self.start))
@@ -307,5 +312,9 @@ if __name__ == "__main__":
     print(f"🔑 Token configured: {BOT_TOKEN[:10]}...")
     print(f"🌐 Environment: {'Railway' if os.getenv('RAILWAY_ENVIRONMENT') else 'Local'}")
     
+    # Load models in the background so the bot starts polling right away
+    from enhanced_rag_database import start_model_warmup
+    print(f"🔥 Model warm-up: {start_model_warmup()}")
+    
     bot = TelegramSchemeBot(BOT_TOKEN)
     bot.run()# Railway deployment - Saturday 07 June 2025 10:24:55 AM IST
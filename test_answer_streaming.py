@@ -0,0 +1,39 @@
+# test_answer_streaming.py - Checks for the streamed sentence splitter
+import random
+
+from answer_streaming import iter_voice_sentences, split_voice_sentences
+
+ANSWERS = [
+    "The grant is Rs 2.5 lakh per family. Apply online at pmkisan.gov.in to register. Keep your Aadhaar ready!",
+    "<think>user wants farmer schemes</think>PM-KISAN gives Rs. 6000 per year. Dr. Ambedkar scheme helps SC students. "
+    "Visit the portal www.india.gov.in for details",
+    "किसानों को 6000 रुपये मिलते हैं। आवेदन ऑनलाइन करें। Version 1.2.3 of the form is used?"
+]
+
+def _random_tokens(text, rng):
+    """Split text at random character boundaries, like an LLM token stream"""
+    cuts = sorted(rng.sample(range(1, len(text)), rng.randint(1, min(40, len(text) - 1))))
+    return [text[start:end] for start, end in zip([0] + cuts, cuts + [len(text)])]
+
+def test_token_boundaries_do_not_change_sentences():
+    """Streaming the answer in arbitrary pieces gives the same sentences as the whole answer"""
+    rng = random.Random(7)
+    for answer in ANSWERS:
+        expected = split_voice_sentences(answer)
+        for _ in range(200):
+            tokens = _random_tokens(answer, rng)
+            assert list(iter_voice_sentences(tokens, max_sentences=None)) == expected, tokens
+
+def test_amounts_and_urls_stay_whole():
+    """A token ending in "." inside a number or URL does not end the sentence"""
+    assert list(iter_voice_sentences(["The grant is Rs 2.", "5 lakh per family. Apply online."])) == [
+        "The grant is Rs 2.5 lakh per family.", "Apply online."]
+    assert list(iter_voice_sentences(["Visit pmkisan.gov.", "in to apply."])) == ["Visit pmkisan.gov.in to apply."]
+
+if __name__ == "__main__":
+    print("🧪 Testing streamed sentence splitting")
+    print("=" * 60)
+
+    test_token_boundaries_do_not_change_sentences()
+    test_amounts_and_urls_stay_whole()
+    print("✅ All streaming checks passed")
@@ -0,0 +1,51 @@
+# test_entity_extractor.py - Checks for the gazetteer entity extractor
+from entity_extractor import extract_entities
+
+def test_intro_parsing():
+    """Occupation and a canonical state from a typical introduction"""
+    parsed = extract_entities("main farmer hun, Gujarat se")
+    assert parsed["occupation"] == "farmer"
+    assert parsed["state"] == "gujarat"
+
+# Utterance -> occupation the old substring scorer (voice_assistant.parse_user_occupation) returned
+LEGACY_OCCUPATIONS = {
+    "I am a college student": "student",
+    "main school mein padhai karta hun": "student",
+    "main chhatra hun school mein": "student",
+    "college student hun Gujarat se": "student",
+    "I am a school teacher": "teacher",
+    "main college mein padhata hun, teacher hun": "teacher",
+    "I study in college": "teacher",
+    "main kisan hun": "farmer",
+    "mera dukan hai": "business",
+    "I am a doctor in a hospital": "doctor"
+}
+
+def test_occupation_matches_legacy_parser():
+    """Words shared by occupations ("school", "college") count for each, so the more specific word decides"""
+    for utterance, occupation in LEGACY_OCCUPATIONS.items():
+        assert extract_entities(utterance)["occupation"] == occupation, utterance
+
+def test_caste_needs_cue_for_short_aliases():
+    """Bare "sc"/"st" are ordinary words ("st." = street); only a caste cue makes them a caste"""
+    assert extract_entities("What is the st. name")["caste"] is None
+    assert extract_entities("I live on MG st near the market")["caste"] is None
+    assert extract_entities("SC category")["caste"] == "sc"
+    assert extract_entities("meri caste ST hai")["caste"] == "st"
+    assert extract_entities("scheduled tribe")["caste"] == "st"
+
+def test_short_state_aliases_need_cue():
+    """"up" / "ap" only count as states next to a location cue"""
+    assert extract_entities("please sign up")["state"] is None
+    assert extract_entities("ap kaise ho")["state"] is None
+    assert extract_entities("I live in UP")["state"] == "uttar pradesh"
+
+if __name__ == "__main__":
+    print("🧪 Testing entity extractor")
+    print("=" * 60)
+
+    test_intro_parsing()
+    test_occupation_matches_legacy_parser()
+    test_caste_needs_cue_for_short_aliases()
+    test_short_state_aliases_need_cue()
+    print("✅ All entity extractor checks passed")
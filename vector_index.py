@@ -0,0 +1,592 @@
+# vector_index.py - Vector search over a memory-mapped, normalized embedding matrix (exact or IVF)
+import io
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INDEX_DIRNAME = "matrix_index"
+VECTORS_FILENAME = "vectors.npy"
+META_FILENAME = "index_meta.json"
+ROWS_FILENAME = "rows.db"
+IVF_FILENAME = "ivf.npz"
+INDEX_VERSION = 2
+
+# Rows scored per matrix product, bounds the float32 scratch memory of a query
+BLOCK_ROWS = 8192
+
+# Ids per "IN (...)" lookup, below SQLite's bound-parameter limit
+SQL_BATCH = 500
+
+SUPPORTED_DTYPES = ("float16", "int8")
+
+def chain_checksum(previous: str, vectors: np.ndarray, start: int, end: int) -> str:
+    """Checksum of rows [start, end) chained onto the checksum of the rows before them
+
+    add() only hashes the rows it appends; the matrix checksum is the chain
+    over the appended segments (recorded in the metadata).
+    """
+    digest = hashlib.sha256()
+    for block_start in range(start, end, BLOCK_ROWS):
+        digest.update(np.ascontiguousarray(vectors[block_start:min(end, block_start + BLOCK_ROWS)]).tobytes())
+    return hashlib.sha256((previous + digest.hexdigest()).encode()).hexdigest()
+
+def verify_checksum(vectors: np.ndarray, segments: List[int]) -> str:
+    """Recompute the chained checksum over the segment boundaries"""
+    checksum, start = "", 0
+    for end in segments:
+        checksum = chain_checksum(checksum, vectors, start, end)
+        start = end
+    return checksum
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize each row (zero rows stay zero)"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+def quantize(vectors: np.ndarray, dtype: str = "float16") -> Tuple[np.ndarray, float]:
+    """Normalized rows stored as float16, or int8 with one scale (components of unit vectors are in [-1, 1])"""
+    vectors = normalize_rows(vectors)
+    if dtype == "int8":
+        return np.clip(np.round(vectors * 127), -127, 127).astype(np.int8), 1.0 / 127
+    return vectors.astype(np.float16), 1.0
+
+def relevance_from_cosine(cosine: np.ndarray) -> np.ndarray:
+    """Chroma's default relevance for unit vectors (L2 distance mapped to 1 - d / sqrt(2))"""
+    distance = np.sqrt(np.maximum(0.0, 2.0 - 2.0 * cosine))
+    return 1.0 - distance / np.sqrt(2.0)
+
+def _write_atomic(path: str, write: Callable[[str], None]):
+    tmp_path = path + ".tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+def _save_vectors(path: str, matrix: np.ndarray):
+    def write_vectors(tmp_path):
+        # np.save appends ".npy" to other names, so write through a file handle
+        with open(tmp_path, 'wb') as f:
+            np.save(f, matrix)
+
+    _write_atomic(path, write_vectors)
+
+def _save_meta(index_dir: str, meta: Dict[str, Any]):
+    def write_meta(path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+    _write_atomic(os.path.join(index_dir, META_FILENAME), write_meta)
+
+def _connect_rows(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS chunks (
+            row INTEGER PRIMARY KEY,
+            id TEXT UNIQUE NOT NULL,
+            document TEXT NOT NULL,
+            metadata TEXT NOT NULL
+        )
+    """)
+    return conn
+
+def _insert_rows(conn: sqlite3.Connection, first: int, ids: List[str], documents: List[str], metadatas: List[Dict]):
+    with conn:
+        conn.executemany("INSERT INTO chunks (row, id, document, metadata) VALUES (?, ?, ?, ?)",
+                         [(first + i, chunk_id, documents[i] or "", json.dumps(metadatas[i] or {}, ensure_ascii=False))
+                          for i, chunk_id in enumerate(ids)])
+
+def _save_rows(path: str, ids: List[str], documents: List[str], metadatas: List[Dict]):
+    def write_rows(tmp_path):
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        conn = _connect_rows(tmp_path)
+        try:
+            _insert_rows(conn, 0, ids, documents, metadatas)
+        finally:
+            conn.close()
+
+    _write_atomic(path, write_rows)
+
+def _append_vectors(path: str, rows: np.ndarray):
+    """Append rows to an .npy file in place (numpy pads the header for a growing first axis)"""
+    with open(path, 'r+b') as f:
+        version = np.lib.format.read_magic(f)
+        if version != (1, 0):
+            raise ValueError(f"Unsupported .npy version {version}")
+        shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        offset = f.tell()
+        if fortran_order or dtype != rows.dtype or shape[1:] != rows.shape[1:]:
+            raise ValueError("Appended rows do not match the stored matrix")
+        header = io.BytesIO()
+        np.lib.format.write_array_header_1_0(header, {
+            "descr": np.lib.format.dtype_to_descr(dtype),
+            "fortran_order": False,
+            "shape": (shape[0] + rows.shape[0],) + tuple(shape[1:])
+        })
+        if len(header.getvalue()) != offset:
+            raise ValueError("No room to grow the .npy header")
+        f.seek(0, os.SEEK_END)
+        f.write(np.ascontiguousarray(rows).tobytes())
+        f.seek(0)
+        f.write(header.getvalue())
+
+def build_matrix_index(source, index_dir: str, dtype: str = "float16", catalog: str = "") -> Dict[str, Any]:
+    """Export every chunk of a Chroma store into a matrix index -> the index metadata
+
+    Vectors and the row table (ids, documents, metadatas in SQLite) are
+    written first and the small metadata (with the checksum) last, so an
+    interrupted build never loads.
+    """
+    if dtype not in SUPPORTED_DTYPES:
+        raise ValueError(f"Unsupported vector index dtype: {dtype}")
+    start = time.perf_counter()
+    data = source.get(include=["embeddings", "documents", "metadatas"])
+    ids = list(data.get("ids") or [])
+    embeddings = data.get("embeddings")
+    if embeddings is None or len(ids) == 0:
+        raise ValueError("Vectorstore has no embeddings to index")
+
+    matrix, scale = quantize(np.asarray(embeddings, dtype=np.float32), dtype)
+    os.makedirs(index_dir, exist_ok=True)
+    vectors_path = os.path.join(index_dir, VECTORS_FILENAME)
+    _save_vectors(vectors_path, matrix)
+    _save_rows(os.path.join(index_dir, ROWS_FILENAME), ids,
+               list(data.get("documents") or [""] * len(ids)),
+               list(data.get("metadatas") or [{}] * len(ids)))
+
+    count = int(matrix.shape[0])
+    meta = {
+        "version": INDEX_VERSION,
+        "dtype": dtype,
+        "scale": scale,
+        "count": count,
+        "dim": int(matrix.shape[1]),
+        "segments": [count],
+        "checksum": chain_checksum("", matrix, 0, count),
+        "catalog_hash": catalog
+    }
+    _save_meta(index_dir, meta)
+    print(f"✅ Matrix index: {meta['count']} x {meta['dim']} {dtype} vectors "
+          f"({os.path.getsize(vectors_path) / 1e6:.1f} MB) in {time.perf_counter() - start:.1f}s")
+    return meta
+
+class MatrixVectorStore:
+    """Read-only vector store over a memory-mapped matrix with exact top-k by dot product
+
+    Offers the parts of the Chroma interface the retrieval engine and
+    HybridRetriever use: get() and similarity_search(_by_vector)_with_relevance_scores().
+    Documents and metadatas stay on disk in the row table and are read per hit.
+    """
+
+    def __init__(self, index_dir: str, embedding_function, verify: bool = True):
+        self.index_dir = index_dir
+        self.embedding_function = embedding_function
+
+        with open(os.path.join(index_dir, META_FILENAME), encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get("version") != INDEX_VERSION:
+            raise ValueError(f"Matrix index version {meta.get('version')} != {INDEX_VERSION}")
+
+        self._vectors = np.load(os.path.join(index_dir, VECTORS_FILENAME), mmap_mode="r")
+        if self._vectors.shape != (meta["count"], meta["dim"]):
+            raise ValueError(f"Matrix index shape {self._vectors.shape} does not match its metadata")
+        if verify and verify_checksum(self._vectors, meta["segments"]) != meta["checksum"]:
+            raise ValueError("Matrix index checksum mismatch")
+
+        rows_path = os.path.join(index_dir, ROWS_FILENAME)
+        if not os.path.exists(rows_path):
+            raise FileNotFoundError(rows_path)
+        self._conn = _connect_rows(rows_path)
+        self._db_lock = threading.Lock()
+        with self._db_lock, self._conn:
+            # Rows of an add() interrupted before its vectors landed
+            self._conn.execute("DELETE FROM chunks WHERE row >= ?", (meta["count"],))
+            stored = self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+        if stored != meta["count"]:
+            raise ValueError(f"Matrix index has {stored} rows for {meta['count']} vectors")
+
+        self.meta = meta
+        self.scale = meta["scale"]
+
+        self._masks = {}
+        self._masks_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        # Guards add(); searches only take a (vectors, row count) snapshot under it
+        self._lock = threading.RLock()
+        self.stats = {"queries": 0, "total_ms": 0.0, "scanned": 0}
+
+    def __len__(self) -> int:
+        return self.meta["count"]
+
+    @property
+    def catalog_hash(self) -> str:
+        return self.meta.get("catalog_hash", "")
+
+    def get(self, ids: List[str] = None, include: List[str] = None) -> Dict[str, Any]:
+        """Chroma-style get(): ids plus the requested documents / metadatas / embeddings"""
+        include = include or ["documents", "metadatas"]
+        count = self._snapshot()[1]
+        if ids is None:
+            with self._db_lock:
+                records = self._conn.execute(
+                    "SELECT row, id, document, metadata FROM chunks WHERE row < ? ORDER BY row", (count,)).fetchall()
+        else:
+            found = {record[1]: record for record in self._select("id", ids)}
+            records = [found[i] for i in ids if i in found and found[i][0] < count]
+        rows = [record[0] for record in records]
+        result = {"ids": [record[1] for record in records]}
+        if "documents" in include:
+            result["documents"] = [record[2] for record in records]
+        if "metadatas" in include:
+            result["metadatas"] = [json.loads(record[3]) for record in records]
+        if "embeddings" in include:
+            result["embeddings"] = np.asarray(self._vectors[rows], dtype=np.float32) * self.scale
+        return result
+
+    def _select(self, column: str, values: List) -> List[Tuple]:
+        """(row, id, document, metadata) records whose `column` is in values"""
+        records = []
+        with self._db_lock:
+            for start in range(0, len(values), SQL_BATCH):
+                batch = list(values[start:start + SQL_BATCH])
+                records.extend(self._conn.execute(
+                    f"SELECT row, id, document, metadata FROM chunks WHERE {column} IN ({','.join('?' * len(batch))})",
+                    batch).fetchall())
+        return records
+
+    def documents(self, rows: List[int]) -> List[Tuple[str, Dict]]:
+        """(document, metadata) of each row"""
+        found = {record[0]: record for record in self._select("row", rows)}
+        return [(found[row][2], json.loads(found[row][3])) for row in rows]
+
+    def _snapshot(self) -> Tuple[np.ndarray, int]:
+        """Current (vectors, row count); rows below the count stay valid while add() runs"""
+        with self._lock:
+            return self._vectors, len(self._vectors)
+
+    def _mask(self, where: Dict, count: int) -> Optional[np.ndarray]:
+        """Boolean mask of the first `count` rows for a Chroma `where` predicate
+
+        Cached per predicate; rows added since are matched and appended to the mask.
+        """
+        if not where:
+            return None
+        from hybrid_retriever import metadata_matches
+
+        key = json.dumps(where, sort_keys=True, default=str)
+        with self._masks_lock:
+            mask = self._masks.get(key)
+        if mask is None or len(mask) < count:
+            known = 0 if mask is None else len(mask)
+            with self._db_lock:
+                metadatas = [json.loads(m) for (m,) in self._conn.execute(
+                    "SELECT metadata FROM chunks WHERE row >= ? AND row < ? ORDER BY row", (known, count))]
+            matches = np.fromiter((metadata_matches(m, where) for m in metadatas), dtype=bool, count=len(metadatas))
+            mask = matches if mask is None else np.concatenate([mask, matches])
+            with self._masks_lock:
+                if len(self._masks) >= 256:
+                    self._masks.clear()
+                self._masks[key] = mask
+        return mask[:count]
+
+    @staticmethod
+    def _query_vector(embedding) -> np.ndarray:
+        return normalize_rows(np.asarray(embedding, dtype=np.float32).reshape(1, -1))[0]
+
+    def scores(self, embedding, vectors: np.ndarray = None) -> np.ndarray:
+        """Cosine similarity of a query vector with every row"""
+        vectors = self._snapshot()[0] if vectors is None else vectors
+        query = self._query_vector(embedding)
+        scores = np.empty(len(vectors), dtype=np.float32)
+        for start in range(0, len(vectors), BLOCK_ROWS):
+            block = np.asarray(vectors[start:start + BLOCK_ROWS], dtype=np.float32)
+            scores[start:start + len(block)] = block @ query
+        return scores * self.scale
+
+    def _top_k(self, rows: Optional[np.ndarray], scores: np.ndarray, k: int, start: float) -> List[Tuple[int, float]]:
+        """Best k of the scored rows (rows=None: scores cover every row), recorded in the stats"""
+        finite = int(np.isfinite(scores).sum())
+        k = min(k, finite)
+        hits = []
+        if k > 0:
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            hits = [(int(row if rows is None else rows[row]), float(scores[row])) for row in top]
+        with self._stats_lock:
+            self.stats["queries"] += 1
+            self.stats["scanned"] += len(scores)
+            self.stats["total_ms"] += (time.perf_counter() - start) * 1000
+        return hits
+
+    def search_rows(self, embedding, k: int = 4, where: Dict = None) -> List[Tuple[int, float]]:
+        """Exact top-k (row, cosine) for a query vector"""
+        start = time.perf_counter()
+        vectors, count = self._snapshot()
+        scores = self.scores(embedding, vectors)
+        mask = self._mask(where, count)
+        if mask is not None:
+            scores[~mask] = -np.inf
+        return self._top_k(None, scores, k, start)
+
+    def add(self, ids: List[str], embeddings, documents: List[str] = None,
+            metadatas: List[Dict] = None) -> List[int]:
+        """Append new chunks without rebuilding -> their row numbers (ids already present are skipped)"""
+        documents = documents or [""] * len(ids)
+        metadatas = metadatas or [{}] * len(ids)
+        with self._lock:
+            known = {record[1] for record in self._select("id", ids)}
+            fresh, seen = [], set()
+            for i, chunk_id in enumerate(ids):
+                if chunk_id not in known and chunk_id not in seen:
+                    fresh.append(i)
+                    seen.add(chunk_id)
+            if len(fresh) < len(ids):
+                logger.warning(f"⚠️ Matrix index: skipped {len(ids) - len(fresh)} ids already indexed")
+            if not fresh:
+                return []
+            rows, _ = quantize(np.asarray(embeddings, dtype=np.float32)[fresh], self.meta["dtype"])
+            first = self.meta["count"]
+            # Row table grows before the vectors, so any row a search can see is fully described
+            with self._db_lock:
+                _insert_rows(self._conn, first, [ids[i] for i in fresh],
+                             [documents[i] for i in fresh], [metadatas[i] for i in fresh])
+
+            vectors_path = os.path.join(self.index_dir, VECTORS_FILENAME)
+            try:
+                _append_vectors(vectors_path, rows)
+            except ValueError:
+                _save_vectors(vectors_path, np.concatenate([np.asarray(self._vectors), rows]))
+            self._vectors = np.load(vectors_path, mmap_mode="r")
+
+            count = first + len(rows)
+            self.meta.update(count=count, segments=self.meta["segments"] + [count],
+                             checksum=chain_checksum(self.meta["checksum"], self._vectors, first, count))
+            _save_meta(self.index_dir, self.meta)
+            return list(range(first, count))
+
+    def similarity_search_by_vector_with_relevance_scores(self, embedding, k: int = 4, filter: Dict = None, **kwargs):
+        """[(document, relevance), ...] for a query vector"""
+        from langchain.schema import Document
+
+        hits = self.search_rows(embedding, k=k, where=filter)
+        relevance = relevance_from_cosine(np.array([score for _, score in hits], dtype=np.float32))
+        documents = self.documents([row for row, _ in hits])
+        return [(Document(page_content=document, metadata=metadata), float(rel))
+                for (document, metadata), rel in zip(documents, relevance)]
+
+    def similarity_search_with_relevance_scores(self, query: str, k: int = 4, filter: Dict = None, **kwargs):
+        """[(document, relevance), ...] for a text query"""
+        embedding = self.embedding_function.embed_query(query)
+        return self.similarity_search_by_vector_with_relevance_scores(embedding, k=k, filter=filter)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        stats["avg_ms"] = stats["total_ms"] / stats["queries"] if stats["queries"] else 0.0
+        stats["avg_scanned"] = stats["scanned"] / stats["queries"] if stats["queries"] else 0.0
+        stats.update(count=len(self), dtype=self.meta["dtype"], dim=self.meta["dim"])
+        return stats
+
+    def close(self):
+        """Close the row table"""
+        with self._db_lock:
+            self._conn.close()
+
+def default_nlist(count: int) -> int:
+    """~4 * sqrt(n) lists, but at least ~32 vectors per list"""
+    return int(max(1, min(4 * np.sqrt(count), count // 32)))
+
+class IVFVectorStore(MatrixVectorStore):
+    """Matrix store with an inverted-file (IVF) index for large catalogs
+
+    Rows are clustered around `nlist` k-means centroids; a query scores only the
+    rows of its `nprobe` closest lists. More probes = higher recall, more
+    latency (see recall_report()). add() assigns new rows to their closest
+    list without retraining; rebuild when the catalog has changed a lot.
+    """
+
+    def __init__(self, index_dir: str, embedding_function, nlist: int = None, nprobe: int = 8,
+                 verify: bool = True):
+        super().__init__(index_dir, embedding_function, verify=verify)
+        self.nprobe = nprobe
+        self.centroids = None
+        self.lists = []
+        if not self.load_ivf(nlist):
+            self.build_ivf(nlist)
+            self.save_ivf()
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        """Closest centroid of each row (blockwise, rows may be quantized)"""
+        labels = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), BLOCK_ROWS):
+            block = np.asarray(vectors[start:start + BLOCK_ROWS], dtype=np.float32)
+            labels[start:start + len(block)] = np.argmax(block @ self.centroids.T, axis=1)
+        return labels
+
+    def build_ivf(self, nlist: int = None, iterations: int = 10, sample_per_list: int = 64, seed: int = 0):
+        """Spherical k-means on a sample of rows, then assign every row to its list"""
+        start = time.perf_counter()
+        vectors, count = self._snapshot()
+        nlist = min(nlist or default_nlist(count), count)
+        rng = np.random.default_rng(seed)
+        sample_rows = np.sort(rng.choice(count, size=min(count, nlist * sample_per_list), replace=False))
+        sample = normalize_rows(np.asarray(vectors[sample_rows], dtype=np.float32))
+
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)]
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            empty = ~np.bincount(labels, minlength=nlist).astype(bool)
+            # Re-seed empty lists from random sample rows
+            sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()))]
+            centroids = normalize_rows(sums)
+        self.centroids = centroids
+
+        labels = self._assign(vectors[:count])
+        order = np.argsort(labels, kind="stable").astype(np.int64)
+        bounds = np.searchsorted(labels[order], np.arange(nlist + 1))
+        self.lists = [order[bounds[i]:bounds[i + 1]] for i in range(nlist)]
+        sizes = np.diff(bounds)
+        logger.info(f"📐 IVF index: {count} rows in {nlist} lists (largest {sizes.max()}, "
+                    f"{int((sizes == 0).sum())} empty) in {time.perf_counter() - start:.1f}s")
+
+    def save_ivf(self):
+        """Persist centroids and lists, tied to the matrix checksum"""
+        sizes = np.array([len(rows) for rows in self.lists], dtype=np.int64)
+
+        def write_ivf(path):
+            with open(path, 'wb') as f:
+                np.savez(f, centroids=self.centroids, rows=np.concatenate(self.lists) if self.lists else np.array([], np.int64),
+                         offsets=np.concatenate([[0], np.cumsum(sizes)]), checksum=np.array(self.meta["checksum"]))
+
+        _write_atomic(os.path.join(self.index_dir, IVF_FILENAME), write_ivf)
+
+    def load_ivf(self, nlist: int = None) -> bool:
+        """Load saved lists if they belong to this matrix (and the requested nlist)"""
+        path = os.path.join(self.index_dir, IVF_FILENAME)
+        try:
+            with np.load(path) as data:
+                if str(data["checksum"]) != self.meta["checksum"]:
+                    logger.info("🔄 IVF lists were built for another matrix, rebuilding")
+                    return False
+                if nlist and len(data["centroids"]) != min(nlist, len(self)):
+                    return False
+                self.centroids = data["centroids"]
+                rows, offsets = data["rows"], data["offsets"]
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.warning(f"⚠️ IVF lists unreadable ({e}), rebuilding")
+            return False
+        self.lists = [rows[offsets[i]:offsets[i + 1]] for i in range(len(self.centroids))]
+        return True
+
+    def search_rows(self, embedding, k: int = 4, where: Dict = None, nprobe: int = None) -> List[Tuple[int, float]]:
+        """Approximate top-k (row, cosine): exact scores over the rows of the nprobe closest lists"""
+        start = time.perf_counter()
+        vectors, count = self._snapshot()
+        with self._lock:
+            centroids, lists = self.centroids, self.lists
+        query = self._query_vector(embedding)
+        nprobe = min(nprobe or self.nprobe, len(centroids))
+        probe = np.argpartition(-(centroids @ query), nprobe - 1)[:nprobe]
+        rows = np.sort(np.concatenate([lists[i] for i in probe]))
+        rows = rows[rows < count]
+        mask = self._mask(where, count)
+        if mask is not None:
+            rows = rows[mask[rows]]
+        if len(rows) < k:
+            # Filter too selective for the probed lists: exact search is cheap over so few matches
+            return super().search_rows(embedding, k, where)
+        scores = np.asarray(vectors[rows], dtype=np.float32) @ query * self.scale
+        return self._top_k(rows, scores, k, start)
+
+    def add(self, ids: List[str], embeddings, documents: List[str] = None,
+            metadatas: List[Dict] = None) -> List[int]:
+        """Append chunks and put each into its closest list"""
+        with self._lock:
+            new_rows = super().add(ids, embeddings, documents, metadatas)
+            if new_rows:
+                labels = self._assign(self._vectors[new_rows[0]:new_rows[-1] + 1])
+                lists = list(self.lists)
+                for label in np.unique(labels):
+                    added = np.array(new_rows, dtype=np.int64)[labels == label]
+                    lists[label] = np.concatenate([lists[label], added])
+                self.lists = lists
+                self.save_ivf()
+            return new_rows
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        stats.update(nlist=len(self.lists), nprobe=self.nprobe)
+        return stats
+
+def recall_report(store: IVFVectorStore, query_vectors, k: int = 10,
+                  nprobes=(1, 2, 4, 8, 16, 32, 64)) -> List[Dict[str, Any]]:
+    """recall@k of the IVF search against exact search, with latency, for each nprobe"""
+    truth = [{row for row, _ in MatrixVectorStore.search_rows(store, q, k)} for q in query_vectors]
+    report = []
+    for nprobe in nprobes:
+        if nprobe > len(store.lists):
+            break
+        latencies, recalls, scanned = [], [], []
+        for q, exact in zip(query_vectors, truth):
+            before = store.stats["scanned"]
+            start = time.perf_counter()
+            hits = store.search_rows(q, k, nprobe=nprobe)
+            latencies.append((time.perf_counter() - start) * 1000)
+            scanned.append(store.stats["scanned"] - before)
+            recalls.append(len(exact & {row for row, _ in hits}) / max(1, len(exact)))
+        report.append({
+            "nprobe": nprobe,
+            "recall": float(np.mean(recalls)),
+            "p50_ms": float(np.percentile(latencies, 50)),
+            "p99_ms": float(np.percentile(latencies, 99)),
+            "scanned_fraction": float(np.mean(scanned)) / max(1, len(store))
+        })
+    return report
+
+def open_matrix_store(vectorstore_path: str, embedding_function, source_factory: Callable[[], Any],
+                      catalog: str = "", dtype: str = "float16", ivf: bool = False,
+                      nlist: int = None, nprobe: int = 8) -> Optional[MatrixVectorStore]:
+    """Load the matrix index next to a Chroma store, (re)building it from Chroma when
+    missing, corrupt, of another dtype or older than the current catalog; None if that fails
+
+    With ivf=True the store is an IVFVectorStore (its lists are built on first load).
+    """
+    index_dir = os.path.join(vectorstore_path, INDEX_DIRNAME)
+
+    def load(verify=True):
+        if ivf:
+            return IVFVectorStore(index_dir, embedding_function, nlist=nlist, nprobe=nprobe, verify=verify)
+        return MatrixVectorStore(index_dir, embedding_function, verify=verify)
+
+    try:
+        # Check freshness on the plain matrix first, so IVF lists are never built for a stale one
+        store = MatrixVectorStore(index_dir, embedding_function)
+        if store.catalog_hash == catalog and store.meta["dtype"] == dtype and not ivf:
+            return store
+        store.close()
+        if store.catalog_hash == catalog and store.meta["dtype"] == dtype:
+            return load(verify=False)
+        logger.info("🔄 Matrix index out of date, rebuilding")
+    except FileNotFoundError:
+        logger.info("📐 No matrix index yet, building it")
+    except Exception as e:
+        logger.warning(f"⚠️ Matrix index unusable ({e}), rebuilding")
+
+    try:
+        build_matrix_index(source_factory(), index_dir, dtype=dtype, catalog=catalog)
+        return load()
+    except Exception as e:
+        logger.error(f"❌ Could not build matrix index: {e}")
+        return None
@@ -2,14 +2,18 @@
 import os
 import datetime
 import time
+import queue
+import hashlib
 import logging
-import tempfile
+import threading
 import subprocess
 from typing import Dict, Any, List
 from gtts import gTTS
 
 from config import CONFIG, PHRASES
+from latency_budget import TurnBudget, timed_stage
 from speech_module import FastSpeechModule
+from entity_extractor import get_entity_extractor
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -39,7 +43,7 @@ class WorkingTTS:
         except:
             return False
     
-    def speak(self, text, language="english"):
+    def speak(self, text, language="english", budget=None):
         """FIXED: Speak text using gTTS without repetition - COMPLETE VERSION"""
         if not self.available:
             print(f"🔊 {text}")
@@ -108,7 +112,8 @@ class WorkingTTS:
                     chunk_preview = chunk[:50] + "..." if len(chunk) > 50 else chunk
                     print(f"🔊 Part {i+1}/{total_chunks}: {chunk_preview}")
                     
-                    if self._speak_chunk(chunk, lang_code):
+                    # Only the first part is on the turn's critical path
+                    if self._speak_chunk(chunk, lang_code, budget if i == 0 else None):
                         success_count += 1
                         time.sleep(0.3)  # Short pause between chunks
                     else:
@@ -118,7 +123,7 @@ class WorkingTTS:
                 return success_count > 0
             else:
                 # Short text - speak directly
-                return self._speak_chunk(clean_text, lang_code)
+                return self._speak_chunk(clean_text, lang_code, budget)
                 
         except Exception as e:
             print(f"❌ TTS Error: {e}")
@@ -225,20 +230,57 @@ class WorkingTTS:
         print(f"🧹 Deduplication: {len(chunks)} → {len(unique_chunks)} chunks")
         return unique_chunks
     
-    def _speak_chunk(self, text, lang_code):
+    def _audio_cache_path(self, text, lang_code):
+        """Cache file for a (text, language) pair"""
+        digest = hashlib.sha1(f"{lang_code}|{text}".encode("utf-8")).hexdigest()
+        return os.path.join(CONFIG["cache_dir"], "tts", f"{lang_code}_{digest}.mp3")
+    
+    def cached_audio(self, text, lang_code):
+        """Path of already synthesized audio for this text, or None"""
+        path = self._audio_cache_path(text, lang_code)
+        return path if os.path.exists(path) else None
+    
+    def synthesize(self, text, lang_code, lang_check=True):
+        """gTTS to an mp3 in the audio cache (reused for repeated phrases and answers)"""
+        path = self.cached_audio(text, lang_code)
+        if path:
+            return path
+        
+        path = self._audio_cache_path(text, lang_code)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        
+        tts = gTTS(text=text, lang=lang_code, slow=False, lang_check=lang_check)
+        temp_path = f"{path}.{int(time.time() * 1000)}.tmp"
+        tts.save(temp_path)
+        os.replace(temp_path, path)
+        
+        self._prune_audio_cache(os.path.dirname(path))
+        return path
+    
+    def _prune_audio_cache(self, cache_dir):
+        """Keep only the newest tts_cache_max_files files"""
+        max_files = CONFIG.get("tts_cache_max_files", 500)
+        try:
+            files = [os.path.join(cache_dir, name) for name in os.listdir(cache_dir) if name.endswith(".mp3")]
+            if len(files) <= max_files:
+                return
+            files.sort(key=os.path.getmtime)
+            for path in files[:len(files) - max_files]:
+                os.unlink(path)
+        except OSError:
+            pass
+    
+    def _speak_chunk(self, text, lang_code, budget=None):
         """Speak a single chunk of text - IMPROVED ERROR HANDLING"""
         try:
             if len(text.strip()) < 3:
                 return True  # Skip very short texts
             
-            # Create TTS with better error handling
-            tts = gTTS(text=text, lang=lang_code, slow=False)
-            
-            # Save to temp file with better naming
-            temp_filename = f"tts_{int(time.time() * 1000)}.mp3"
-            temp_path = os.path.join(tempfile.gettempdir(), temp_filename)
-            
-            tts.save(temp_path)
+            # Synthesize (or reuse cached audio); only synthesis counts against the turn budget
+            with timed_stage(budget, "tts"):
+                temp_path = self.synthesize(text, lang_code)
+            if budget is not None:
+                budget.finish()  # The turn's latency ends when audio starts playing
             
             # Play with multiple fallback players
             players = [
@@ -267,13 +309,6 @@ class WorkingTTS:
                     print(f"❌ Player {player_cmd[0]} failed: {e}")
                     continue
             
-            # Cleanup temp file
-            try:
-                if os.path.exists(temp_path):
-                    os.unlink(temp_path)
-            except:
-                pass
-            
             if not success:
                 print(f"❌ All audio players failed for chunk: {text[:30]}...")
             
@@ -293,6 +328,9 @@ class EnhancedVoiceAssistant:
             "name": self.user_name,
             "occupation": None,
             "location": None,
+            "gender": None,
+            "age": None,
+            "caste": None,
             "last_query_time": datetime.datetime.now()
         }
         
@@ -328,7 +366,10 @@ class EnhancedVoiceAssistant:
         
         # Initialize WORKING Enhanced RAG Database
         try:
-            from enhanced_rag_database import EnhancedRAGDatabase
+            from enhanced_rag_database import EnhancedRAGDatabase, start_model_warmup, models_ready
+            
+            # Models load in the background; queries get a fast fallback answer until they are ready
+            start_model_warmup()
             
             groq_api_key = CONFIG.get("GROQ_API_KEY", "")
             if not groq_api_key:
@@ -352,7 +393,9 @@ class EnhancedVoiceAssistant:
                     logger.info("✅ WORKING RAG Database initialized successfully")
                     
                     total_schemes = self.scheme_db.get_scheme_count()
-                    if total_schemes > 0:
+                    if total_schemes > 0 and not models_ready():
+                        logger.info(f"📊 Database contains {total_schemes} schemes (models warming up in background)")
+                    elif total_schemes > 0:
                         logger.info(f"📊 Database contains {total_schemes} schemes")
                         
                         # Test search
@@ -392,7 +435,7 @@ class EnhancedVoiceAssistant:
             return False
         return True
     
-    def speak(self, text, language=None):
+    def speak(self, text, language=None, budget=None):
         """WORKING: Speak any length text perfectly"""
         if language is None:
             language = self.current_language
@@ -409,19 +452,20 @@ class EnhancedVoiceAssistant:
             text = text.format(self.user_name)
         
         # Use working gTTS - handles ANY length
-        return self.tts.speak(text, language)
+        return self.tts.speak(text, language, budget=budget)
     
-    def listen_hybrid(self, prompt, timeout=5, skip_voice=False):
-        """Hybrid input: voice attempt + text fallback"""
+    def listen_hybrid(self, prompt, timeout=5, skip_voice=False, budget=None):
+        """Hybrid input: voice attempt + text fallback (speech recognition is charged to `budget`)"""
         print(f"\n{prompt}")
         
         if not skip_voice and self.speech and self.speech.available:
             try:
                 print("🎤 Speak now or press Enter for text input...")
-                recognized_text, confidence = self.speech.listen(
-                    timeout=timeout,
-                    language=self.current_language
-                )
+                with timed_stage(budget, "stt"):
+                    recognized_text, confidence = self.speech.listen(
+                        timeout=timeout,
+                        language=self.current_language
+                    )
                 
                 if recognized_text and len(recognized_text.strip()) > 2 and recognized_text != "exit":
                     print(f"✅ Voice input: '{recognized_text}'")
@@ -513,119 +557,40 @@ class EnhancedVoiceAssistant:
         self.name_collected = True
         return "Friend"
     
+    def parse_user_context(self, context_info):
+        """Occupation, state, district, age, gender and caste from the user's introduction (see entity_extractor)"""
+        if not context_info:
+            return {}
+        
+        entities = get_entity_extractor().parse(context_info.strip('"').strip("'"))
+        found = {key: value for key, value in entities.items() if key != "spans" and value is not None}
+        logger.info(f"Parsed: '{context_info}' -> {found}")
+        return entities
+    
     def parse_user_occupation(self, context_info):
         """Enhanced occupation and location parsing"""
         if not context_info:
             return None, None
         
-        context_lower = context_info.lower().strip('"').strip("'")
-        
-        # Enhanced occupation patterns
-        occupation_patterns = {
-            "farmer": [
-                "farmer", "kisan", "किसान", "किशन", "kheti", "खेती", "agriculture", "कृषि", 
-                "crop", "field", "khet", "खेत", "गांव", "gaon", "farming", "कृषक", "krishak",
-                "खेतिहर", "khetihar", "cultivation", "उत्पादन", "seeds", "fertilizer", "krushi"
-            ],
-            "fisherman": [
-                "fisherman", "machhuara", "मछुआरा", "fishing", "boat", "marine", "मछली", 
-                "machli", "नाव", "nav", "समुद्री", "samudr", "मत्स्य", "matsya"
-            ],
-            "women": [
-                "women", "mahila", "महिला", "female", "woman", "lady", "औरत", "aurat",
-                "girl", "लड़की", "ladki", "बेटी", "beti", "womens"
-            ],
-            "teacher": [
-                "teacher", "shikshak", "शिक्षक", "school", "college", "पढ़ाना", "padhana",
-                "अध्यापक", "adhyapak", "guru", "गुरु"
-            ],
-            "doctor": [
-                "doctor", "daktar", "डॉक्टर", "medical", "hospital", "चिकित्सक", "chikitsak",
-                "वैद्य", "vaidya"
-            ],
-            "business": [
-                "business", "vyavasaya", "व्यवसाय", "shop", "dukan", "दुकान", "udyog", "उद्योग",
-                "व्यापार", "vyapar", "entrepreneur", "उद्यमी", "udyami"
-            ],
-            "student": [
-                "student", "vidyarthi", "विद्यार्थी", "college", "school", "पढ़ाई", "padhai",
-                "छात्र", "chhatr", "छात्रा", "chhatra"
-            ]
-        }
-        
-        detected_occupation = None
-        max_score = 0
-        
-        for occupation, keywords in occupation_patterns.items():
-            score = 0
-            for keyword in keywords:
-                if keyword in context_lower:
-                    score += len(keyword) * 2
-                    if keyword == context_lower or f" {keyword} " in f" {context_lower} ":
-                        score += 5
-            
-            if score > max_score:
-                max_score = score
-                detected_occupation = occupation
-        
-        # Enhanced location extraction
-        location = None
-        
-        location_patterns = [
-            r"(.+?)\s+से",           # "Gujarat se"
-            r"(.+?)\s+में",          # "Gujarat mein"  
-            r"(.+?)\s+from",         # "from Gujarat"
-            r"(.+?)\s+in",           # "in Gujarat"
-            r"(.+?)\s+ka",           # "Gujarat ka"
-            r"(.+?)\s+ki",           # "Gujarat ki"
-            r"(.+?)\s+state",        # "Gujarat state"
-            r"(.+?)\s+प्रदेश",        # "Uttar Pradesh"
-        ]
-        
-        import re
-        for pattern in location_patterns:
-            match = re.search(pattern, context_info, re.IGNORECASE)
-            if match:
-                potential_location = match.group(1).strip()
-                location_words = potential_location.split()
-                if location_words:
-                    location = " ".join(location_words[-2:]).strip('।.,!?"')
-                    break
-        
-        # Direct location keyword matching
-        if not location:
-            location_keywords = {
-                "gujarat": ["गुजरात", "gujarat", "guj"],
-                "andhra pradesh": ["आंध्र प्रदेश", "andhra pradesh", "andhra", "ap"],
-                "goa": ["गोवा", "goa"],
-                "karnataka": ["कर्नाटक", "karnataka", "bangalore", "बंगलोर"],
-                "kerala": ["केरल", "kerala", "kochi", "कोच्चि"],
-                "tamil nadu": ["तमिल नाडु", "tamil nadu", "tn", "chennai", "चेन्नई"],
-                "maharashtra": ["महाराष्ट्र", "maharashtra", "mumbai", "मुंबई", "pune", "पुणे"],
-                "uttar pradesh": ["उत्तर प्रदेश", "uttar pradesh", "up", "lucknow", "लखनौ"],
-                "rajasthan": ["राजस्थान", "rajasthan", "jaipur", "जयपुर"],
-                "punjab": ["पंजाब", "punjab"],
-                "haryana": ["हरियाणा", "haryana"],
-                "north eastern": ["north eastern", "northeast", "उत्तर पूर्वी", "ne"]
-            }
-            
-            for state, keywords in location_keywords.items():
-                for keyword in keywords:
-                    if keyword in context_lower:
-                        location = state
-                        break
-                if location:
-                    break
-        
-        # Default to farmer if agriculture context exists
-        if not detected_occupation and any(word in context_lower for word in ["seeds", "fertilizer", "krushi", "crop", "farming"]):
-            detected_occupation = "farmer"
-        
-        final_occupation = detected_occupation if detected_occupation else "farmer"
-        
-        logger.info(f"Parsed: '{context_info}' -> Occupation: '{final_occupation}', Location: '{location}'")
+        return self._occupation_and_location(self.parse_user_context(context_info))
+    
+    @staticmethod
+    def _occupation_and_location(entities):
+        """(occupation, location) from parse_user_context() entities"""
+        # Default to farmer when no occupation was mentioned (a search hint only, see _profile)
+        final_occupation = entities.get("occupation") or "farmer"
+        # Canonical state (a district also gives its state), so catalog routing and filters match
+        location = entities.get("state")
         return final_occupation, location
     
+    @staticmethod
+    def _profile(context):
+        """Metadata-filter profile: only what the user stated (a defaulted occupation is left out)"""
+        profile = {key: context.get(key) for key in ("gender", "age", "caste")}
+        if context.get("occupation_stated"):
+            profile["occupation"] = context.get("occupation")
+        return profile
+    
     def find_relevant_schemes(self, query, top_n=5):
         """Enhanced scheme search using RAG"""
         if not self.scheme_db or not self.scheme_db.available:
@@ -662,8 +627,146 @@ class EnhancedVoiceAssistant:
             traceback.print_exc()
             return []
     
-    def format_scheme_response(self, schemes, query, language):
-        """FIXED: Dynamic response from RAG - NO HARDCODED RESPONSES"""
+    def answer_query(self, query, language=None, top_n=5, budget=None, user_context=None):
+        """Single-pass RAG turn: returns (schemes, voice-ready response) from one retrieval + one LLM call
+        
+        With a TurnBudget the RAG stages pick cheaper strategies when time is short.
+        `user_context` overrides self.user_context (for callers serving several users at once).
+        """
+        if language is None:
+            language = self.current_language
+        context = self.user_context if user_context is None else user_context
+        
+        if not self.scheme_db or not self.scheme_db.available:
+            logger.warning("Enhanced RAG Database not available")
+            return [], self.format_scheme_response([], query, language)
+        
+        try:
+            occupation = context.get("occupation")
+            location = context.get("location")
+            
+            logger.info(f"🔍 WORKING RAG Turn for: '{query}' | Occupation: {occupation} | Location: {location}")
+            
+            profile = self._profile(context)
+            result = self.scheme_db.answer_query(query, occupation, location, language, top_n, profile=profile,
+                                                 budget=budget)
+            schemes = result.get("schemes", [])
+            
+            if schemes:
+                logger.info(f"✅ WORKING RAG found {len(schemes)} schemes")
+            else:
+                logger.warning("❌ No schemes found with WORKING RAG")
+            
+            response = self.format_scheme_response(schemes, query, language, answer=result.get("answer"))
+            return schemes, response
+        
+        except Exception as e:
+            logger.error(f"WORKING RAG turn error: {e}")
+            import traceback
+            traceback.print_exc()
+            return [], self.format_scheme_response([], query, language)
+    
+    def answer_query_streaming(self, query, language=None, top_n=5, budget=None):
+        """Streaming RAG turn: speaks each sentence as soon as it is generated, returns (schemes, response)
+        
+        The LLM stream is consumed on a background thread, so the next sentence
+        is being generated while the current one is spoken.
+        """
+        if language is None:
+            language = self.current_language
+        
+        if not self.scheme_db or not self.scheme_db.available:
+            logger.warning("Enhanced RAG Database not available")
+            response = self.format_scheme_response([], query, language)
+            self.speak(response, language, budget=budget)
+            return [], response
+        
+        occupation = self.user_context.get("occupation")
+        location = self.user_context.get("location")
+        profile = self._profile(self.user_context)
+        
+        logger.info(f"🔍 Streaming RAG Turn for: '{query}' | Occupation: {occupation} | Location: {location}")
+        
+        schemes, sentences = self.scheme_db.stream_answer_query(query, occupation, location, language, top_n,
+                                                                profile=profile, budget=budget)
+        self._print_schemes(schemes)
+        
+        sentence_queue = queue.Queue()
+        turn_start = time.time()
+        
+        def produce():
+            try:
+                for sentence in sentences:
+                    sentence_queue.put(sentence)
+            except Exception as e:
+                logger.error(f"Streaming answer error: {e}")
+            finally:
+                sentence_queue.put(None)
+        
+        threading.Thread(target=produce, daemon=True).start()
+        
+        print(f"\n📋 CSV RAG Response ({language}):")
+        spoken = []
+        while True:
+            sentence = sentence_queue.get()
+            if sentence is None:
+                break
+            if not spoken:
+                logger.info(f"⚡ First sentence ready in {time.time() - turn_start:.2f}s")
+            print(f"🤖 {sentence}")
+            # Only the first sentence is on the turn's critical path
+            self.speak(sentence, language, budget=None if spoken else budget)
+            spoken.append(sentence)
+        
+        if not spoken:
+            # Nothing streamed: answer from the retrieved schemes (answer="" skips a second RAG + LLM round trip)
+            response = self.format_scheme_response(schemes, query, language, answer="")
+            print(f"🤖 {response}")
+            self.speak(response, language, budget=budget)
+            return schemes, response
+        
+        return schemes, " ".join(spoken)
+    
+    def _print_schemes(self, schemes):
+        """Print the schemes found for a turn"""
+        if schemes:
+            print(f"✅ WORKING RAG found {len(schemes)} schemes:")
+            for i, scheme in enumerate(schemes, 1):
+                name = scheme.get('Name', 'Unknown')
+                score = scheme.get('Score', 0)
+                print(f"  {i}. {name[:70]}... (Score: {score:.3f})")
+        else:
+            print("❌ No schemes found")
+    
+    def respond_to_query(self, query, budget=None):
+        """Answer a query out loud, streamed sentence by sentence when enabled
+        
+        The turn runs against a latency budget (voice_turn_budget) from the
+        moment the query is heard until the answer starts playing; pass the
+        budget that listen_hybrid() charged speech recognition to.
+        """
+        budget = budget or TurnBudget(channel="voice")
+        try:
+            if CONFIG.get("stream_voice_answers", True):
+                return self.answer_query_streaming(query, self.current_language, top_n=5, budget=budget)
+            
+            relevant_schemes, response = self.answer_query(query, self.current_language, top_n=5, budget=budget)
+            self._print_schemes(relevant_schemes)
+            
+            print(f"\n📋 CSV RAG Response ({self.current_language}):")
+            print(f"🤖 {response}")
+            
+            # WORKING: Speak the COMPLETE response using gTTS chunking
+            self.speak(response, self.current_language, budget=budget)
+            return relevant_schemes, response
+        finally:
+            budget.finish()
+    
+    def format_scheme_response(self, schemes, query, language, answer=None):
+        """FIXED: Dynamic response from RAG - NO HARDCODED RESPONSES
+        
+        Pass the answer from answer_query() to avoid a second LLM round trip.
+        """
         if not schemes:
             no_scheme_msgs = {
                 "hindi": "कोई संबंधित योजना नहीं मिली। कृपया अधिक विवरण दें।",
@@ -673,27 +776,30 @@ class EnhancedVoiceAssistant:
             return no_scheme_msgs.get(language, no_scheme_msgs["english"])
         
         try:
-            # Get the actual detailed answer from RAG - COMPLETELY DYNAMIC
-            from enhanced_rag_database import answer_schemes_question
-            
-            # Build enhanced query with language preference
-            occupation = self.user_context.get("occupation", "")
-            location = self.user_context.get("location", "")
-            
-            enhanced_query = query
-            if occupation:
-                enhanced_query += f" for {occupation}"
-            if location:
-                enhanced_query += f" in {location}"
-            
-            # Add language instruction to query for better responses
-            if language == "hindi":
-                enhanced_query += " answer in Hindi हिंदी में जवाब दें"
-            elif language == "hinglish":
-                enhanced_query += " answer in Hinglish हिंग्लिश में जवाब दें"
+            detailed_answer = answer
             
-            # Get detailed answer from RAG - COMPLETELY DYNAMIC
-            detailed_answer = answer_schemes_question(enhanced_query)
+            if detailed_answer is None:
+                # Get the actual detailed answer from RAG - COMPLETELY DYNAMIC
+                from enhanced_rag_database import answer_schemes_question
+                
+                # Build enhanced query with language preference
+                occupation = self.user_context.get("occupation", "")
+                location = self.user_context.get("location", "")
+                
+                enhanced_query = query
+                if occupation:
+                    enhanced_query += f" for {occupation}"
+                if location:
+                    enhanced_query += f" in {location}"
+                
+                # Add language instruction to query for better responses
+                if language == "hindi":
+                    enhanced_query += " answer in Hindi हिंदी में जवाब दें"
+                elif language == "hinglish":
+                    enhanced_query += " answer in Hinglish हिंग्लिश में जवाब दें"
+                
+                # Get detailed answer from RAG - COMPLETELY DYNAMIC
+                detailed_answer = answer_schemes_question(enhanced_query)
             
             if detailed_answer and len(detailed_answer.strip()) > 20:
                 # Clean and format for voice - NO HARDCODING
@@ -825,10 +931,17 @@ class EnhancedVoiceAssistant:
             )
             
             if context_info and context_info != "exit":
-                occupation, location = self.parse_user_occupation(context_info)
+                entities = self.parse_user_context(context_info)
+                occupation, location = self._occupation_and_location(entities)
+                
+                # Gender / age / caste mentioned in the introduction narrow retrieval to eligible schemes
+                for key in ("gender", "age", "caste"):
+                    if entities.get(key) is not None:
+                        self.user_context[key] = entities[key]
                 
                 if occupation:
                     self.user_context["occupation"] = occupation.strip()
+                    self.user_context["occupation_stated"] = entities.get("occupation") is not None
                     logger.info(f"💼 Occupation: {occupation}")
                 
                 if location:
@@ -855,10 +968,13 @@ class EnhancedVoiceAssistant:
                 
                 self.speak("ask_query")
                 
+                # The turn's budget starts before listening so speech recognition counts against it
+                budget = TurnBudget(channel="voice")
                 query = self.listen_hybrid(
                     query_prompts[self.current_language],
                     timeout=15,
-                    skip_voice=False
+                    skip_voice=False,
+                    budget=budget
                 )
                 
                 if not query or query == "exit" or len(query.strip()) < 2:
@@ -875,25 +991,8 @@ class EnhancedVoiceAssistant:
                 user_location = self.user_context.get('location', 'None')
                 print(f"\n🧠 WORKING CSV RAG Search for {user_occupation} from {user_location}...")
                 
-                relevant_schemes = self.find_relevant_schemes(query.strip(), top_n=5)
-                
-                if relevant_schemes:
-                    print(f"✅ WORKING RAG found {len(relevant_schemes)} schemes:")
-                    for i, scheme in enumerate(relevant_schemes, 1):
-                        name = scheme.get('Name', 'Unknown')
-                        score = scheme.get('Score', 0)
-                        print(f"  {i}. {name[:70]}... (Score: {score:.3f})")
-                else:
-                    print("❌ No schemes found")
-                
-                # WORKING: Generate and speak COMPLETE response
-                response = self.format_scheme_response(relevant_schemes, query, self.current_language)
-                
-                print(f"\n📋 CSV RAG Response ({self.current_language}):")
-                print(f"🤖 {response}")
-                
-                # WORKING: Speak the COMPLETE response using gTTS chunking
-                self.speak(response, self.current_language)
+                # WORKING: One retrieval + one LLM call, spoken as it is generated
+                self.respond_to_query(query.strip(), budget=budget)
                 
                 if conversation_count >= max_conversations:
                     break
@@ -924,23 +1023,7 @@ class EnhancedVoiceAssistant:
                         logger.info(f"🗣️ Additional Query: '{query}' ({self.current_language})")
                         
                         print(f"\n🧠 WORKING CSV RAG Search for additional query...")
-                        relevant_schemes = self.find_relevant_schemes(query.strip(), top_n=5)
-                        
-                        if relevant_schemes:
-                            print(f"✅ WORKING RAG found {len(relevant_schemes)} schemes:")
-                            for i, scheme in enumerate(relevant_schemes, 1):
-                                name = scheme.get('Name', 'Unknown')
-                                score = scheme.get('Score', 0)
-                                print(f"  {i}. {name[:70]}... (Score: {score:.3f})")
-                        else:
-                            print("❌ No schemes found")
-                        
-                        response = self.format_scheme_response(relevant_schemes, query, self.current_language)
-                        print(f"\n📋 CSV RAG Response ({self.current_language}):")
-                        print(f"🤖 {response}")
-                        
-                        # WORKING: Speak complete additional response
-                        self.speak(response, self.current_language)
+                        self.respond_to_query(query.strip())
                         continue
                     else:
                         logger.info("👋 User wants to exit")